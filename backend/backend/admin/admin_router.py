@@ -1,20 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.models import Enquiry, Product, ReadymadeProduct, Order, Employee
+from backend.models import Enquiry, EnquiryArchive, Product, ReadymadeProduct, Order, Employee, Invoice
 from backend.email.send_email import send_custom_email
-from pydantic import BaseModel
+from backend.core.cache import aggregate_cache
+from backend.payments.overdue import sweep_overdue
+from backend.metering.usage import (
+    usage_totals, usage_by_period, ORDERS_PROCESSED, REVENUE_PROCESSED, INVOICES_ISSUED, EMAILS_SENT
+)
+from pydantic import BaseModel, Field
 from typing import Optional, List
+from datetime import datetime
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/enquiries")
-def get_enquiries(db: Session = Depends(get_db)):
+def get_enquiries(include_archived: bool = False, db: Session = Depends(get_db)):
     enquiries = (
         db.query(Enquiry)
         .order_by(Enquiry.created_at.desc())
         .all()
     )
+    if include_archived:
+        archived = db.query(EnquiryArchive).order_by(EnquiryArchive.created_at.desc()).all()
+        enquiries = sorted([*enquiries, *archived], key=lambda e: e.created_at or datetime.min, reverse=True)
     return enquiries
 @router.delete("/enquiries/{enquiry_id}")
 def delete_enquiry(enquiry_id: int, db: Session = Depends(get_db)):
@@ -52,6 +61,7 @@ class ProductCreate(BaseModel):
     quantity: str
     quality: str
     price: int
+    stock: Optional[int] = Field(None, ge=0)  # Leave empty to not track stock
     image: Optional[str] = None
     collection: Optional[str] = None # Simulating collection
 
@@ -66,7 +76,8 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         name=product.name,
         quantity=product.quantity,
         quality=product.quality,
-        price=product.price
+        price=product.price,
+        stock=product.stock
     )
     db.add(new_product)
     db.commit()
@@ -83,6 +94,8 @@ def update_product(product_id: int, product: ProductCreate, db: Session = Depend
     db_product.quantity = product.quantity
     db_product.quality = product.quality
     db_product.price = product.price
+    if "stock" in product.dict(exclude_unset=True):  # Don't wipe tracked stock on edits that omit it
+        db_product.stock = product.stock
     # db_product.collection = product.collection # if we had this field
     
     db.commit()
@@ -167,28 +180,57 @@ def delete_fabric(fabric_id: int, db: Session = Depends(get_db)):
 
 @router.get("/billing")
 def get_billing_info(db: Session = Depends(get_db)):
-    # Aggregating some simple stats
-    total_sales = db.query(Order).count()
-    total_revenue = 0
-    orders = db.query(Order).all()
-    for o in orders:
-        if o.amount:
-            total_revenue += o.amount
-            
-    return {
+    cached = aggregate_cache.get("billing")
+    if cached is not None:
+        return cached
+
+    # O(periods): totals and the monthly breakdown come from the usage counters
+    totals = usage_totals(db)
+    recent_invoices = db.query(Invoice).order_by(Invoice.created_at.desc()).limit(10).all()
+
+    result = {
         "subscription_plan": "Premium Enterprise",
         "next_billing_date": "2026-02-01",
         "amount_due": 0,
         "payment_method": "Visa ending in 4242",
         "invoices": [
-            {"id": "INV-001", "date": "2026-01-01", "amount": 2999, "status": "Paid"},
-            {"id": "INV-002", "date": "2025-12-01", "amount": 2999, "status": "Paid"},
+            {
+                "id": invoice.invoice_number,
+                "date": invoice.issue_date.date().isoformat() if invoice.issue_date else None,
+                "amount": invoice.total_amount,
+                "status": invoice.payment_status
+            }
+            for invoice in recent_invoices
         ],
         "usage_stats": {
-            "total_orders_processed": total_sales,
-            "total_revenue_processed": total_revenue
+            "total_orders_processed": int(totals[ORDERS_PROCESSED]),
+            "total_revenue_processed": round(totals[REVENUE_PROCESSED], 2),
+            "total_invoices_issued": int(totals[INVOICES_ISSUED]),
+            "total_emails_sent": int(totals[EMAILS_SENT]),
+            "by_period": usage_by_period(db)
         }
     }
+    aggregate_cache.set("billing", result)
+    return result
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Hit/miss counters for the dashboard aggregate cache in this worker"""
+    return aggregate_cache.stats()
+
+
+@router.delete("/cache")
+def clear_cache():
+    """Drop every cached aggregate in this worker, e.g. after a manual data fix"""
+    aggregate_cache.invalidate()
+    return {"message": "Cache cleared"}
+
+
+@router.post("/overdue-sweep")
+def run_overdue_sweep():
+    """Mark Pending invoices and vendor payments past their due date as Overdue now, instead of waiting for the next scheduled sweep"""
+    return sweep_overdue()
 
 
 # --- Employee Management ---
@@ -0,0 +1,47 @@
+"""Add composite indexes for keyset-paginated order listing
+
+Merges the product/payment and order-address/cancellation branches.
+
+Revision ID: 004_add_order_listing_indexes
+Revises: 003_add_payment_models, add_cancellation_requested_001
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_add_order_listing_indexes'
+down_revision: Union[str, Sequence[str], None] = ('003_add_payment_models', 'add_cancellation_requested_001')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ORDER_INDEXES = [
+    ('ix_orders_created_at_id', ['created_at', 'id']),
+    ('ix_orders_user_email_created_at', ['user_email', 'created_at', 'id']),
+    ('ix_orders_product_id_created_at', ['product_id', 'created_at', 'id']),
+    ('ix_orders_readymade_product_id_created_at', ['readymade_product_id', 'created_at', 'id']),
+    ('ix_orders_cancellation_created_at', ['cancellation_requested', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in ORDER_INDEXES:
+        try:
+            op.create_index(name, 'orders', columns, unique=False)
+        except Exception as e:
+            print(f"Index {name} creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(ORDER_INDEXES):
+        try:
+            op.drop_index(name, table_name='orders')
+        except Exception:
+            pass
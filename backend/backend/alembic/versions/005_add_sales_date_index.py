@@ -0,0 +1,34 @@
+"""Index sales.date for date-range exports and reports
+
+Revision ID: 005_add_sales_date_index
+Revises: 004_add_order_listing_indexes
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_add_sales_date_index'
+down_revision: Union[str, Sequence[str], None] = '004_add_order_listing_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_index(op.f('ix_sales_date'), 'sales', ['date'], unique=False)
+    except Exception as e:
+        print(f"Index ix_sales_date creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    try:
+        op.drop_index(op.f('ix_sales_date'), table_name='sales')
+    except Exception:
+        pass
@@ -0,0 +1,31 @@
+"""Add numeric stock to readymade products and reserved units to orders
+
+Revision ID: 006_add_readymade_stock
+Revises: 005_add_sales_date_index
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_add_readymade_stock'
+down_revision: Union[str, Sequence[str], None] = '005_add_sales_date_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL stock means "not tracked", so existing products keep selling as before
+    op.add_column('readymade_products', sa.Column('stock', sa.Integer(), nullable=True))
+    op.add_column('orders', sa.Column('reserved_units', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'reserved_units')
+    op.drop_column('readymade_products', 'stock')
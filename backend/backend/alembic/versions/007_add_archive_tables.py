@@ -0,0 +1,80 @@
+"""Add orders_archive, sales_archive and enquiries_archive tables
+
+Revision ID: 007_add_archive_tables
+Revises: 006_add_readymade_stock
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_add_archive_tables'
+down_revision: Union[str, Sequence[str], None] = '006_add_readymade_stock'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'orders_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('user_name', sa.String(length=255), nullable=True),
+        sa.Column('user_email', sa.String(length=255), nullable=True),
+        sa.Column('user_phone', sa.String(length=255), nullable=True),
+        sa.Column('user_address', sa.String(length=1000), nullable=True),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('readymade_product_id', sa.Integer(), nullable=True),
+        sa.Column('product_name', sa.String(length=255), nullable=True),
+        sa.Column('quantity', sa.String(length=255), nullable=True),
+        sa.Column('quality', sa.String(length=255), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('cancellation_requested', sa.Integer(), nullable=True),
+        sa.Column('reserved_units', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_archive_created_at_id', 'orders_archive', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_archive_user_email_created_at', 'orders_archive', ['user_email', 'created_at', 'id'], unique=False)
+
+    op.create_table(
+        'sales_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('day', sa.String(length=20), nullable=True),
+        sa.Column('transaction_id', sa.String(length=255), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transaction_id'),
+        sa.ForeignKeyConstraint(['order_id'], ['orders_archive.id'], name='fk_sales_archive_order_id')
+    )
+    op.create_index(op.f('ix_sales_archive_date'), 'sales_archive', ['date'], unique=False)
+
+    op.create_table(
+        'enquiries_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=False),
+        sa.Column('company', sa.String(length=255), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.String(length=1000), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_enquiries_archive_created_at'), 'enquiries_archive', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('enquiries_archive')
+    op.drop_table('sales_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,53 @@
+"""Add sales_daily_rollup and backfill it from sales and sales_archive
+
+Revision ID: 008_add_sales_daily_rollup
+Revises: 007_add_archive_tables
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_add_sales_daily_rollup'
+down_revision: Union[str, Sequence[str], None] = '007_add_archive_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_table(
+            'sales_daily_rollup',
+            sa.Column('sale_date', sa.Date(), nullable=False),
+            sa.Column('total_amount', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('sales_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('sale_date')
+        )
+    except Exception as e:
+        print(f"sales_daily_rollup table creation skipped: {e}")
+
+    # Same as `python -m backend.sales.rollup`; safe to re-run
+    op.execute("DELETE FROM sales_daily_rollup")
+    op.execute(
+        """
+        INSERT INTO sales_daily_rollup (sale_date, total_amount, sales_count)
+        SELECT DATE(s.date), SUM(s.amount), COUNT(*)
+        FROM (
+            SELECT date, amount FROM sales
+            UNION ALL
+            SELECT date, amount FROM sales_archive
+        ) AS s
+        WHERE s.date IS NOT NULL
+        GROUP BY DATE(s.date)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_daily_rollup')
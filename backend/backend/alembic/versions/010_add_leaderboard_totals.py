@@ -0,0 +1,42 @@
+"""Add leaderboard_totals
+
+Revision ID: 010_add_leaderboard_totals
+Revises: 009_add_sales_cube
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_add_leaderboard_totals'
+down_revision: Union[str, Sequence[str], None] = '009_add_sales_cube'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_table(
+            'leaderboard_totals',
+            sa.Column('scope', sa.String(length=20), nullable=False),
+            sa.Column('period', sa.String(length=10), nullable=False),
+            sa.Column('entity_key', sa.String(length=255), nullable=False),
+            sa.Column('label', sa.String(length=255), nullable=True),
+            sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('scope', 'period', 'entity_key')
+        )
+    except Exception as e:
+        print(f"leaderboard_totals table creation skipped: {e}")
+
+    # Backfill with `python -m backend.sales.leaderboard`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leaderboard_totals')
@@ -0,0 +1,39 @@
+"""Add usage_counters
+
+Revision ID: 012_add_usage_counters
+Revises: 011_add_customer_stats
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_add_usage_counters'
+down_revision: Union[str, Sequence[str], None] = '011_add_customer_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_table(
+            'usage_counters',
+            sa.Column('period', sa.String(length=7), nullable=False),
+            sa.Column('metric', sa.String(length=50), nullable=False),
+            sa.Column('value', sa.Float(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('period', 'metric')
+        )
+    except Exception as e:
+        print(f"usage_counters table creation skipped: {e}")
+
+    # Backfill with `python -m backend.metering.usage`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('usage_counters')
@@ -0,0 +1,36 @@
+"""Index invoices.order_id for the pending-orders anti-join
+
+Revision ID: 013_add_invoice_order_index
+Revises: 012_add_usage_counters
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_add_invoice_order_index'
+down_revision: Union[str, Sequence[str], None] = '012_add_usage_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # InnoDB already created an index for the foreign key; don't add a duplicate
+    indexes = sa.inspect(op.get_bind()).get_indexes('invoices')
+    if any(index['column_names'][:1] == ['order_id'] for index in indexes):
+        print("invoices.order_id already indexed, skipping")
+        return
+    op.create_index('ix_invoices_order_id', 'invoices', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    try:
+        op.drop_index('ix_invoices_order_id', table_name='invoices')
+    except Exception as e:
+        print(f"ix_invoices_order_id drop skipped: {e}")
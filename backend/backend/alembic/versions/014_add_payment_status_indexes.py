@@ -0,0 +1,36 @@
+"""Index invoices.payment_status and vendor_payments.status for the summary endpoints
+
+Revision ID: 014_add_payment_status_indexes
+Revises: 013_add_invoice_order_index
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_add_payment_status_indexes'
+down_revision: Union[str, Sequence[str], None] = '013_add_invoice_order_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_index('ix_invoices_payment_status', 'invoices', ['payment_status'], unique=False)
+    except Exception as e:
+        print(f"ix_invoices_payment_status creation skipped: {e}")
+    try:
+        op.create_index('ix_vendor_payments_status', 'vendor_payments', ['status'], unique=False)
+    except Exception as e:
+        print(f"ix_vendor_payments_status creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vendor_payments_status', table_name='vendor_payments')
+    op.drop_index('ix_invoices_payment_status', table_name='invoices')
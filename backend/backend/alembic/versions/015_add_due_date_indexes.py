@@ -0,0 +1,36 @@
+"""Index due_date on invoices and vendor_payments for the aging report
+
+Revision ID: 015_add_due_date_indexes
+Revises: 014_add_payment_status_indexes
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015_add_due_date_indexes'
+down_revision: Union[str, Sequence[str], None] = '014_add_payment_status_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_index('ix_invoices_due_date_status', 'invoices', ['due_date', 'payment_status'], unique=False)
+    except Exception as e:
+        print(f"ix_invoices_due_date_status creation skipped: {e}")
+    try:
+        op.create_index('ix_vendor_payments_due_date_status', 'vendor_payments', ['due_date', 'status'], unique=False)
+    except Exception as e:
+        print(f"ix_vendor_payments_due_date_status creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vendor_payments_due_date_status', table_name='vendor_payments')
+    op.drop_index('ix_invoices_due_date_status', table_name='invoices')
@@ -0,0 +1,104 @@
+"""Normalize vendors.gstin and make it unique, for bulk import upserts
+
+Revision ID: 017_add_vendor_gstin_index
+Revises: 016_add_vendor_balances
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '017_add_vendor_gstin_index'
+down_revision: Union[str, Sequence[str], None] = '016_add_vendor_balances'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DETAIL_COLUMNS = (
+    'company_name', 'contact_person', 'email', 'phone', 'address', 'vendor_type',
+    'pan', 'bank_account', 'bank_name', 'ifsc_code', 'notes'
+)
+BALANCE_COLUMNS = (
+    'total_amount', 'payment_count', 'paid_amount', 'paid_count',
+    'outstanding_amount', 'outstanding_count', 'overdue_amount', 'overdue_count'
+)
+
+
+def _merge_vendor(conn, keep: int, duplicate: int, has_balances: bool):
+    """Folds a duplicate vendor into the one kept: its payments, its balance and any details the kept one lacks."""
+    row = conn.execute(
+        sa.text(f"SELECT {', '.join(DETAIL_COLUMNS)} FROM vendors WHERE id = :id"), {'id': duplicate}
+    ).mappings().first()
+    for column in DETAIL_COLUMNS:
+        if row[column] is not None:
+            conn.execute(
+                sa.text(f"UPDATE vendors SET {column} = :value WHERE id = :id AND {column} IS NULL"),
+                {'value': row[column], 'id': keep}
+            )
+    conn.execute(
+        sa.text("UPDATE vendor_payments SET vendor_id = :keep WHERE vendor_id = :duplicate"),
+        {'keep': keep, 'duplicate': duplicate}
+    )
+
+    if has_balances:
+        balance = conn.execute(
+            sa.text(f"SELECT {', '.join(BALANCE_COLUMNS)} FROM vendor_balances WHERE vendor_id = :id"),
+            {'id': duplicate}
+        ).mappings().first()
+        kept = conn.execute(
+            sa.text("SELECT vendor_id FROM vendor_balances WHERE vendor_id = :id"), {'id': keep}
+        ).first()
+        if balance and kept:
+            conn.execute(
+                sa.text(
+                    "UPDATE vendor_balances SET "
+                    + ", ".join(f"{column} = {column} + :{column}" for column in BALANCE_COLUMNS)
+                    + " WHERE vendor_id = :id"
+                ),
+                {**balance, 'id': keep}
+            )
+            conn.execute(sa.text("DELETE FROM vendor_balances WHERE vendor_id = :id"), {'id': duplicate})
+        elif balance:
+            conn.execute(
+                sa.text("UPDATE vendor_balances SET vendor_id = :keep WHERE vendor_id = :duplicate"),
+                {'keep': keep, 'duplicate': duplicate}
+            )
+
+    conn.execute(sa.text("DELETE FROM vendors WHERE id = :id"), {'id': duplicate})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    # Stored as create_vendor/update_vendor now store it: trimmed, upper-cased, blank = none
+    conn.execute(sa.text("UPDATE vendors SET gstin = UPPER(TRIM(gstin)) WHERE gstin IS NOT NULL"))
+    conn.execute(sa.text("UPDATE vendors SET gstin = NULL WHERE gstin = ''"))
+
+    # Vendors sharing a GSTIN are the same business: keep the oldest record
+    has_balances = sa.inspect(conn).has_table('vendor_balances')
+    duplicates = conn.execute(sa.text(
+        "SELECT gstin FROM vendors WHERE gstin IS NOT NULL GROUP BY gstin HAVING COUNT(*) > 1"
+    )).scalars().all()
+    for gstin in duplicates:
+        ids = conn.execute(
+            sa.text("SELECT id FROM vendors WHERE gstin = :gstin ORDER BY id"), {'gstin': gstin}
+        ).scalars().all()
+        for duplicate in ids[1:]:
+            _merge_vendor(conn, ids[0], duplicate, has_balances)
+        print(f"Merged vendors {ids[1:]} into {ids[0]} (GSTIN {gstin})")
+
+    # A plain index may exist from create_all or an earlier run of this revision
+    try:
+        op.drop_index('ix_vendors_gstin', table_name='vendors')
+    except Exception:
+        pass
+    op.create_index('ix_vendors_gstin', 'vendors', ['gstin'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema. Merged duplicate vendors are not restored."""
+    op.drop_index('ix_vendors_gstin', table_name='vendors')
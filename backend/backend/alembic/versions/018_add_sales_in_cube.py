@@ -0,0 +1,51 @@
+"""Track sales folded into the cube per row instead of by id watermark
+
+Revision ID: 018_add_sales_in_cube
+Revises: 017_add_vendor_gstin_index
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '018_add_sales_in_cube'
+down_revision: Union[str, Sequence[str], None] = '017_add_vendor_gstin_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales', sa.Column('in_cube', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sales_archive', sa.Column('in_cube', sa.Integer(), nullable=False, server_default='0'))
+
+    # Everything up to the old watermark is already folded. Rows a slow
+    # transaction committed below it were skipped by the watermark; run
+    # `python -m backend.sales.cube` to fold those back in.
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "UPDATE sales SET in_cube = 1 "
+        "WHERE id <= (SELECT COALESCE(MAX(last_sale_id), 0) FROM sales_cube_state)"
+    ))
+    conn.execute(sa.text("UPDATE sales_archive SET in_cube = 1"))
+    op.create_index('ix_sales_in_cube', 'sales', ['in_cube'], unique=False)
+
+    with op.batch_alter_table('sales_cube_state') as batch_op:
+        batch_op.drop_column('last_sale_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema. Unfolded sales below the highest folded id are skipped by the watermark."""
+    with op.batch_alter_table('sales_cube_state') as batch_op:
+        batch_op.add_column(sa.Column('last_sale_id', sa.Integer(), nullable=False, server_default='0'))
+    op.get_bind().execute(sa.text(
+        "UPDATE sales_cube_state SET last_sale_id = "
+        "(SELECT COALESCE(MAX(id), 0) FROM sales WHERE in_cube = 1)"
+    ))
+    op.drop_index('ix_sales_in_cube', table_name='sales')
+    op.drop_column('sales_archive', 'in_cube')
+    op.drop_column('sales', 'in_cube')
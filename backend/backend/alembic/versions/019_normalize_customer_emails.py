@@ -0,0 +1,38 @@
+"""Store order and invoice emails trimmed and lower-cased, as customer_stats keys them
+
+Revision ID: 019_normalize_customer_emails
+Revises: 018_add_sales_in_cube
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '019_normalize_customer_emails'
+down_revision: Union[str, Sequence[str], None] = '018_add_sales_in_cube'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMAIL_COLUMNS = (
+    ('orders', 'user_email'),
+    ('orders_archive', 'user_email'),
+    ('invoices', 'customer_email'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    for table, column in EMAIL_COLUMNS:
+        # Same as backend.customers.stats.customer_key: trimmed, lower-cased, blank = none
+        conn.execute(sa.text(f"UPDATE {table} SET {column} = LOWER(TRIM({column})) WHERE {column} IS NOT NULL"))
+        conn.execute(sa.text(f"UPDATE {table} SET {column} = NULL WHERE {column} = ''"))
+
+
+def downgrade() -> None:
+    """Downgrade schema. The original spelling of each email is not restored."""
+    pass
@@ -0,0 +1,41 @@
+"""Add rank-order indexes on leaderboard_totals for top-N reads
+
+Revision ID: 020_add_leaderboard_rank_indexes
+Revises: 019_normalize_customer_emails
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '020_add_leaderboard_rank_indexes'
+down_revision: Union[str, Sequence[str], None] = '019_normalize_customer_emails'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counters emptied by cancellations are now deleted rather than kept at zero
+    op.get_bind().execute(sa.text("DELETE FROM leaderboard_totals WHERE order_count <= 0"))
+
+    try:
+        op.create_index('ix_leaderboard_totals_revenue', 'leaderboard_totals',
+                        ['scope', 'period', 'revenue', 'order_count'], unique=False)
+    except Exception as e:
+        print(f"ix_leaderboard_totals_revenue creation skipped: {e}")
+    try:
+        op.create_index('ix_leaderboard_totals_orders', 'leaderboard_totals',
+                        ['scope', 'period', 'order_count', 'revenue'], unique=False)
+    except Exception as e:
+        print(f"ix_leaderboard_totals_orders creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leaderboard_totals_orders', table_name='leaderboard_totals')
+    op.drop_index('ix_leaderboard_totals_revenue', table_name='leaderboard_totals')
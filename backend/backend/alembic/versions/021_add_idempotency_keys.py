@@ -0,0 +1,41 @@
+"""Add idempotency_keys, shared by every worker
+
+Revision ID: 021_add_idempotency_keys
+Revises: 020_add_leaderboard_rank_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '021_add_idempotency_keys'
+down_revision: Union[str, Sequence[str], None] = '020_add_leaderboard_rank_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    try:
+        op.create_table(
+            'idempotency_keys',
+            sa.Column('scope', sa.String(length=50), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('fingerprint', sa.String(length=64), nullable=False),
+            sa.Column('response', sa.Text(), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('scope', 'key')
+        )
+        op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'], unique=False)
+    except Exception as e:
+        print(f"idempotency_keys table creation skipped: {e}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
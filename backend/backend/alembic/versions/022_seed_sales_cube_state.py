@@ -0,0 +1,34 @@
+"""Seed the sales_cube_state row every cube writer locks
+
+Revision ID: 022_seed_sales_cube_state
+Revises: 021_add_idempotency_keys
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '022_seed_sales_cube_state'
+down_revision: Union[str, Sequence[str], None] = '021_add_idempotency_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases that already ran a cube refresh have the row
+    op.get_bind().execute(sa.text(
+        "INSERT INTO sales_cube_state (id) "
+        "SELECT 1 FROM (SELECT 1 AS one) AS seed "
+        "WHERE NOT EXISTS (SELECT 1 FROM sales_cube_state WHERE id = 1)"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Nothing to undo: before 022 the row was created on first use anyway
+    pass
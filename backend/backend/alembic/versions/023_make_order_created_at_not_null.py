@@ -0,0 +1,42 @@
+"""Backfill and require orders.created_at, the keyset pagination column
+
+Revision ID: 023_make_order_created_at_not_null
+Revises: 022_seed_sales_cube_state
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '023_make_order_created_at_not_null'
+down_revision: Union[str, Sequence[str], None] = '022_seed_sales_cube_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['orders', 'orders_archive']
+
+# Legacy rows without a timestamp sort after every real order
+BACKFILL = '1970-01-01 00:00:00'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.get_bind().execute(
+            sa.text(f"UPDATE {table} SET created_at = :backfill WHERE created_at IS NULL"),
+            {"backfill": BACKFILL}
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
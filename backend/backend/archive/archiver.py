@@ -0,0 +1,115 @@
+"""Moves old orders, sales and enquiries into the *_archive tables.
+
+Run from the backend directory:
+
+    python -m backend.archive.archiver --days 365 --batch-size 1000
+
+Every batch is its own short transaction, so the job never holds locks on the
+hot tables for longer than it takes to move ARCHIVE_BATCH_SIZE rows.
+"""
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+from backend.core.config import settings
+from backend.database import SessionLocal
+from backend.models import Order, Sales, Enquiry, Invoice, OrderArchive, SalesArchive, EnquiryArchive
+from backend.sales.cube import refresh_cube
+
+
+def _copy_rows(db: Session, source, target, condition):
+    """INSERT INTO target (...) SELECT ... FROM source WHERE condition, over the source's columns."""
+    columns = [column.name for column in source.__table__.columns]
+    db.execute(
+        insert(target.__table__).from_select(
+            columns,
+            select(*[source.__table__.c[name] for name in columns]).where(condition)
+        )
+    )
+
+
+def _archive_order_batch(db: Session, cutoff: datetime, batch_size: int) -> tuple:
+    """Moves one batch of orders with their sales; returns (orders moved, sales moved)."""
+    # Invoiced orders stay hot (invoices reference them) as do open cancellation requests
+    order_ids = [
+        order_id for (order_id,) in db.query(Order.id)
+        .filter(
+            Order.created_at < cutoff,
+            func.coalesce(Order.cancellation_requested, 0) == 0,
+            ~exists().where(Invoice.order_id == Order.id)
+        )
+        .order_by(Order.created_at, Order.id)
+        .limit(batch_size)
+    ]
+    if not order_ids:
+        return 0, 0
+
+    # Parents first into the archive, children first out of the hot tables
+    _copy_rows(db, Order, OrderArchive, Order.id.in_(order_ids))
+    _copy_rows(db, Sales, SalesArchive, Sales.order_id.in_(order_ids))
+    sales_moved = db.execute(delete(Sales).where(Sales.order_id.in_(order_ids))).rowcount
+    db.execute(delete(Order).where(Order.id.in_(order_ids)))
+    db.commit()
+    return len(order_ids), sales_moved
+
+
+def _archive_batch(db: Session, model, archive_model, condition, order_column, batch_size: int) -> int:
+    ids = [row_id for (row_id,) in db.query(model.id).filter(condition).order_by(order_column).limit(batch_size)]
+    if not ids:
+        return 0
+
+    _copy_rows(db, model, archive_model, model.id.in_(ids))
+    db.execute(delete(model).where(model.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def archive_old_rows(db: Session, older_than_days: int = None, batch_size: int = None) -> dict:
+    """Archives everything older than the cutoff, batch by batch, and returns moved row counts."""
+    older_than_days = older_than_days or settings.ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = {"orders": 0, "sales": 0, "enquiries": 0}
+
+    # The cube only folds in from the hot sales table; make sure it has seen everything we move
+    refresh_cube(db)
+
+    while True:
+        count, sales_count = _archive_order_batch(db, cutoff, batch_size)
+        moved["orders"] += count
+        moved["sales"] += sales_count
+        if count < batch_size:
+            break
+
+    # Sales that never belonged to an order
+    while True:
+        count = _archive_batch(
+            db, Sales, SalesArchive,
+            (Sales.order_id.is_(None)) & (Sales.date < cutoff), Sales.date, batch_size
+        )
+        moved["sales"] += count
+        if count < batch_size:
+            break
+
+    while True:
+        count = _archive_batch(
+            db, Enquiry, EnquiryArchive, Enquiry.created_at < cutoff, Enquiry.created_at, batch_size
+        )
+        moved["enquiries"] += count
+        if count < batch_size:
+            break
+
+    return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old orders, sales and enquiries")
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Archive rows older than this many days")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="Rows moved per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Archived: {archive_old_rows(db, args.days, args.batch_size)}")
+    finally:
+        db.close()
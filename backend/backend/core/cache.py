@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Any, Optional
+from backend.core.config import settings
+
+
+class TTLCache:
+    """In-process cache for dashboard aggregates, with hit/miss counters.
+
+    Writers call invalidate() after they commit, so this worker never serves a
+    stale value. Other workers catch up when their entry's TTL runs out.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None on a miss or once the entry has expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        expires_at = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+
+    def invalidate(self, *prefixes: str):
+        """Drops every key starting with one of the prefixes (everything if none given)."""
+        with self._lock:
+            if prefixes:
+                stale = [key for key in self._entries if key.startswith(prefixes)]
+            else:
+                stale = list(self._entries)
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+aggregate_cache = TTLCache(settings.AGGREGATE_CACHE_TTL_SECONDS)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,4 +19,30 @@ class Settings:
     # Website domain for email links
     WEBSITE_DOMAIN: str = os.getenv("WEBSITE_DOMAIN", "http://localhost:3000")
 
+    # Idempotency-Key replay window, and how often expired keys are purged from the table
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "3600"))
+
+    # Orders, sales and enquiries older than this move to the *_archive tables
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+    # Upper bound on how stale a cached dashboard aggregate can get in another worker
+    AGGREGATE_CACHE_TTL_SECONDS: int = int(os.getenv("AGGREGATE_CACHE_TTL_SECONDS", "60"))
+
+    # How stale another worker's vendor type-ahead index can get before it is rebuilt
+    VENDOR_INDEX_TTL_SECONDS: int = int(os.getenv("VENDOR_INDEX_TTL_SECONDS", "300"))
+
+    # Pending invoices/vendor payments past due_date are marked Overdue this often (0 disables the loop)
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "3600"))
+    OVERDUE_BATCH_SIZE: int = int(os.getenv("OVERDUE_BATCH_SIZE", "1000"))
+
+    # New sales are folded into the sales cube this often (0 disables the loop)
+    CUBE_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("CUBE_REFRESH_INTERVAL_SECONDS", "300"))
+
+    # Rendered invoice PDFs; shared between workers, safe to wipe at any time
+    INVOICE_PDF_CACHE_DIR: str = os.getenv(
+        "INVOICE_PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bim-mills-invoice-pdfs")
+    )
+
 settings = Settings()
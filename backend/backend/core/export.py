@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from typing import Callable, Iterable, Iterator, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+from backend.database import SessionLocal
+
+# Rows fetched per server-side cursor round trip and written per response chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+
+def _csv_chunks(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=str))
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_export(build_query: Callable[[Session], Query], columns: Sequence[str], fmt: str, filename: str) -> StreamingResponse:
+    """Streams the rows of a column query as CSV or NDJSON.
+
+    The query runs on its own session with a server-side cursor (yield_per), so
+    only EXPORT_CHUNK_ROWS rows are held in memory at a time regardless of the
+    table size. The session lives exactly as long as the response body.
+    """
+    def rows() -> Iterator[tuple]:
+        db = SessionLocal()
+        try:
+            for row in build_query(db).yield_per(EXPORT_CHUNK_ROWS):
+                yield tuple(row)
+        finally:
+            db.close()
+
+    if fmt == "ndjson":
+        body, media_type = _ndjson_chunks(columns, rows()), "application/x-ndjson"
+    else:
+        body, media_type = _csv_chunks(columns, rows()), "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
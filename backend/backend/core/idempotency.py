@@ -0,0 +1,113 @@
+"""Idempotency-Key handling for the create endpoints, shared by every worker.
+
+Keys live in the idempotency_keys table, primary key (scope, key). The key row
+is inserted in the request's own session before the handler runs, so it commits
+in the same transaction as the write it guards: a retry routed to any worker
+either finds the key or waits on the unique index until the first attempt
+commits or rolls back. The JSON response is stored right after the handler
+returns and replayed for IDEMPOTENCY_TTL_SECONDS. Expired keys are purged every
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS (see main.py).
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from fastapi import Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.core.config import settings
+from backend.database import SessionLocal
+from backend.models import IdempotencyKey
+
+_MISSING = object()
+
+
+def idempotency_key_header(idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")) -> Optional[str]:
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-255 characters")
+    return idempotency_key
+
+
+def _stored_response(db: Session, scope: str, key: str, fingerprint: str) -> Any:
+    """The response to replay for a key already in the table, or _MISSING if there is none (or it expired)."""
+    entry = db.get(IdempotencyKey, (scope, key))
+    if entry is None:
+        return _MISSING
+    if entry.expires_at <= datetime.utcnow():
+        db.delete(entry)
+        db.flush()
+        return _MISSING
+    if entry.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+    if entry.response is None:
+        # Committed with its write but the response wasn't saved (the worker died in between)
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key was already processed")
+    return json.loads(entry.response)
+
+
+def run_idempotent(db: Session, scope: str, key: Optional[str], payload: Any, handler: Callable[[], Any]) -> Any:
+    """Runs handler once per (scope, key) across all workers and replays its JSON response afterwards.
+
+    Without a key the handler simply runs. The handler commits the key row
+    together with its write; if it raises before committing, the rollback drops
+    the key so the client can retry.
+    """
+    if not key:
+        return handler()
+
+    fingerprint = hashlib.sha256(
+        json.dumps(jsonable_encoder(payload), sort_keys=True).encode()
+    ).hexdigest()
+    cached = _stored_response(db, scope, key, fingerprint)
+    if cached is not _MISSING:
+        return cached
+
+    db.add(IdempotencyKey(
+        scope=scope, key=key, fingerprint=fingerprint,
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    ))
+    try:
+        # Blocks while another worker holds the same key uncommitted, then fails if it committed
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        cached = _stored_response(db, scope, key, fingerprint)
+        if cached is not _MISSING:
+            return cached
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+
+    try:
+        response = jsonable_encoder(handler())
+    except Exception:
+        db.rollback()
+        raise
+    entry = db.get(IdempotencyKey, (scope, key))
+    if entry is not None:
+        entry.response = json.dumps(response)
+        db.commit()
+    return response
+
+
+def purge_expired_keys() -> int:
+    """Deletes keys past their replay window; returns how many."""
+    db = SessionLocal()
+    try:
+        purged = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())).rowcount
+        db.commit()
+        return purged
+    finally:
+        db.close()
+
+
+async def run_key_purger(interval_seconds: int):
+    """Purges expired keys forever, every interval_seconds, off the event loop."""
+    while True:
+        try:
+            await run_in_threadpool(purge_expired_keys)
+        except Exception as e:
+            print(f"Idempotency key purge warning: {e}")
+        await asyncio.sleep(interval_seconds)
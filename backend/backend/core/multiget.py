@@ -0,0 +1,26 @@
+from typing import Iterable, List, Tuple
+from fastapi import HTTPException
+
+# Upper bound on ids per multi-get so the IN list stays a cheap index lookup
+MULTIGET_MAX_IDS = 200
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Parses ?ids=1,2,3 keeping the requested order and dropping duplicates."""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma separated list of integers")
+
+    unique_ids = list(dict.fromkeys(parsed))
+    if not unique_ids:
+        raise HTTPException(status_code=400, detail="ids is empty")
+    if len(unique_ids) > MULTIGET_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MULTIGET_MAX_IDS} ids per request")
+    return unique_ids
+
+
+def in_requested_order(rows: Iterable, ids: List[int]) -> Tuple[list, List[int]]:
+    """Lines rows up with the requested ids; returns (found rows, missing ids)."""
+    by_id = {row.id: row for row in rows}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
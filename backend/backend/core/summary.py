@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import extract, func
+from sqlalchemy.orm import Session
+
+
+def months_ago(months: int, now: Optional[datetime] = None) -> datetime:
+    """Start of the calendar month `months - 1` months before now (months=1 is this month)."""
+    now = now or datetime.utcnow()
+    index = now.year * 12 + now.month - 1 - (months - 1)
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def status_month_summary(db: Session, status_column, date_column, amount_column, months: int) -> dict:
+    """Count and amount totals of a ledger table, overall, per status and per month.
+
+    Everything is aggregated in SQL: one GROUP BY status over the whole table and
+    one GROUP BY (year, month, status) over the last `months` months.
+    """
+    by_status = [
+        {"status": status, "count": count, "amount": round(float(amount or 0), 2)}
+        for status, count, amount in db.query(status_column, func.count(), func.sum(amount_column))
+        .group_by(status_column).order_by(status_column)
+    ]
+
+    year, month = extract("year", date_column), extract("month", date_column)
+    by_month = {}
+    rows = db.query(year, month, status_column, func.count(), func.sum(amount_column)) \
+        .filter(date_column >= months_ago(months)) \
+        .group_by(year, month, status_column)
+    for row_year, row_month, status, count, amount in rows:
+        key = f"{int(row_year):04d}-{int(row_month):02d}"
+        entry = by_month.setdefault(key, {"month": key, "count": 0, "amount": 0.0, "by_status": {}})
+        entry["count"] += count
+        entry["amount"] = round(entry["amount"] + float(amount or 0), 2)
+        entry["by_status"][status] = {"count": count, "amount": round(float(amount or 0), 2)}
+
+    return {
+        "count": sum(s["count"] for s in by_status),
+        "amount": round(sum(s["amount"] for s in by_status), 2),
+        "by_status": by_status,
+        "by_month": [by_month[key] for key in sorted(by_month)]
+    }
@@ -0,0 +1,47 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+
+
+def upsert_increment(db: Session, model, keys: Dict, increments: Dict, values: Optional[Dict] = None):
+    """Inserts a counter row or adds to the existing one in a single statement.
+
+    keys identify the row (its primary key or a unique index), increments are
+    added to the stored columns and values simply overwrite them. Runs in the
+    caller's transaction, so the counter moves together with the write it tracks.
+    """
+    values = values or {}
+    upsert_increments(db, model, list(keys), list(increments), [{**keys, **increments, **values}], list(values))
+
+
+def upsert_increments(
+    db: Session, model, keys: List[str], increments: List[str], rows: List[Dict], values: Iterable[str] = ()
+):
+    """upsert_increment for many rows at once: one statement, executed as an executemany.
+
+    Every row carries all the named columns. Pass rows sorted by key so
+    concurrent writers lock them in the same order.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    values = list(values)
+
+    if db.get_bind().dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update({
+            **{column: table.c[column] + stmt.inserted[column] for column in increments},
+            **{column: stmt.inserted[column] for column in values}
+        })
+    else:
+        # SQLite for local runs; PostgreSQL speaks the same ON CONFLICT dialect
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                **{column: table.c[column] + stmt.excluded[column] for column in increments},
+                **{column: stmt.excluded[column] for column in values}
+            }
+        )
+    db.execute(stmt, rows)
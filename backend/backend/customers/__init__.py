@@ -0,0 +1 @@
+# Customers module
\ No newline at end of file
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from backend.database import get_db
+from backend.models import CustomerStats, Invoice
+from backend.customers.stats import customer_key
+from backend.payments.invoice_router import InvoiceResponse
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/api/customers", tags=["Customers"])
+
+
+# ============ SCHEMAS ============
+class CustomerResponse(BaseModel):
+    email: str
+    name: Optional[str]
+    order_count: int
+    lifetime_value: float
+    last_order_at: Optional[datetime]
+    open_cancellations: int
+    invoice_count: int
+    invoices: List[InvoiceResponse]
+
+
+# ============ ROUTES ============
+@router.get("/{email}", response_model=CustomerResponse)
+def get_customer(email: str, invoice_limit: int = Query(20, ge=0, le=200), db: Session = Depends(get_db)):
+    """Customer overview by email: primary-key read of customer_stats plus their latest invoices"""
+    key = customer_key(email)
+    stats = db.get(CustomerStats, key) if key else None
+    if not stats:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    invoices = []
+    if invoice_limit:
+        invoices = db.query(Invoice).filter(Invoice.customer_email == key) \
+            .order_by(Invoice.issue_date.desc()).limit(invoice_limit).all()
+
+    return {
+        "email": stats.email,
+        "name": stats.name,
+        "order_count": stats.order_count or 0,
+        "lifetime_value": round(stats.lifetime_value or 0, 2),
+        "last_order_at": stats.last_order_at,
+        "open_cancellations": stats.open_cancellations or 0,
+        "invoice_count": stats.invoice_count or 0,
+        "invoices": invoices
+    }
@@ -0,0 +1,106 @@
+"""Per-customer aggregates behind /api/customers/{email}.
+
+customer_stats is keyed on the email as customer_key() normalizes it, the form
+orders and invoices store it in, and moved in the same transaction as the
+order, cancellation and invoice writes it summarises.
+Rebuild from orders, orders_archive and invoices, from the backend directory:
+
+    python -m backend.customers.stats
+"""
+from collections import defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from backend.core.upsert import upsert_increment
+from backend.database import SessionLocal
+from backend.models import Order, OrderArchive, Invoice, CustomerStats
+
+
+def customer_key(email: Optional[str]) -> Optional[str]:
+    """Emails are stored and looked up trimmed and lower-cased (blank = none) on orders, invoices and stats."""
+    return email.strip().lower() if email and email.strip() else None
+
+
+def record_customer_orders(db: Session, orders: Iterable):
+    """Counts newly created orders towards their customers' totals."""
+    totals = defaultdict(lambda: [0, 0.0, None, None])
+    for order in orders:
+        email = customer_key(order.user_email)
+        if not email:
+            continue
+        total = totals[email]
+        total[0] += 1
+        total[1] += order.amount or 0
+        if order.created_at and (total[2] is None or order.created_at > total[2]):
+            total[2] = order.created_at
+        total[3] = order.user_name or total[3]
+
+    for email, (count, value, last_order_at, name) in sorted(totals.items()):
+        values = {"last_order_at": last_order_at}
+        if name:
+            values["name"] = name
+        upsert_increment(
+            db, CustomerStats,
+            keys={"email": email},
+            increments={"order_count": count, "lifetime_value": value},
+            values=values
+        )
+
+
+def remove_customer_order(db: Session, order: Order):
+    """Takes a cancelled order out of its customer's totals; call after it was deleted and flushed."""
+    email = customer_key(order.user_email)
+    if not email:
+        return
+    # Served by ix_orders_user_email_created_at / ix_orders_archive_user_email_created_at
+    last_order_at = db.query(func.max(Order.created_at)).filter(Order.user_email == email).scalar() \
+        or db.query(func.max(OrderArchive.created_at)).filter(OrderArchive.user_email == email).scalar()
+    upsert_increment(
+        db, CustomerStats,
+        keys={"email": email},
+        increments={
+            "order_count": -1,
+            "lifetime_value": -(order.amount or 0),
+            "open_cancellations": -1 if order.cancellation_requested else 0
+        },
+        values={"last_order_at": last_order_at}
+    )
+
+
+def record_cancellation_request(db: Session, email: Optional[str]):
+    email = customer_key(email)
+    if email:
+        upsert_increment(db, CustomerStats, keys={"email": email}, increments={"open_cancellations": 1})
+
+
+def record_invoice(db: Session, email: Optional[str], count: int = 1):
+    email = customer_key(email)
+    if email:
+        upsert_increment(db, CustomerStats, keys={"email": email}, increments={"invoice_count": count})
+
+
+def rebuild_customer_stats(db: Session):
+    """Recomputes every customer's row from orders, orders_archive and invoices."""
+    db.execute(delete(CustomerStats))
+    for model in (OrderArchive, Order):
+        record_customer_orders(db, db.query(model).yield_per(1000))
+    open_cancellations = db.query(Order.user_email, func.count()) \
+        .filter(Order.cancellation_requested == 1, Order.user_email.isnot(None)) \
+        .group_by(Order.user_email)
+    for email, count in open_cancellations:
+        upsert_increment(db, CustomerStats, keys={"email": customer_key(email)}, increments={"open_cancellations": count})
+    invoices = db.query(Invoice.customer_email, func.count()) \
+        .filter(Invoice.customer_email.isnot(None)) \
+        .group_by(Invoice.customer_email)
+    for email, count in invoices:
+        record_invoice(db, email, count)
+    db.commit()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_customer_stats(db)
+        print(f"Rebuilt customer_stats: {db.query(CustomerStats).count()} customers")
+    finally:
+        db.close()
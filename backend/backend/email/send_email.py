@@ -1,5 +1,12 @@
+import asyncio
+from typing import List, Tuple
 from fastapi_mail import FastMail, MessageSchema, MessageType
+from starlette.concurrency import run_in_threadpool
 from backend.email.email_config import email_conf
+from backend.metering.usage import meter_emails_sent
+
+# How many messages are handed to the SMTP server concurrently when sending in bulk
+EMAIL_BATCH_SIZE = 20
 
 
 async def send_user_email(to_email: str, html_content: str):
@@ -12,6 +19,7 @@ async def send_user_email(to_email: str, html_content: str):
 
     fm = FastMail(email_conf)
     await fm.send_message(message)
+    await run_in_threadpool(meter_emails_sent)
 
 
 async def send_order_confirmation(to_email: str, html_content: str):
@@ -24,6 +32,37 @@ async def send_order_confirmation(to_email: str, html_content: str):
 
     fm = FastMail(email_conf)
     await fm.send_message(message)
+    await run_in_threadpool(meter_emails_sent)
+
+
+async def send_order_confirmations(emails: List[Tuple[str, str]]):
+    """Send many order confirmations, EMAIL_BATCH_SIZE at a time.
+
+    Takes (to_email, html_content) pairs. A failed address does not stop the rest
+    of the batch from going out.
+    """
+    fm = FastMail(email_conf)
+    for start in range(0, len(emails), EMAIL_BATCH_SIZE):
+        batch = emails[start:start + EMAIL_BATCH_SIZE]
+        messages = [
+            MessageSchema(
+                subject="✅ Order Received Successfully | BIM Mills",
+                recipients=[to_email],
+                body=html_content,
+                subtype=MessageType.html,
+            )
+            for to_email, html_content in batch
+        ]
+        results = await asyncio.gather(
+            *(fm.send_message(message) for message in messages),
+            return_exceptions=True
+        )
+        for (to_email, _), result in zip(batch, results):
+            if isinstance(result, Exception):
+                print(f"Order confirmation to {to_email} failed: {result}")
+        await run_in_threadpool(
+            meter_emails_sent, sum(not isinstance(result, Exception) for result in results)
+        )
 
 
 async def send_cancellation_confirmation(to_email: str, html_content: str):
@@ -36,6 +75,7 @@ async def send_cancellation_confirmation(to_email: str, html_content: str):
 
     fm = FastMail(email_conf)
     await fm.send_message(message)
+    await run_in_threadpool(meter_emails_sent)
 
 
 
@@ -49,6 +89,7 @@ async def send_admin_email(to_email: str, html_content: str):
 
     fm = FastMail(email_conf)
     await fm.send_message(message)
+    await run_in_threadpool(meter_emails_sent)
 
 
 async def send_custom_email(to_email: str, subject: str, html_content: str):
@@ -61,3 +102,4 @@ async def send_custom_email(to_email: str, subject: str, html_content: str):
 
     fm = FastMail(email_conf)
     await fm.send_message(message)
+    await run_in_threadpool(meter_emails_sent)
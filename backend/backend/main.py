@@ -1,6 +1,8 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.database import Base, engine
+from backend.core.config import settings
 from backend.auth.auth_router import router as auth_router
 from backend.user.user_router import router as user_router
 from backend.admin.admin_router import router as admin_router
@@ -10,6 +12,12 @@ from backend.sales.sales_router import router as sales_router
 from backend.payments.invoice_router import router as invoice_router
 from backend.payments.vendor_router import router as vendor_router
 from backend.payments.vendor_payment_router import router as vendor_payment_router
+from backend.payments.import_router import router as import_router
+from backend.customers.customer_router import router as customer_router
+from backend.reports.reports_router import router as reports_router
+from backend.payments.overdue import run_overdue_sweeper
+from backend.sales.cube import run_cube_refresher
+from backend.core.idempotency import run_key_purger
 
 app = FastAPI()
 
@@ -20,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -131,6 +140,51 @@ def run_migrations():
         print(f"Startup task warning: {e}")
 
 
+@app.on_event("startup")
+async def start_overdue_sweeper():
+    # Every worker runs the loop; the sweep's DB lock lets one of them do the work each time
+    if settings.OVERDUE_SWEEP_INTERVAL_SECONDS > 0:
+        app.state.overdue_sweeper = asyncio.create_task(
+            run_overdue_sweeper(settings.OVERDUE_SWEEP_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_overdue_sweeper():
+    sweeper = getattr(app.state, "overdue_sweeper", None)
+    if sweeper:
+        sweeper.cancel()
+
+
+@app.on_event("startup")
+async def start_cube_refresher():
+    # Every worker runs the loop; the cube's lock row makes concurrent refreshes take turns
+    if settings.CUBE_REFRESH_INTERVAL_SECONDS > 0:
+        app.state.cube_refresher = asyncio.create_task(
+            run_cube_refresher(settings.CUBE_REFRESH_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_cube_refresher():
+    refresher = getattr(app.state, "cube_refresher", None)
+    if refresher:
+        refresher.cancel()
+
+
+@app.on_event("startup")
+async def start_key_purger():
+    if settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS > 0:
+        app.state.key_purger = asyncio.create_task(run_key_purger(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS))
+
+
+@app.on_event("shutdown")
+async def stop_key_purger():
+    purger = getattr(app.state, "key_purger", None)
+    if purger:
+        purger.cancel()
+
+
 
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -141,6 +195,9 @@ app.include_router(sales_router)
 app.include_router(invoice_router)
 app.include_router(vendor_router)
 app.include_router(vendor_payment_router)
+app.include_router(import_router)
+app.include_router(customer_router)
+app.include_router(reports_router)
 
 @app.get("/")
 def home():
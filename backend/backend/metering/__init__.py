@@ -0,0 +1 @@
+# Metering module
\ No newline at end of file
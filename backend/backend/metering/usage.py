@@ -0,0 +1,109 @@
+"""Usage metering: per-month counters of what the platform processed.
+
+Orders and revenue count the orders that stand, live or archived, in the month
+they were placed: cancelling (deleting) an order takes it back out, so the
+counters always match what rebuild_usage() recomputes. Each write path meters
+inside its own transaction, emails are metered once sent. Backfill orders,
+revenue and invoices (emails can't be recovered), from the backend directory:
+
+    python -m backend.metering.usage
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from backend.core.upsert import upsert_increment
+from backend.database import SessionLocal
+from backend.models import Order, OrderArchive, Invoice, UsageCounter
+
+ORDERS_PROCESSED = "orders_processed"
+REVENUE_PROCESSED = "revenue_processed"
+INVOICES_ISSUED = "invoices_issued"
+EMAILS_SENT = "emails_sent"
+METRICS = (ORDERS_PROCESSED, REVENUE_PROCESSED, INVOICES_ISSUED, EMAILS_SENT)
+
+
+def period_of(at: Optional[datetime] = None) -> str:
+    return (at or datetime.utcnow()).strftime("%Y-%m")
+
+
+def meter(db: Session, usage: Dict[str, float], at: Optional[datetime] = None):
+    """Adds {metric: amount} to the counters of at's period (default now) in the caller's transaction."""
+    period = period_of(at)
+    for metric, amount in sorted(usage.items()):
+        if amount:
+            upsert_increment(db, UsageCounter, keys={"period": period, "metric": metric}, increments={"value": amount})
+
+
+def meter_orders(db: Session, orders: Iterable, sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) orders from the counters of the month each was placed in."""
+    by_period = defaultdict(list)
+    for order in orders:
+        by_period[period_of(order.created_at)].append(order)
+    for period, placed in sorted(by_period.items()):
+        meter(db, {
+            ORDERS_PROCESSED: sign * len(placed),
+            REVENUE_PROCESSED: sign * sum(order.amount or 0 for order in placed)
+        }, at=placed[0].created_at)
+
+
+def meter_emails_sent(count: int = 1):
+    """Meters sent emails in a session of its own; runs after the request, so failures are only logged."""
+    if not count:
+        return
+    db = SessionLocal()
+    try:
+        meter(db, {EMAILS_SENT: count})
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Email metering failed: {e}")
+    finally:
+        db.close()
+
+
+def usage_by_period(db: Session, periods: int = 12) -> List[dict]:
+    """The latest `periods` months that have usage, newest first; one row per month."""
+    recent = [
+        period for (period,) in db.query(UsageCounter.period).distinct()
+        .order_by(UsageCounter.period.desc()).limit(periods)
+    ]
+    rows = db.query(UsageCounter.period, UsageCounter.metric, UsageCounter.value) \
+        .filter(UsageCounter.period.in_(recent)).all() if recent else []
+
+    usage = {period: {"period": period, **{metric: 0 for metric in METRICS}} for period in recent}
+    for period, metric, value in rows:
+        usage[period][metric] = value
+    return [usage[period] for period in recent]
+
+
+def usage_totals(db: Session) -> Dict[str, float]:
+    totals = {metric: 0 for metric in METRICS}
+    totals.update(dict(db.query(UsageCounter.metric, func.sum(UsageCounter.value)).group_by(UsageCounter.metric)))
+    return totals
+
+
+def rebuild_usage(db: Session):
+    """Recomputes order, revenue and invoice counters from orders, orders_archive and invoices."""
+    usage = defaultdict(lambda: defaultdict(float))
+    for model in (OrderArchive, Order):
+        for created_at, amount in db.query(model.created_at, model.amount).yield_per(1000):
+            usage[period_of(created_at)][ORDERS_PROCESSED] += 1
+            usage[period_of(created_at)][REVENUE_PROCESSED] += amount or 0
+    for (issue_date,) in db.query(Invoice.issue_date).yield_per(1000):
+        usage[period_of(issue_date)][INVOICES_ISSUED] += 1
+
+    db.execute(delete(UsageCounter).where(UsageCounter.metric != EMAILS_SENT))
+    for period, metrics in sorted(usage.items()):
+        db.add_all([UsageCounter(period=period, metric=metric, value=value) for metric, value in metrics.items()])
+    db.commit()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_usage(db)
+        print(f"Rebuilt usage_counters: {db.query(UsageCounter).count()} counters")
+    finally:
+        db.close()
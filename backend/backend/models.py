@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Float, ForeignKey, Index, DDL, event
+from sqlalchemy.orm import relationship
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -55,13 +56,14 @@ class ReadymadeProduct(Base):
     quantity = Column(String(255), nullable=False)
     quality = Column(String(255), nullable=False)
     price = Column(Integer, nullable=True)
+    stock = Column(Integer, nullable=True)  # Units on hand; NULL = stock not tracked
 
 class Order(Base):
     __tablename__ = "orders"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user_name = Column(String(255), nullable=True)
-    user_email = Column(String(255), nullable=True)
+    user_email = Column(String(255), nullable=True)  # Trimmed, lower-cased; see customers.stats.customer_key
     user_phone = Column(String(255), nullable=True)
     user_address = Column(String(1000), nullable=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=True)
@@ -70,17 +72,105 @@ class Order(Base):
     quantity = Column(String(255), nullable=True)
     quality = Column(String(255), nullable=True)
     amount = Column(Float, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Keyset pagination column; never NULL
     cancellation_requested = Column(Integer, default=0)  # 0=no, 1=yes
+    reserved_units = Column(Integer, default=0)  # Taken from readymade_products.stock, returned on cancel
+
+    # Keyset pagination seeks on (created_at, id); each listing filter gets its own prefix
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_email_created_at", "user_email", "created_at", "id"),
+        Index("ix_orders_product_id_created_at", "product_id", "created_at", "id"),
+        Index("ix_orders_readymade_product_id_created_at", "readymade_product_id", "created_at", "id"),
+        Index("ix_orders_cancellation_created_at", "cancellation_requested", "created_at", "id"),
+    )
 
 class Sales(Base):
     __tablename__ = "sales"
     id = Column(Integer, primary_key=True)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     amount = Column(Float, nullable=False)
     day = Column(String(20), nullable=True)
     transaction_id = Column(String(255), nullable=False, unique=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    in_cube = Column(Integer, nullable=False, default=0, index=True)  # 1 once folded into sales_cube
+
+
+class SalesDailyRollup(Base):
+    """Sales totals per calendar day, updated in the same transaction as every Sales insert/delete"""
+    __tablename__ = "sales_daily_rollup"
+    sale_date = Column(Date, primary_key=True)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    sales_count = Column(Integer, nullable=False, default=0)
+
+
+class SalesCube(Base):
+    """Sales pre-aggregated by month and product, folded in from new Sales rows by backend.sales.cube"""
+    __tablename__ = "sales_cube"
+    period = Column(String(7), primary_key=True)  # YYYY-MM
+    product_id = Column(Integer, primary_key=True, default=0)  # 0 = not a fabric product
+    readymade_product_id = Column(Integer, primary_key=True, default=0)  # 0 = not a readymade product
+    product_name = Column(String(255), nullable=True)
+    category = Column(String(255), nullable=False, index=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    sales_count = Column(Integer, nullable=False, default=0)
+
+
+class SalesCubeState(Base):
+    """Single row every cube writer locks first, so refreshes, rebuilds and order deletes take turns"""
+    __tablename__ = "sales_cube_state"
+    id = Column(Integer, primary_key=True)
+
+
+# Databases built with create_all get the row too (migrations seed it in 022)
+event.listen(SalesCubeState.__table__, "after_create", DDL("INSERT INTO sales_cube_state (id) VALUES (1)"))
+
+
+class LeaderboardTotal(Base):
+    """Running order totals per product or customer, per day/month/all time; see backend.sales.leaderboard"""
+    __tablename__ = "leaderboard_totals"
+    scope = Column(String(20), primary_key=True)  # product, customer
+    period = Column(String(10), primary_key=True)  # YYYY-MM-DD, YYYY-MM or "all"
+    entity_key = Column(String(255), primary_key=True)  # readymade:<id>, name:<product name> or customer email
+    label = Column(String(255), nullable=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Top-N for one scope and period, read in rank order: see leaderboard.top_n
+        Index("ix_leaderboard_totals_revenue", "scope", "period", "revenue", "order_count"),
+        Index("ix_leaderboard_totals_orders", "scope", "period", "order_count", "revenue"),
+    )
+
+
+class IdempotencyKey(Base):
+    """Idempotency-Key of a create request and its stored response; see backend.core.idempotency"""
+    __tablename__ = "idempotency_keys"
+    scope = Column(String(50), primary_key=True)  # orders, orders-bulk, invoices, ...
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of the request body
+    response = Column(Text, nullable=True)  # JSON; NULL until the handler has returned
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class CustomerStats(Base):
+    """Per-customer totals keyed on lower-cased email; see backend.customers.stats"""
+    __tablename__ = "customer_stats"
+    email = Column(String(255), primary_key=True)
+    name = Column(String(255), nullable=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    lifetime_value = Column(Float, nullable=False, default=0.0)
+    last_order_at = Column(DateTime, nullable=True)
+    open_cancellations = Column(Integer, nullable=False, default=0)
+    invoice_count = Column(Integer, nullable=False, default=0)
+
+
+class UsageCounter(Base):
+    """Monthly usage meters (orders, revenue, invoices, emails); see backend.metering.usage"""
+    __tablename__ = "usage_counters"
+    period = Column(String(7), primary_key=True)  # YYYY-MM
+    metric = Column(String(50), primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
 
 
 class Employee(Base):
@@ -99,9 +189,9 @@ class Invoice(Base):
     __tablename__ = "invoices"
     id = Column(Integer, primary_key=True)
     invoice_number = Column(String(255), unique=True, nullable=False, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     customer_name = Column(String(255), nullable=False)
-    customer_email = Column(String(255), nullable=True)
+    customer_email = Column(String(255), nullable=True, index=True)  # Trimmed, lower-cased like orders.user_email
     customer_address = Column(String(1000), nullable=True)
     customer_phone = Column(String(255), nullable=True)
     product_name = Column(String(255), nullable=True)
@@ -111,13 +201,18 @@ class Invoice(Base):
     tax_rate = Column(Float, default=0.0)  # GST or tax percentage
     tax_amount = Column(Float, default=0.0)
     total_amount = Column(Float, nullable=False)
-    payment_status = Column(String(50), default="Paid")  # Paid, Pending, Overdue
+    payment_status = Column(String(50), default="Paid", index=True)  # Paid, Pending, Overdue
     payment_method = Column(String(100), nullable=True)
     issue_date = Column(DateTime, default=datetime.utcnow)
     due_date = Column(DateTime, nullable=True)
     notes = Column(String(1000), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Aging report: unpaid invoices bucketed by due_date ranges
+        Index("ix_invoices_due_date_status", "due_date", "payment_status"),
+    )
+
 
 class Vendor(Base):
     """Vendors and dealers we pay"""
@@ -130,7 +225,7 @@ class Vendor(Base):
     phone = Column(String(255), nullable=True)
     address = Column(String(1000), nullable=True)
     vendor_type = Column(String(100), nullable=True)  # Supplier, Dealer, Service Provider
-    gstin = Column(String(50), nullable=True)
+    gstin = Column(String(50), nullable=True, unique=True, index=True)  # Trimmed, upper-cased; bulk import upserts on it
     pan = Column(String(50), nullable=True)
     bank_account = Column(String(255), nullable=True)
     bank_name = Column(String(255), nullable=True)
@@ -144,15 +239,89 @@ class VendorPayment(Base):
     __tablename__ = "vendor_payments"
     id = Column(Integer, primary_key=True)
     vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
+    vendor = relationship("Vendor")  # Eager-load (joinedload) when serializing many payments
     payment_number = Column(String(255), unique=True, nullable=False, index=True)
     description = Column(String(500), nullable=True)
     amount = Column(Float, nullable=False)
     payment_method = Column(String(100), nullable=True)  # Bank Transfer, Cash, Cheque, UPI
     payment_date = Column(DateTime, default=datetime.utcnow)
     due_date = Column(DateTime, nullable=True)
-    status = Column(String(50), default="Pending")  # Pending, Paid, Overdue, Cancelled
+    status = Column(String(50), default="Pending", index=True)  # Pending, Paid, Overdue, Cancelled
     reference_number = Column(String(255), nullable=True)  # Transaction/Cheque number
     bill_reference = Column(String(255), nullable=True)  # Vendor bill/invoice number
     notes = Column(String(1000), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Aging report: open payments bucketed by due_date ranges
+        Index("ix_vendor_payments_due_date_status", "due_date", "status"),
+    )
+
+
+class VendorBalance(Base):
+    """Per-vendor payment totals, moved with every vendor payment write; see backend.payments.vendor_balances"""
+    __tablename__ = "vendor_balances"
+    vendor_id = Column(Integer, primary_key=True)
+    total_amount = Column(Float, nullable=False, default=0.0)  # Everything not cancelled
+    payment_count = Column(Integer, nullable=False, default=0)
+    paid_amount = Column(Float, nullable=False, default=0.0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    outstanding_amount = Column(Float, nullable=False, default=0.0)  # Still owed: Pending, Overdue, ...
+    outstanding_count = Column(Integer, nullable=False, default=0)
+    overdue_amount = Column(Float, nullable=False, default=0.0)
+    overdue_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+
+# --- Archive tables: cold copies of old rows moved out by backend.archive.archiver ---
+
+class OrderArchive(Base):
+    """Orders older than the archive cutoff; same columns as orders"""
+    __tablename__ = "orders_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Keeps the original order id
+    user_id = Column(Integer, nullable=True)
+    user_name = Column(String(255), nullable=True)
+    user_email = Column(String(255), nullable=True)  # Trimmed, lower-cased; see customers.stats.customer_key
+    user_phone = Column(String(255), nullable=True)
+    user_address = Column(String(1000), nullable=True)
+    product_id = Column(Integer, nullable=True)
+    readymade_product_id = Column(Integer, nullable=True)
+    product_name = Column(String(255), nullable=True)
+    quantity = Column(String(255), nullable=True)
+    quality = Column(String(255), nullable=True)
+    amount = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    cancellation_requested = Column(Integer, default=0)
+    reserved_units = Column(Integer, default=0)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_orders_archive_created_at_id", "created_at", "id"),
+        Index("ix_orders_archive_user_email_created_at", "user_email", "created_at", "id"),
+    )
+
+
+class SalesArchive(Base):
+    """Sales rows moved out together with their order"""
+    __tablename__ = "sales_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    date = Column(DateTime, nullable=True, index=True)
+    amount = Column(Float, nullable=False)
+    day = Column(String(20), nullable=True)
+    transaction_id = Column(String(255), nullable=False, unique=True)
+    order_id = Column(Integer, ForeignKey("orders_archive.id"), nullable=True)
+    in_cube = Column(Integer, nullable=False, default=0)  # Carried over from sales
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EnquiryArchive(Base):
+    __tablename__ = "enquiries_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, nullable=True, index=True)
+    name = Column(String(255), nullable=False)
+    phone = Column(String(20), nullable=False)
+    company = Column(String(255), nullable=True)
+    email = Column(String(255), nullable=False)
+    message = Column(String(1000), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
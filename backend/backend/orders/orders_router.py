@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, insert, select
 from datetime import datetime
-from typing import Optional
-from backend.database import get_db
-from backend.models import Order, Sales, ReadymadeProduct
-from backend.email.send_email import send_order_confirmation, send_cancellation_confirmation
+from typing import List, Optional
+from backend.database import get_db, get_async_db
+from backend.models import Order, Sales, ReadymadeProduct, OrderArchive
+from backend.core.pagination import encode_cursor, decode_cursor
+from backend.core.idempotency import idempotency_key_header, run_idempotent
+from backend.core.export import stream_export, EXPORT_FORMAT_PATTERN
+from backend.core.multiget import parse_ids, in_requested_order
+from backend.shop.inventory import order_units, reserve_stock, release_stock
+from backend.sales.rollup import record_sales
+from backend.sales.cube import remove_order_from_cube
+from backend.sales.leaderboard import record_orders
+from backend.metering.usage import meter_orders
+from backend.customers.stats import customer_key, record_customer_orders, remove_customer_order, record_cancellation_request
+from backend.core.cache import aggregate_cache
+from backend.email.send_email import send_order_confirmation, send_order_confirmations, send_cancellation_confirmation
 from backend.email.templates import order_confirmation_template, cancellation_confirmation_template
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
 
@@ -24,6 +37,9 @@ class OrderCreate(BaseModel):
     quality: Optional[str] = None
     amount: Optional[float] = None
 
+class BulkOrderCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=1000)
+
 class OrderResponse(BaseModel):
     id: int
     user_name: str
@@ -37,23 +53,11 @@ class OrderResponse(BaseModel):
 
 # ============ ENDPOINTS ============
 
-@router.post("/", status_code=201)
-def create_order(order_data: OrderCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """Create a new order from shop checkout"""
-    
-    # Validate product exists (if readymade_product_id provided)
-    if order_data.readymade_product_id:
-        product = db.query(ReadymadeProduct).filter(
-            ReadymadeProduct.id == order_data.readymade_product_id
-        ).first()
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-    
-    # Create order
-    new_order = Order(
+def _new_order(order_data: OrderCreate, created_at: datetime, reserved_units: int = 0) -> Order:
+    return Order(
         user_id=order_data.user_id,
         user_name=order_data.user_name,
-        user_email=order_data.user_email,
+        user_email=customer_key(order_data.user_email),
         user_phone=order_data.user_phone,
         user_address=order_data.user_address,
         readymade_product_id=order_data.readymade_product_id,
@@ -62,37 +66,93 @@ def create_order(order_data: OrderCreate, background_tasks: BackgroundTasks, db:
         quantity=order_data.quantity,
         quality=order_data.quality,
         amount=order_data.amount,
-        created_at=datetime.utcnow()
+        created_at=created_at,
+        reserved_units=reserved_units
+    )
+
+
+def _sales_row(order_id: int, amount: Optional[float], sold_at: datetime) -> dict:
+    return {
+        "amount": amount or 0,
+        "transaction_id": f"TXN-{order_id}-{sold_at.timestamp()}",
+        "order_id": order_id,
+        "date": sold_at,
+        "day": sold_at.strftime("%A")
+    }
+
+
+def _confirmation_email(order_data: OrderCreate, order_id: int) -> str:
+    return order_confirmation_template(
+        name=order_data.user_name,
+        order_id=order_id,
+        products=order_data.product_name,
+        quantity=order_data.quantity,
+        phone=order_data.user_phone,
+        address=order_data.user_address,
+        amount=order_data.amount or 0
+    )
+
+
+@router.post("/", status_code=201)
+def create_order(
+    order_data: OrderCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
+    """Create a new order from shop checkout.
+
+    A retry carrying the same Idempotency-Key gets the original response back
+    without a second order, sales row or confirmation email.
+    """
+    return run_idempotent(
+        db, "orders", idempotency_key, order_data,
+        lambda: _create_order(order_data, background_tasks, db)
     )
+
+
+def _create_order(order_data: OrderCreate, background_tasks: BackgroundTasks, db: Session) -> dict:
+    # Validate product exists (if readymade_product_id provided)
+    reserved_units = 0
+    if order_data.readymade_product_id:
+        product = db.query(ReadymadeProduct).filter(
+            ReadymadeProduct.id == order_data.readymade_product_id
+        ).first()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+        # Reserve stock in this transaction; rolled back with it if anything below fails
+        if product.stock is not None:
+            try:
+                units = order_units(order_data.quantity)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if not reserve_stock(db, product.id, units):
+                raise HTTPException(status_code=409, detail="Insufficient stock")
+            reserved_units = units
+    
+    # Create order
+    new_order = _new_order(order_data, datetime.utcnow(), reserved_units)
     
     db.add(new_order)
     db.flush()  # Get the ID without committing yet
     
     # Create corresponding sales record
-    sales = Sales(
-        amount=order_data.amount or 0,
-        transaction_id=f"TXN-{new_order.id}-{datetime.utcnow().timestamp()}",
-        order_id=new_order.id,
-        date=datetime.utcnow(),
-        day=datetime.utcnow().strftime("%A")
-    )
+    sales = Sales(**_sales_row(new_order.id, order_data.amount, datetime.utcnow()))
     
     db.add(sales)
+    record_sales(db, [(sales.date, sales.amount)])
+    record_orders(db, [new_order])
+    record_customer_orders(db, [new_order])
+    meter_orders(db, [new_order])
     db.commit()
     db.refresh(new_order)
+    aggregate_cache.invalidate("analytics", "billing")
     
     # Send confirmation email in background
-    if order_data.user_email:
-        email_html = order_confirmation_template(
-            name=order_data.user_name,
-            order_id=new_order.id,
-            products=order_data.product_name,
-            quantity=order_data.quantity,
-            phone=order_data.user_phone,
-            address=order_data.user_address,
-            amount=order_data.amount or 0
-        )
-        background_tasks.add_task(send_order_confirmation, order_data.user_email, email_html)
+    if new_order.user_email:
+        email_html = _confirmation_email(order_data, new_order.id)
+        background_tasks.add_task(send_order_confirmation, new_order.user_email, email_html)
     
     return {
         "id": new_order.id,
@@ -105,46 +165,234 @@ def create_order(order_data: OrderCreate, background_tasks: BackgroundTasks, db:
     }
 
 
+@router.post("/bulk", status_code=201)
+def create_orders_bulk(
+    payload: BulkOrderCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
+    """Create a batch of orders in a single transaction.
+
+    All referenced readymade products are checked with one IN query, sales rows
+    are inserted with a single executemany and everything is committed once.
+    Items referencing unknown products are reported and skipped; the rest are
+    created. Results come back in request order.
+    """
+    return run_idempotent(
+        db, "orders-bulk", idempotency_key, payload,
+        lambda: _create_orders_bulk(payload, background_tasks, db)
+    )
+
+
+def _create_orders_bulk(payload: BulkOrderCreate, background_tasks: BackgroundTasks, db: Session) -> dict:
+    product_ids = {o.readymade_product_id for o in payload.orders if o.readymade_product_id}
+    product_stock = {}  # id -> stock (None when not tracked)
+    if product_ids:
+        product_stock = dict(
+            db.query(ReadymadeProduct.id, ReadymadeProduct.stock).filter(ReadymadeProduct.id.in_(product_ids))
+        )
+
+    now = datetime.utcnow()
+    results = [None] * len(payload.orders)
+    pending = []  # (index, order_data, Order)
+    for index, order_data in enumerate(payload.orders):
+        product_id = order_data.readymade_product_id
+        if product_id and product_id not in product_stock:
+            results[index] = {"index": index, "status": "error", "detail": "Product not found"}
+            continue
+        reserved_units = 0
+        if product_id and product_stock[product_id] is not None:
+            try:
+                units = order_units(order_data.quantity)
+            except ValueError as e:
+                results[index] = {"index": index, "status": "error", "detail": str(e)}
+                continue
+            if not reserve_stock(db, product_id, units):
+                results[index] = {"index": index, "status": "error", "detail": "Insufficient stock"}
+                continue
+            reserved_units = units
+        pending.append((index, order_data, _new_order(order_data, now, reserved_units)))
+
+    emails = []
+    if pending:
+        db.add_all([order for _, _, order in pending])
+        db.flush()  # Assigns order IDs; MySQL has no RETURNING so these can't come from an executemany
+        sales_rows = [_sales_row(order.id, order.amount, now) for _, _, order in pending]
+        db.execute(insert(Sales), sales_rows)
+        record_sales(db, [(row["date"], row["amount"]) for row in sales_rows])
+        record_orders(db, [order for _, _, order in pending])
+        record_customer_orders(db, [order for _, _, order in pending])
+        meter_orders(db, [order for _, _, order in pending])
+
+        for index, order_data, order in pending:
+            results[index] = {"index": index, "status": "created", "id": order.id}
+            if order.user_email:
+                emails.append((order.user_email, _confirmation_email(order_data, order.id)))
+        db.commit()
+        aggregate_cache.invalidate("analytics", "billing")
+
+    if emails:
+        background_tasks.add_task(send_order_confirmations, emails)
+
+    return {
+        "created": len(pending),
+        "failed": len(payload.orders) - len(pending),
+        "results": results,
+        "message": "Bulk order processed"
+    }
+
+
+def _serialize_order(o: Order) -> dict:
+    return {
+        "id": o.id,
+        "user_name": o.user_name,
+        "user_email": o.user_email,
+        "user_phone": o.user_phone,
+        "user_address": o.user_address,
+        "product_name": o.product_name,
+        "quantity": o.quantity,
+        "amount": o.amount,
+        "created_at": o.created_at,
+        "cancellation_requested": o.cancellation_requested
+    }
+
+
+def _order_page_query(
+    model,
+    limit: int,
+    cursor: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    user_email: Optional[str],
+    product_id: Optional[int],
+    readymade_product_id: Optional[int],
+    cancellation_requested: Optional[bool]
+):
+    """One keyset page (plus a look-ahead row) of orders or archived orders."""
+    query = select(model)
+    if date_from:
+        query = query.where(model.created_at >= date_from)
+    if date_to:
+        query = query.where(model.created_at < date_to)
+    if customer_key(user_email):
+        query = query.where(model.user_email == customer_key(user_email))
+    if product_id is not None:
+        query = query.where(model.product_id == product_id)
+    if readymade_product_id is not None:
+        query = query.where(model.readymade_product_id == readymade_product_id)
+    if cancellation_requested is not None:
+        query = query.where(model.cancellation_requested == (1 if cancellation_requested else 0))
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor)
+        query = query.where(or_(
+            model.created_at < last_created_at,
+            and_(model.created_at == last_created_at, model.id < last_id)
+        ))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
 @router.get("/", response_model=list)
-def get_all_orders(db: Session = Depends(get_db)):
-    """Get all orders"""
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
-    return [
-        {
-            "id": o.id,
-            "user_name": o.user_name,
-            "user_email": o.user_email,
-            "user_phone": o.user_phone,
-            "user_address": o.user_address,
-            "product_name": o.product_name,
-            "quantity": o.quantity,
-            "amount": o.amount,
-            "created_at": o.created_at,
-            "cancellation_requested": o.cancellation_requested
-        }
-        for o in orders
-    ]
+async def get_all_orders(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    user_email: Optional[str] = None,
+    product_id: Optional[int] = None,
+    readymade_product_id: Optional[int] = None,
+    cancellation_requested: Optional[bool] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get orders newest first, one keyset page at a time.
+
+    Pages are seeked on (created_at, id) so every page costs the same no matter
+    how deep it is. The cursor for the next page is sent in the X-Next-Cursor
+    header and is absent on the last page. With include_archived the same page
+    is also read from orders_archive and the two are merged.
+    """
+    filters = dict(
+        limit=limit, cursor=cursor, date_from=date_from, date_to=date_to,
+        user_email=user_email, product_id=product_id,
+        readymade_product_id=readymade_product_id,
+        cancellation_requested=cancellation_requested
+    )
+    orders = (await db.execute(_order_page_query(Order, **filters))).scalars().all()
+    if include_archived:
+        archived = (await db.execute(_order_page_query(OrderArchive, **filters))).scalars().all()
+        orders = sorted(
+            [*orders, *archived],
+            key=lambda o: (o.created_at, o.id),
+            reverse=True
+        )
+
+    if len(orders) > limit:
+        orders = orders[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    return [_serialize_order(o) for o in orders]
+
+
+ORDER_EXPORT_COLUMNS = [
+    "id", "created_at", "user_name", "user_email", "user_phone", "user_address",
+    "product_id", "readymade_product_id", "product_name", "quantity", "quality",
+    "amount", "cancellation_requested"
+]
+
+
+@router.get("/export")
+def export_orders(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    include_archived: bool = False
+):
+    """Stream orders (oldest first) as CSV or NDJSON for accounting"""
+    def model_query(db: Session, model):
+        query = db.query(*[getattr(model, column) for column in ORDER_EXPORT_COLUMNS])
+        if date_from:
+            query = query.filter(model.created_at >= date_from)
+        if date_to:
+            query = query.filter(model.created_at < date_to)
+        return query
+
+    def build_query(db: Session):
+        query = model_query(db, Order)
+        if include_archived:
+            query = query.union_all(model_query(db, OrderArchive))
+        return query.order_by(Order.created_at, Order.id)
+
+    return stream_export(build_query, ORDER_EXPORT_COLUMNS, format, "orders")
+
+
+@router.get("/batch")
+def get_orders_batch(ids: str, include_archived: bool = False, db: Session = Depends(get_db)):
+    """Get several orders by ID (?ids=1,2,3) with one IN query, in the requested order"""
+    order_ids = parse_ids(ids)
+    orders = db.query(Order).filter(Order.id.in_(order_ids)).all()
+    found, missing = in_requested_order(orders, order_ids)
+    if missing and include_archived:
+        archived = db.query(OrderArchive).filter(OrderArchive.id.in_(missing)).all()
+        found, missing = in_requested_order([*orders, *archived], order_ids)
+
+    return {
+        "items": [_serialize_order(o) for o in found],
+        "missing": missing
+    }
 
 
 @router.get("/{order_id}")
-def get_order(order_id: int, db: Session = Depends(get_db)):
+def get_order(order_id: int, include_archived: bool = False, db: Session = Depends(get_db)):
     """Get specific order by ID"""
     order = db.query(Order).filter(Order.id == order_id).first()
+    if not order and include_archived:
+        order = db.query(OrderArchive).filter(OrderArchive.id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    return {
-        "id": order.id,
-        "user_name": order.user_name,
-        "user_email": order.user_email,
-        "user_phone": order.user_phone,
-        "user_address": order.user_address,
-        "product_name": order.product_name,
-        "quantity": order.quantity,
-        "amount": order.amount,
-        "created_at": order.created_at,
-        "cancellation_requested": order.cancellation_requested
-    }
+    return _serialize_order(order)
 
 class CancellationRequest(BaseModel):
     email: str
@@ -157,10 +405,12 @@ def request_cancellation(order_id: int, request: CancellationRequest, db: Sessio
         raise HTTPException(status_code=404, detail="Order not found")
     
     # Verify email matches
-    if order.user_email != request.email:
+    if not order.user_email or order.user_email != customer_key(request.email):
         raise HTTPException(status_code=403, detail="Email does not match order")
     
     # Mark as cancellation requested
+    if not order.cancellation_requested:
+        record_cancellation_request(db, order.user_email)
     order.cancellation_requested = 1
     db.commit()
     db.refresh(order)
@@ -188,12 +438,24 @@ def delete_order(order_id: int, background_tasks: BackgroundTasks, db: Session =
         "message": "Order cancelled successfully"
     }
     
-    # Delete associated sales records first
+    # Delete associated sales records first, taking them out of the daily rollup and cube
+    remove_order_from_cube(db, order_id)
+    sold = db.query(Sales.date, Sales.amount).filter(Sales.order_id == order_id).all()
     db.query(Sales).filter(Sales.order_id == order_id).delete()
+    record_sales(db, sold, sign=-1)
+
+    # Return any reserved stock
+    if order.readymade_product_id and order.reserved_units:
+        release_stock(db, order.readymade_product_id, order.reserved_units)
     
     # Delete the order
+    record_orders(db, [order], sign=-1)
+    meter_orders(db, [order], sign=-1)
     db.delete(order)
+    db.flush()
+    remove_customer_order(db, order)
     db.commit()
+    aggregate_cache.invalidate("analytics", "billing")
     
     # Send cancellation confirmation email
     if order.user_email:
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+from typing import List
+from backend.database import get_db
+from backend.core.cache import aggregate_cache
+from backend.payments.vendor_search import vendor_index
+from backend.payments.vendor_import import FORMATS, file_format, read_rows, import_vendors, import_vendor_payments
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/api/import", tags=["Import"])
+
+
+# ============ SCHEMAS ============
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ImportReport(BaseModel):
+    rows: int
+    inserted: int
+    updated: int
+    error_count: int
+    errors: List[ImportRowError]
+
+
+def _run_import(importer, file: UploadFile, db: Session) -> dict:
+    fmt = file_format(file.filename)
+    if not fmt:
+        raise HTTPException(status_code=400, detail=f"Upload a {' or '.join(FORMATS)} file")
+    try:
+        return importer(db, read_rows(file.file, fmt))
+    except UnicodeDecodeError:
+        # Batches before the bad byte are already committed
+        db.rollback()
+        raise HTTPException(status_code=400, detail="CSV files must be UTF-8 encoded")
+
+
+# ============ ROUTES ============
+@router.post("/vendors", response_model=ImportReport)
+def import_vendors_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Import vendors from a CSV/XLSX file with VendorCreate columns, upserting on gstin"""
+    try:
+        return _run_import(import_vendors, file, db)
+    finally:
+        # Rebuilt from the table on the next type-ahead lookup
+        vendor_index.invalidate()
+
+
+@router.post("/vendor-payments", response_model=ImportReport)
+def import_vendor_payments_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Import vendor payments from a CSV/XLSX file with VendorPaymentCreate columns (vendor_id or vendor_gstin)"""
+    try:
+        report = _run_import(import_vendor_payments, file, db)
+    finally:
+        # Batches already committed show up in the summaries even if a later one failed
+        aggregate_cache.invalidate("vendor-payments", "reports")
+    return report
@@ -0,0 +1,176 @@
+"""Invoice PDFs, rendered once per invoice version and cached on disk.
+
+Files are named {invoice_id}-{content hash}.pdf under INVOICE_PDF_CACHE_DIR.
+The hash covers every field printed on the document, so a stale file can never
+be served for a changed invoice; invalidate_invoice_pdf() just reclaims space.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import textwrap
+from pathlib import Path
+from typing import List, Tuple
+from backend.core.config import settings
+from backend.models import Invoice
+
+# Bump when the layout changes so every cached file is re-rendered
+RENDER_VERSION = 2
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+WRAP_CHARS = 95  # Roughly what fits between the margins at 10pt Helvetica
+
+FIELDS = (
+    "invoice_number", "order_id", "customer_name", "customer_email", "customer_address", "customer_phone",
+    "product_name", "quantity", "quality", "subtotal", "tax_rate", "tax_amount", "total_amount",
+    "payment_status", "payment_method", "issue_date", "due_date", "notes"
+)
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.INVOICE_PDF_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def content_hash(invoice: Invoice) -> str:
+    """Short digest of everything rendered onto the invoice; doubles as its ETag."""
+    content = {field: getattr(invoice, field) for field in FIELDS}
+    content["render_version"] = RENDER_VERSION
+    raw = json.dumps(content, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:20]
+
+
+def _pdf_text(value) -> str:
+    """Escapes text for a PDF string literal; the built-in fonts only cover Latin-1."""
+    text = str(value).replace("₹", "Rs. ")
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _money(amount) -> str:
+    return f"Rs. {amount or 0:,.2f}"
+
+
+def _date(value) -> str:
+    return value.strftime("%d %b %Y") if value else "-"
+
+
+def _lines(invoice: Invoice) -> List[Tuple[str, int, str]]:
+    """(font, size, text) for each line of the document, top to bottom."""
+    lines = [
+        ("F2", 20, "BIM Mills"),
+        ("F1", 10, "Tax Invoice"),
+        ("F1", 10, ""),
+        ("F2", 11, f"Invoice {invoice.invoice_number}"),
+        ("F1", 10, f"Order #{invoice.order_id}"),
+        ("F1", 10, f"Issued: {_date(invoice.issue_date)}    Due: {_date(invoice.due_date)}"),
+        ("F1", 10, ""),
+        ("F2", 11, "Bill to"),
+        ("F1", 10, invoice.customer_name or "-"),
+    ]
+    for detail in (invoice.customer_address, invoice.customer_email, invoice.customer_phone):
+        if detail:
+            lines.append(("F1", 10, detail))
+    lines += [
+        ("F1", 10, ""),
+        ("F2", 11, "Item"),
+        ("F1", 10, invoice.product_name or "-"),
+        ("F1", 10, f"Quantity: {invoice.quantity or '-'}    Quality: {invoice.quality or '-'}"),
+        ("F1", 10, ""),
+        ("F1", 10, f"Subtotal: {_money(invoice.subtotal)}"),
+        ("F1", 10, f"Tax ({invoice.tax_rate or 0:g}%): {_money(invoice.tax_amount)}"),
+        ("F2", 12, f"Total: {_money(invoice.total_amount)}"),
+        ("F1", 10, ""),
+        ("F1", 10, f"Payment status: {invoice.payment_status or '-'}"),
+        ("F1", 10, f"Payment method: {invoice.payment_method or '-'}"),
+    ]
+    if invoice.notes:
+        lines += [("F1", 10, ""), ("F1", 10, f"Notes: {invoice.notes}")]
+    return lines
+
+
+def _pages(invoice: Invoice) -> List[List[str]]:
+    """Text drawing commands for each page; a line that would run into the bottom margin starts a new page."""
+    pages, commands, y = [], [], PAGE_HEIGHT - MARGIN
+    for font, size, text in _lines(invoice):
+        for part in textwrap.wrap(text, WRAP_CHARS) or [""]:
+            if y - (size + 6) < MARGIN:
+                pages.append(commands)
+                commands, y = [], PAGE_HEIGHT - MARGIN
+            y -= size + 6
+            commands.append(f"/{font} {size} Tf 1 0 0 1 {MARGIN} {y} Tm ({_pdf_text(part)}) Tj")
+    pages.append(commands)
+    if len(pages) > 1:
+        for number, page in enumerate(pages, start=1):
+            footer = f"Invoice {invoice.invoice_number} - page {number} of {len(pages)}"
+            page.append(f"/F1 8 Tf 1 0 0 1 {MARGIN} {MARGIN // 2} Tm ({_pdf_text(footer)}) Tj")
+    return pages
+
+
+def render_invoice_pdf(invoice: Invoice) -> bytes:
+    """A PDF 1.4 document using the standard Helvetica fonts (no extra dependency), as many A4 pages as it takes."""
+    pages = _pages(invoice)
+    # 1 catalog, 2 page tree, 3-4 fonts, then a page object and its content stream per page
+    kids = " ".join(f"{5 + 2 * index} 0 R" for index in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    for index, commands in enumerate(pages):
+        stream = "\n".join(["BT", *commands, "ET"]).encode("latin-1")
+        objects += [
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {6 + 2 * index} 0 R >>".encode(),
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        ]
+
+    pdf = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def cached_invoice_pdf(invoice: Invoice) -> Tuple[Path, str]:
+    """Path of the invoice's PDF, rendering it only if this version isn't cached yet; returns (path, hash)."""
+    digest = content_hash(invoice)
+    path = _cache_dir() / f"{invoice.id}-{digest}.pdf"
+    if path.exists():
+        return path, digest
+
+    # Write-then-rename so concurrent downloads never see a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as tmp:
+        tmp.write(render_invoice_pdf(invoice))
+    os.replace(tmp_path, path)
+
+    # Older versions of this invoice can't be served any more
+    for stale in path.parent.glob(f"{invoice.id}-*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path, digest
+
+
+def invalidate_invoice_pdf(invoice_id: int):
+    """Deletes every cached PDF of an invoice."""
+    for cached in _cache_dir().glob(f"{invoice_id}-*.pdf"):
+        cached.unlink(missing_ok=True)
+
+
+def invalidate_invoice_pdfs(invoice_ids):
+    """Deletes the cached PDFs of many invoices with a single directory scan."""
+    wanted = {str(invoice_id) for invoice_id in invoice_ids}
+    if not wanted:
+        return
+    for cached in _cache_dir().glob("*.pdf"):
+        if cached.name.split("-", 1)[0] in wanted:
+            cached.unlink(missing_ok=True)
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from datetime import datetime
 from typing import List, Optional
 from backend.database import get_db
 from backend.models import Invoice, Order
-from pydantic import BaseModel
+from backend.core.idempotency import idempotency_key_header, run_idempotent
+from backend.core.multiget import parse_ids, in_requested_order
+from backend.customers.stats import customer_key, record_invoice
+from backend.metering.usage import meter, INVOICES_ISSUED
+from backend.core.cache import aggregate_cache
+from backend.core.summary import status_month_summary
+from backend.payments.invoice_pdf import cached_invoice_pdf, content_hash, invalidate_invoice_pdf, invalidate_invoice_pdfs
+from backend.payments.tax import recompute_tax, TAX_CHUNK_SIZE
+from pydantic import BaseModel, Field
 import uuid
 
 router = APIRouter(prefix="/api/invoices", tags=["Invoices"])
@@ -46,64 +56,234 @@ class InvoiceResponse(BaseModel):
         from_attributes = True
 
 
+class InvoiceBatchResponse(BaseModel):
+    items: List[InvoiceResponse]
+    missing: List[int]
+
+
+class InvoiceBatchCreate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=500)
+    tax_rate: Optional[float] = 0.0
+    payment_method: Optional[str] = None
+    payment_status: Optional[str] = "Pending"
+    due_date: Optional[datetime] = None
+    notes: Optional[str] = None
+
+
+class InvoiceBatchResult(BaseModel):
+    created: List[InvoiceResponse]
+    already_invoiced: List[int]
+    missing: List[int]
+
+
+class PendingOrderResponse(BaseModel):
+    id: int
+    user_name: Optional[str]
+    user_email: Optional[str]
+    product_name: Optional[str]
+    quantity: Optional[str]
+    amount: Optional[float]
+    created_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class TaxRecompute(BaseModel):
+    tax_rate: float = Field(..., ge=0, le=100)
+    issued_from: Optional[datetime] = None
+    issued_to: Optional[datetime] = None
+    payment_status: Optional[List[str]] = None
+    invoice_ids: Optional[List[int]] = None
+    dry_run: bool = True
+    chunk_size: int = Field(TAX_CHUNK_SIZE, ge=100, le=50000)
+
+
 class StatusUpdate(BaseModel):
     status: str
 
 
 # ============ ROUTES ============
 @router.post("/generate", response_model=InvoiceResponse)
-def generate_invoice(invoice_data: InvoiceCreate, db: Session = Depends(get_db)):
-    """Generate an invoice when a customer pays"""
+def generate_invoice(
+    invoice_data: InvoiceCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
+    """Generate an invoice when a customer pays (replayed for a repeated Idempotency-Key)"""
+    return run_idempotent(
+        db, "invoices", idempotency_key, invoice_data,
+        lambda: _generate_invoice(invoice_data, db)
+    )
+
+
+def _calculate_amounts(subtotal: float, tax_rate: float) -> dict:
+    """Subtotal, tax and total for an invoice; tax_rate is a percentage (e.g. 18 for GST)"""
+    tax_amount = (subtotal * tax_rate) / 100
+    return {
+        "subtotal": subtotal,
+        "tax_rate": tax_rate,
+        "tax_amount": tax_amount,
+        "total_amount": subtotal + tax_amount
+    }
+
+
+def _invoice_values(order: Order, invoice_data) -> dict:
+    """Column values for a new invoice of `order`; invoice_data carries tax/payment settings"""
+    # Generate unique invoice number
+    invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    now = datetime.utcnow()
+    return {
+        "invoice_number": invoice_number,
+        "order_id": order.id,
+        "customer_name": order.user_name or "Guest Customer",
+        "customer_email": customer_key(order.user_email),
+        "customer_address": order.user_address,
+        "customer_phone": order.user_phone,
+        "product_name": order.product_name,
+        "quantity": order.quantity,
+        "quality": order.quality,
+        **_calculate_amounts(order.amount or 0.0, invoice_data.tax_rate or 0.0),
+        "payment_status": invoice_data.payment_status or "Pending",  # Admin sets status
+        "payment_method": invoice_data.payment_method,
+        "issue_date": now,
+        "due_date": invoice_data.due_date,
+        "notes": invoice_data.notes,
+        "created_at": now
+    }
+
+
+def _generate_invoice(invoice_data: InvoiceCreate, db: Session) -> InvoiceResponse:
     # Fetch the order
     order = db.query(Order).filter(Order.id == invoice_data.order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Calculate amounts
-    subtotal = order.amount or 0.0
-    tax_rate = invoice_data.tax_rate or 0.0
-    tax_amount = (subtotal * tax_rate) / 100
-    total_amount = subtotal + tax_amount
-    
-    # Generate unique invoice number
-    invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
-    
     # Create invoice
-    invoice = Invoice(
-        invoice_number=invoice_number,
-        order_id=order.id,
-        customer_name=order.user_name or "Guest Customer",
-        customer_email=order.user_email,
-        customer_address=order.user_address,
-        customer_phone=order.user_phone,
-        product_name=order.product_name,
-        quantity=order.quantity,
-        quality=order.quality,
-        subtotal=subtotal,
-        tax_rate=tax_rate,
-        tax_amount=tax_amount,
-        total_amount=total_amount,
-        payment_status=invoice_data.payment_status or "Pending",  # Admin sets status
-        payment_method=invoice_data.payment_method,
-        issue_date=datetime.utcnow(),
-        due_date=invoice_data.due_date,
-        notes=invoice_data.notes
-    )
+    invoice = Invoice(**_invoice_values(order, invoice_data))
     
     db.add(invoice)
+    record_invoice(db, invoice.customer_email)
+    meter(db, {INVOICES_ISSUED: 1})
     db.commit()
     db.refresh(invoice)
+    aggregate_cache.invalidate("billing", "invoices", "reports")
     
-    return invoice
+    return InvoiceResponse.model_validate(invoice)
+
+
+@router.post("/generate-batch", response_model=InvoiceBatchResult)
+def generate_invoices_batch(
+    batch: InvoiceBatchCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
+    """Invoice many orders in one transaction with a single bulk insert.
+
+    Orders that already have an invoice are skipped and reported, as are
+    unknown order IDs. All invoices share the batch's tax and payment settings.
+    """
+    return run_idempotent(
+        db, "invoices-batch", idempotency_key, batch,
+        lambda: _generate_invoices_batch(batch, db)
+    )
+
+
+def _generate_invoices_batch(batch: InvoiceBatchCreate, db: Session) -> dict:
+    order_ids = list(dict.fromkeys(batch.order_ids))
+    orders = {o.id: o for o in db.query(Order).filter(Order.id.in_(order_ids))}
+    invoiced = {
+        order_id for (order_id,) in
+        db.query(Invoice.order_id).filter(Invoice.order_id.in_(list(orders))).distinct()
+    } if orders else set()
+
+    rows = [_invoice_values(orders[order_id], batch) for order_id in order_ids
+            if order_id in orders and order_id not in invoiced]
+    created = []
+    if rows:
+        db.execute(insert(Invoice), rows)
+        for row in rows:
+            record_invoice(db, row["customer_email"])
+        meter(db, {INVOICES_ISSUED: len(rows)})
+        db.commit()
+        aggregate_cache.invalidate("billing", "invoices", "reports")
+        # MySQL has no RETURNING; read the new rows back by their unique numbers
+        created = db.query(Invoice).filter(
+            Invoice.invoice_number.in_([row["invoice_number"] for row in rows])
+        ).order_by(Invoice.id).all()
+
+    return {
+        "created": [InvoiceResponse.model_validate(invoice) for invoice in created],
+        "already_invoiced": [order_id for order_id in order_ids if order_id in invoiced],
+        "missing": [order_id for order_id in order_ids if order_id not in orders]
+    }
+
+
+@router.post("/recompute-tax")
+def recompute_invoice_tax(request: TaxRecompute, db: Session = Depends(get_db)):
+    """Apply a new tax rate to the filtered invoices in bulk (dry run by default).
+
+    Recomputes tax_amount and total_amount from subtotal in set-based UPDATEs,
+    chunk_size invoices per transaction, and reports the old/new totals with a
+    sample of per-invoice diffs. Only invoices whose amounts would change count.
+    """
+    report = recompute_tax(
+        db, request.tax_rate, request.issued_from, request.issued_to,
+        request.payment_status, request.invoice_ids, request.dry_run, request.chunk_size
+    )
+    updated_ids = report.pop("updated_ids")
+    if updated_ids:
+        invalidate_invoice_pdfs(updated_ids)
+        aggregate_cache.invalidate("billing", "invoices", "reports")
+    return report
+
+
+@router.get("/summary")
+def get_invoices_summary(months: int = Query(12, ge=1, le=120), db: Session = Depends(get_db)):
+    """Invoice count and total_amount overall, by payment_status and by issue month, aggregated in SQL"""
+    cache_key = f"invoices:summary:{months}"
+    cached = aggregate_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = status_month_summary(db, Invoice.payment_status, Invoice.issue_date, Invoice.total_amount, months)
+    aggregate_cache.set(cache_key, result)
+    return result
+
+
+@router.get("/pending-orders", response_model=List[PendingOrderResponse])
+def get_pending_orders(limit: int = Query(200, ge=1, le=1000), db: Session = Depends(get_db)):
+    """Orders with an amount but no invoice yet, newest first.
+
+    An anti-join (LEFT JOIN ... WHERE invoices.id IS NULL) resolved per order
+    through ix_invoices_order_id, so neither list has to be downloaded.
+    """
+    return db.query(Order) \
+        .outerjoin(Invoice, Invoice.order_id == Order.id) \
+        .filter(Invoice.id.is_(None), Order.amount > 0) \
+        .order_by(Order.created_at.desc(), Order.id.desc()) \
+        .limit(limit).all()
 
 
 @router.get("/", response_model=List[InvoiceResponse])
-def list_invoices(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all invoices"""
-    invoices = db.query(Invoice).order_by(Invoice.created_at.desc()).offset(skip).limit(limit).all()
+def list_invoices(skip: int = 0, limit: int = 100, payment_status: Optional[str] = None, db: Session = Depends(get_db)):
+    """List all invoices, optionally only those with one payment_status (e.g. Overdue)"""
+    query = db.query(Invoice)
+    if payment_status:
+        query = query.filter(Invoice.payment_status == payment_status)
+    invoices = query.order_by(Invoice.created_at.desc()).offset(skip).limit(limit).all()
     return invoices
 
 
+@router.get("/batch", response_model=InvoiceBatchResponse)
+def get_invoices_batch(ids: str, db: Session = Depends(get_db)):
+    """Get several invoices by ID (?ids=1,2,3) with one IN query, in the requested order"""
+    invoice_ids = parse_ids(ids)
+    invoices = db.query(Invoice).filter(Invoice.id.in_(invoice_ids)).all()
+    found, missing = in_requested_order(invoices, invoice_ids)
+    return {"items": found, "missing": missing}
+
+
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
     """Get a specific invoice by ID"""
@@ -113,6 +293,34 @@ def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
     return invoice
 
 
+@router.get("/{invoice_id}/pdf")
+def get_invoice_pdf(
+    invoice_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Invoice as a PDF, rendered once per invoice version and then served from the disk cache.
+
+    The ETag is the invoice's content hash, so If-None-Match revalidation gets a
+    304 without rendering or touching the file; Range / If-Range requests are honoured.
+    """
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+
+    etag = f'"{content_hash(invoice)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+
+    path, _ = cached_invoice_pdf(invoice)
+    return FileResponse(
+        path, media_type="application/pdf", filename=f"{invoice.invoice_number}.pdf", headers=headers
+    )
+
+
 @router.get("/order/{order_id}", response_model=List[InvoiceResponse])
 def get_invoices_by_order(order_id: int, db: Session = Depends(get_db)):
     """Get invoices for a specific order"""
@@ -130,5 +338,7 @@ def update_invoice_status(invoice_id: int, status_update: StatusUpdate, db: Sess
     invoice.payment_status = status_update.status
     db.commit()
     db.refresh(invoice)
+    invalidate_invoice_pdf(invoice.id)
+    aggregate_cache.invalidate("billing", "invoices", "reports")
     
     return invoice
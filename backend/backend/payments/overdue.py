@@ -0,0 +1,129 @@
+"""Marks Pending invoices and vendor payments Overdue once their due_date has passed.
+
+Runs in-process every OVERDUE_SWEEP_INTERVAL_SECONDS (see main.py), on demand
+from POST /admin/overdue-sweep, or from the backend directory:
+
+    python -m backend.payments.overdue
+
+Each table is swept in chunks of OVERDUE_BATCH_SIZE rows, one set-based UPDATE
+and one transaction per chunk. A MySQL named lock (GET_LOCK) keeps the sweep to
+one worker at a time; the others skip their turn instead of waiting.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.core.cache import aggregate_cache
+from backend.core.config import settings
+from backend.database import engine
+from backend.models import Invoice, VendorPayment
+from backend.payments.invoice_pdf import invalidate_invoice_pdfs
+from backend.payments.vendor_balances import move_payments
+
+PENDING, OVERDUE = "Pending", "Overdue"
+
+LOCK_NAME = "bim_mills_overdue_sweep"
+
+
+def _try_lock(conn) -> bool:
+    if conn.dialect.name != "mysql":
+        return True  # SQLite for local runs: a single process
+    # Timeout 0: if another worker is sweeping, don't queue up behind it
+    acquired = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": LOCK_NAME}).scalar() == 1
+    conn.commit()
+    return acquired
+
+
+def _unlock(conn):
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+        conn.commit()
+
+
+def _mark_overdue(db: Session, model, status_column, columns: list, now: datetime, batch_size: int,
+                  on_chunk: Callable[[Session, list], None]) -> int:
+    """Flips Pending rows past due to Overdue a chunk at a time (keyset over id); returns rows changed.
+
+    The chunk is selected FOR UPDATE so a concurrent status change can't slip in
+    between the SELECT and the UPDATE; on_chunk runs in the same transaction.
+    """
+    marked, last_id = 0, 0
+    while True:
+        rows = db.query(model.id, *columns).filter(
+            status_column == PENDING,
+            model.due_date < now,
+            model.id > last_id
+        ).order_by(model.id).limit(batch_size).with_for_update().all()
+        if not rows:
+            return marked
+        ids = [row.id for row in rows]
+        db.execute(
+            update(model).where(model.id.in_(ids)).values({status_column: OVERDUE})
+            .execution_options(synchronize_session=False)
+        )
+        on_chunk(db, rows)
+        db.commit()
+        marked += len(ids)
+        last_id = ids[-1]
+
+
+def _vendor_payments_chunk(db: Session, rows: list):
+    move_payments(db, ((row.vendor_id, row.amount, PENDING, OVERDUE) for row in rows))
+
+
+def _invoices_chunk(db: Session, rows: list):
+    # The status is printed on the PDF
+    invalidate_invoice_pdfs(row.id for row in rows)
+
+
+def sweep_overdue(batch_size: int = settings.OVERDUE_BATCH_SIZE, now: Optional[datetime] = None) -> dict:
+    """One sweep over vendor_payments and invoices; reports how many rows changed."""
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    report = {"skipped": False, "vendor_payments": 0, "invoices": 0}
+
+    # GET_LOCK belongs to a connection, so every chunk runs on this one
+    with engine.connect() as conn:
+        if not _try_lock(conn):
+            report["skipped"] = True
+        else:
+            db = Session(bind=conn)
+            try:
+                report["vendor_payments"] = _mark_overdue(
+                    db, VendorPayment, VendorPayment.status, [VendorPayment.vendor_id, VendorPayment.amount],
+                    now, batch_size, _vendor_payments_chunk
+                )
+                report["invoices"] = _mark_overdue(
+                    db, Invoice, Invoice.payment_status, [], now, batch_size, _invoices_chunk
+                )
+            finally:
+                db.close()
+                _unlock(conn)
+
+    if report["vendor_payments"] or report["invoices"]:
+        aggregate_cache.invalidate("billing", "invoices", "vendor-payments", "reports")
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+async def run_overdue_sweeper(interval_seconds: int):
+    """Sweeps forever, every interval_seconds, off the event loop."""
+    while True:
+        try:
+            report = await run_in_threadpool(sweep_overdue)
+            if report["vendor_payments"] or report["invoices"]:
+                print(f"Overdue sweep: {report}")
+        except Exception as e:
+            print(f"Overdue sweep warning: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mark Pending invoices and vendor payments past due as Overdue")
+    parser.add_argument("--batch-size", type=int, default=settings.OVERDUE_BATCH_SIZE, help="Rows updated per transaction")
+    args = parser.parse_args()
+    print(sweep_overdue(batch_size=args.batch_size))
@@ -0,0 +1,158 @@
+"""Bulk tax recomputation for invoices, e.g. after a GST rate change.
+
+Sets tax_rate on every matching invoice and recomputes tax_amount and
+total_amount from subtotal with the same formula as generate_invoice, as
+set-based UPDATEs over chunks of invoice ids. Dry runs report what would change
+without writing. From the backend directory:
+
+    python -m backend.payments.tax --rate 12 --issued-from 2026-01-01 --apply
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Invoice
+
+TAX_CHUNK_SIZE = 5000
+DIFF_SAMPLE_SIZE = 50
+
+# Float columns: anything closer than this already has the right amounts
+TOLERANCE = 0.005
+
+
+def _new_tax_amount(tax_rate: float):
+    return Invoice.subtotal * tax_rate / 100
+
+
+def _conditions(
+    tax_rate: float,
+    issued_from: Optional[datetime],
+    issued_to: Optional[datetime],
+    payment_status: Optional[List[str]],
+    invoice_ids: Optional[List[int]]
+) -> list:
+    """Filters selecting the invoices that match and would actually change."""
+    conditions = [or_(
+        Invoice.tax_rate.is_(None),
+        Invoice.tax_rate != tax_rate,
+        func.abs(func.coalesce(Invoice.tax_amount, 0) - _new_tax_amount(tax_rate)) > TOLERANCE,
+        func.abs(Invoice.total_amount - Invoice.subtotal - _new_tax_amount(tax_rate)) > TOLERANCE
+    )]
+    if issued_from:
+        conditions.append(Invoice.issue_date >= issued_from)
+    if issued_to:
+        conditions.append(Invoice.issue_date < issued_to)
+    if payment_status:
+        conditions.append(Invoice.payment_status.in_(payment_status))
+    if invoice_ids:
+        conditions.append(Invoice.id.in_(invoice_ids))
+    return conditions
+
+
+def recompute_tax(
+    db: Session,
+    tax_rate: float,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+    payment_status: Optional[List[str]] = None,
+    invoice_ids: Optional[List[int]] = None,
+    dry_run: bool = True,
+    chunk_size: int = TAX_CHUNK_SIZE
+) -> dict:
+    """Recomputes tax for the filtered invoices and returns a diff report.
+
+    The report totals come from one aggregate query and the per-invoice diff is a
+    sample of the first DIFF_SAMPLE_SIZE changes. Unless dry_run, invoices are
+    then updated chunk by chunk (keyset over id), each chunk its own transaction.
+    Returns the ids updated under "updated_ids" for callers that need them.
+    """
+    started = time.perf_counter()
+    condition = and_(*_conditions(tax_rate, issued_from, issued_to, payment_status, invoice_ids))
+    new_total = Invoice.subtotal + _new_tax_amount(tax_rate)
+
+    matched, old_sum, new_sum = db.query(
+        func.count(Invoice.id), func.sum(Invoice.total_amount), func.sum(new_total)
+    ).filter(condition).one()
+    sample = [
+        {
+            "id": row.id,
+            "invoice_number": row.invoice_number,
+            "subtotal": row.subtotal,
+            "old_tax_rate": row.tax_rate,
+            "new_tax_rate": tax_rate,
+            "old_tax_amount": row.tax_amount,
+            "new_tax_amount": round(row.new_tax_amount, 2),
+            "old_total_amount": row.total_amount,
+            "new_total_amount": round(row.new_total_amount, 2)
+        }
+        for row in db.query(
+            Invoice.id, Invoice.invoice_number, Invoice.subtotal, Invoice.tax_rate, Invoice.tax_amount,
+            Invoice.total_amount, _new_tax_amount(tax_rate).label("new_tax_amount"),
+            new_total.label("new_total_amount")
+        ).filter(condition).order_by(Invoice.id).limit(DIFF_SAMPLE_SIZE)
+    ]
+
+    updated_ids, chunks = [], 0
+    if not dry_run and matched:
+        last_id = 0
+        while True:
+            ids = [
+                invoice_id for (invoice_id,) in db.query(Invoice.id)
+                .filter(condition, Invoice.id > last_id)
+                .order_by(Invoice.id).limit(chunk_size)
+            ]
+            if not ids:
+                break
+            db.execute(
+                update(Invoice).where(Invoice.id.in_(ids)).values(
+                    tax_rate=tax_rate,
+                    tax_amount=_new_tax_amount(tax_rate),
+                    total_amount=Invoice.subtotal + _new_tax_amount(tax_rate)
+                ).execution_options(synchronize_session=False)
+            )
+            db.commit()
+            updated_ids += ids
+            chunks += 1
+            last_id = ids[-1]
+
+    old_sum, new_sum = float(old_sum or 0), float(new_sum or 0)
+    return {
+        "dry_run": dry_run,
+        "tax_rate": tax_rate,
+        "matched": matched,
+        "updated": len(updated_ids),
+        "chunks": chunks,
+        "old_total_amount": round(old_sum, 2),
+        "new_total_amount": round(new_sum, 2),
+        "delta": round(new_sum - old_sum, 2),
+        "sample": sample,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "updated_ids": updated_ids
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute invoice tax at a new rate")
+    parser.add_argument("--rate", type=float, required=True, help="New tax rate in percent, e.g. 18")
+    parser.add_argument("--issued-from", type=datetime.fromisoformat, help="Only invoices issued on/after this date")
+    parser.add_argument("--issued-to", type=datetime.fromisoformat, help="Only invoices issued before this date")
+    parser.add_argument("--status", action="append", help="Only invoices with this payment status (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=TAX_CHUNK_SIZE, help="Invoices updated per transaction")
+    parser.add_argument("--apply", action="store_true", help="Write the changes (default is a dry run)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = recompute_tax(
+            db, args.rate, args.issued_from, args.issued_to, args.status,
+            dry_run=not args.apply, chunk_size=args.chunk_size
+        )
+        report.pop("updated_ids")
+        for diff in report.pop("sample"):
+            print(diff)
+        print(report)
+    finally:
+        db.close()
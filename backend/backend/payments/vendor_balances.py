@@ -0,0 +1,143 @@
+"""Per-vendor payment totals kept in step with vendor_payments.
+
+Every create, update (including status changes such as Pending -> Paid) and
+delete of a vendor payment moves the vendor's row in the same transaction.
+Rebuild from vendor_payments, from the backend directory:
+
+    python -m backend.payments.vendor_balances
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from backend.core.upsert import upsert_increment, upsert_increments
+from backend.database import SessionLocal
+from backend.models import VendorPayment, VendorBalance
+
+PAID, OVERDUE, CANCELLED = "Paid", "Overdue", "Cancelled"
+
+BALANCE_COLUMNS = (
+    "total_amount", "payment_count", "paid_amount", "paid_count",
+    "outstanding_amount", "outstanding_count", "overdue_amount", "overdue_count"
+)
+
+SORT_COLUMNS = ("outstanding_amount", "overdue_amount", "paid_amount", "total_amount", "payment_count", "updated_at")
+
+
+def _contribution(status: Optional[str], amount: Optional[float]) -> dict:
+    """What one payment adds to its vendor's row. Anything not Paid or Cancelled is still owed."""
+    amount = amount or 0
+    if status == CANCELLED:
+        return {}
+    paid = status == PAID
+    overdue = status == OVERDUE
+    return {
+        "total_amount": amount,
+        "payment_count": 1,
+        "paid_amount": amount if paid else 0,
+        "paid_count": 1 if paid else 0,
+        "outstanding_amount": 0 if paid else amount,
+        "outstanding_count": 0 if paid else 1,
+        "overdue_amount": amount if overdue else 0,
+        "overdue_count": 1 if overdue else 0,
+    }
+
+
+def _apply(db: Session, vendor_id: int, increments: dict):
+    if vendor_id is None or not any(increments.values()):
+        return
+    upsert_increment(
+        db, VendorBalance,
+        keys={"vendor_id": vendor_id},
+        increments=increments,
+        values={"updated_at": datetime.utcnow()}
+    )
+
+
+def record_payment(db: Session, vendor_id: int, status: Optional[str], amount: Optional[float], sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) one payment from its vendor's balance."""
+    _apply(db, vendor_id, {column: sign * value for column, value in _contribution(status, amount).items()})
+
+
+def _upsert_totals(db: Session, totals: dict):
+    now = datetime.utcnow()
+    # Sorted so concurrent writers lock balance rows in the same order
+    rows = [
+        {"vendor_id": vendor_id, **increments, "updated_at": now}
+        for vendor_id, increments in sorted(totals.items()) if any(increments.values())
+    ]
+    upsert_increments(db, VendorBalance, ["vendor_id"], list(BALANCE_COLUMNS), rows, ["updated_at"])
+
+
+def _new_totals() -> defaultdict:
+    return defaultdict(lambda: dict.fromkeys(BALANCE_COLUMNS, 0))
+
+
+def record_payments(db: Session, payments: Iterable[tuple]):
+    """Adds many (vendor_id, status, amount) payments at once with a single executemany upsert."""
+    totals = _new_totals()
+    for vendor_id, status, amount in payments:
+        for column, value in _contribution(status, amount).items():
+            totals[vendor_id][column] += value
+    _upsert_totals(db, totals)
+
+
+def move_payments(db: Session, moves: Iterable[tuple]):
+    """Re-books many (vendor_id, amount, old status, new status) status changes with a single upsert."""
+    totals = _new_totals()
+    for vendor_id, amount, old_status, new_status in moves:
+        for column, value in _contribution(new_status, amount).items():
+            totals[vendor_id][column] += value
+        for column, value in _contribution(old_status, amount).items():
+            totals[vendor_id][column] -= value
+    _upsert_totals(db, totals)
+
+
+def move_payment(db: Session, before: tuple, after: tuple):
+    """Re-books a payment whose (vendor_id, status, amount) changed, as one upsert per vendor touched."""
+    if before == after:
+        return
+    if before[0] == after[0]:
+        old, new = _contribution(*before[1:]), _contribution(*after[1:])
+        _apply(db, after[0], {column: new.get(column, 0) - old.get(column, 0) for column in {*old, *new}})
+    else:
+        for vendor_id, status, amount, sign in sorted([(*before, -1), (*after, 1)], key=lambda x: x[0]):
+            record_payment(db, vendor_id, status, amount, sign)
+
+
+def rebuild_vendor_balances(db: Session):
+    """Recomputes every vendor's row from vendor_payments with one INSERT ... SELECT."""
+    status = func.coalesce(VendorPayment.status, "")
+    amount = func.coalesce(VendorPayment.amount, 0)
+    paid = status == PAID
+    open_ = status.notin_((PAID, CANCELLED))
+    overdue = status == OVERDUE
+
+    def total(condition, value):
+        return func.sum(case((condition, value), else_=0))
+
+    db.execute(delete(VendorBalance))
+    db.execute(
+        insert(VendorBalance).from_select(
+            ["vendor_id", *BALANCE_COLUMNS, "updated_at"],
+            select(
+                VendorPayment.vendor_id,
+                total(status != CANCELLED, amount), total(status != CANCELLED, 1),
+                total(paid, amount), total(paid, 1),
+                total(open_, amount), total(open_, 1),
+                total(overdue, amount), total(overdue, 1),
+                literal(datetime.utcnow())
+            ).group_by(VendorPayment.vendor_id)
+        )
+    )
+    db.commit()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_vendor_balances(db)
+        print(f"Rebuilt vendor_balances: {db.query(VendorBalance).count()} vendors")
+    finally:
+        db.close()
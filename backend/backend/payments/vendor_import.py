@@ -0,0 +1,217 @@
+"""Bulk import of vendors and vendor payments from CSV or XLSX uploads.
+
+Rows are read one at a time from the upload (already spooled to disk by the
+multipart parser), validated with the same schemas as the single-record
+endpoints and written IMPORT_BATCH_SIZE at a time, each batch its own
+transaction, so memory stays flat however long the file is. Invalid rows are
+skipped and reported by their row number in the file (the header is row 1).
+
+Vendors are upserted on GSTIN (unique, compared trimmed and upper-cased): a
+row whose GSTIN matches an existing vendor updates the non-empty columns it
+carries, anything else is inserted. Payment
+rows name their vendor by vendor_id or vendor_gstin.
+"""
+import codecs
+import csv
+import uuid
+from datetime import date, datetime
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from backend.models import Vendor, VendorPayment
+from backend.payments.vendor_balances import record_payments
+from backend.payments.vendor_payment_router import VendorPaymentCreate
+from backend.payments.vendor_router import VendorCreate, normalize_gstin
+
+IMPORT_BATCH_SIZE = 1000
+
+# The report lists at most this many bad rows; error_count still counts them all
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("csv", "xlsx")
+
+
+def file_format(filename: Optional[str]) -> Optional[str]:
+    """"csv" or "xlsx" from the upload's file name, None if it is neither."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in FORMATS else None
+
+
+def _header(names) -> List[str]:
+    """Column names as schema field names: "Vendor GSTIN" -> "vendor_gstin"."""
+    return ["_".join(str(name or "").strip().lower().split()) for name in names]
+
+
+def _cell(value):
+    """Normalizes a cell so the schemas see what a JSON client would send."""
+    if value is None or isinstance(value, (datetime, date)):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Spreadsheets store phone numbers and ids as floats
+    value = str(value).strip()
+    return value or None
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    reader = csv.reader(codecs.iterdecode(file, "utf-8-sig"))
+    header = _header(next(reader, []))
+    for row_number, values in enumerate(reader, start=2):
+        if any(values):
+            yield row_number, dict(zip(header, values))
+
+
+def _xlsx_rows(file: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    # Only needed for spreadsheet uploads, so only loaded for them
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        for row_number, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, dict]]:
+    """(row number, {column: value}) for each non-blank row; empty cells are left out."""
+    rows = _xlsx_rows(file) if fmt == "xlsx" else _csv_rows(file)
+    for row_number, row in rows:
+        yield row_number, {
+            column: value for column, value in ((column, _cell(value)) for column, value in row.items())
+            if column and value is not None
+        }
+
+
+def _batches(rows: Iterator[Tuple[int, dict]]) -> Iterator[List[Tuple[int, dict]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Report:
+    def __init__(self):
+        self.rows = self.inserted = self.updated = self.error_count = 0
+        self.errors = []
+
+    def error(self, row_number: int, *messages: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": list(messages)})
+
+    def invalid(self, row_number: int, exc: ValidationError):
+        self.error(row_number, *(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        ))
+
+    def result(self) -> dict:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": sorted(self.errors, key=lambda error: error["row"])
+        }
+
+
+def import_vendors(db: Session, rows: Iterator[Tuple[int, dict]]) -> dict:
+    """Validates each row as a VendorCreate and upserts it on GSTIN, one transaction per batch."""
+    report = _Report()
+    for batch in _batches(rows):
+        report.rows += len(batch)
+        inserts, upserts = [], {}
+        for row_number, row in batch:
+            try:
+                vendor = VendorCreate(**row)
+            except ValidationError as exc:
+                report.invalid(row_number, exc)
+                continue
+            if vendor.gstin:  # Already normalized by VendorCreate, as stored by create_vendor
+                upserts[vendor.gstin] = vendor  # A GSTIN repeated in the batch: the last row wins
+            else:
+                inserts.append(vendor.dict())
+
+        existing = dict(
+            db.query(Vendor.gstin, Vendor.id).filter(Vendor.gstin.in_(list(upserts))).all()
+        ) if upserts else {}
+        updates = []
+        for gstin, vendor in upserts.items():
+            if gstin in existing:
+                updates.append({"id": existing[gstin], **vendor.dict(exclude_unset=True), "gstin": gstin})
+            else:
+                inserts.append(vendor.dict())
+
+        if inserts:
+            db.execute(insert(Vendor), inserts)
+        if updates:
+            db.execute(update(Vendor), updates)  # Bulk UPDATE by primary key
+        db.commit()
+        report.inserted += len(inserts)
+        report.updated += len(updates)
+    return report.result()
+
+
+def import_vendor_payments(db: Session, rows: Iterator[Tuple[int, dict]]) -> dict:
+    """Validates each row as a VendorPaymentCreate and inserts the batch with one executemany.
+
+    The vendor comes from vendor_id or, failing that, vendor_gstin; both are
+    resolved for the whole batch with one IN query each. Vendor balances are
+    moved in the same transaction as the payments.
+    """
+    report = _Report()
+    for batch in _batches(rows):
+        report.rows += len(batch)
+        gstins = {normalize_gstin(row.get("vendor_gstin")) for _, row in batch if "vendor_id" not in row} - {None}
+        by_gstin = dict(
+            db.query(Vendor.gstin, Vendor.id).filter(Vendor.gstin.in_(list(gstins))).all()
+        ) if gstins else {}
+
+        candidates = []
+        for row_number, row in batch:
+            gstin = normalize_gstin(row.pop("vendor_gstin", None))
+            if "vendor_id" not in row:
+                if not gstin:
+                    report.error(row_number, "vendor_id or vendor_gstin is required")
+                    continue
+                if gstin not in by_gstin:
+                    report.error(row_number, f"vendor_gstin: no vendor with GSTIN {gstin}")
+                    continue
+                row["vendor_id"] = by_gstin[gstin]
+            try:
+                candidates.append((row_number, VendorPaymentCreate(**row)))
+            except ValidationError as exc:
+                report.invalid(row_number, exc)
+
+        vendor_ids = {payment.vendor_id for _, payment in candidates}
+        known = {
+            vendor_id for (vendor_id,) in db.query(Vendor.id).filter(Vendor.id.in_(list(vendor_ids)))
+        } if vendor_ids else set()
+
+        today = datetime.now().strftime('%Y%m%d')
+        payments = []
+        for row_number, payment in candidates:
+            if payment.vendor_id not in known:
+                report.error(row_number, "vendor_id: Vendor not found")
+                continue
+            payments.append({
+                **payment.dict(),
+                # Longer suffix than single creates: 8 hex digits collide within ~100k rows
+                "payment_number": f"VP-{today}-{uuid.uuid4().hex[:12].upper()}",
+                "payment_date": payment.payment_date or datetime.utcnow(),
+                "status": payment.status or "Pending"
+            })
+
+        if payments:
+            db.execute(insert(VendorPayment), payments)
+            record_payments(db, ((p["vendor_id"], p["status"], p["amount"]) for p in payments))
+        db.commit()
+        report.inserted += len(payments)
+    return report.result()
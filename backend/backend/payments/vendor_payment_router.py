@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 from typing import List, Optional
 from backend.database import get_db
 from backend.models import VendorPayment, Vendor
+from backend.core.idempotency import idempotency_key_header, run_idempotent
+from backend.core.cache import aggregate_cache
+from backend.core.summary import status_month_summary
+from backend.payments.vendor_balances import record_payment, move_payment
 from pydantic import BaseModel
 import uuid
 
@@ -57,9 +61,46 @@ class VendorPaymentResponse(BaseModel):
 
 
 # ============ ROUTES ============
+def _payment_response(payment: VendorPayment) -> VendorPaymentResponse:
+    """The one place a VendorPaymentResponse is built; load payment.vendor eagerly for lists"""
+    vendor = payment.vendor
+    return VendorPaymentResponse(
+        id=payment.id,
+        vendor_id=payment.vendor_id,
+        payment_number=payment.payment_number,
+        description=payment.description,
+        amount=payment.amount,
+        payment_method=payment.payment_method,
+        payment_date=payment.payment_date,
+        due_date=payment.due_date,
+        status=payment.status,
+        reference_number=payment.reference_number,
+        bill_reference=payment.bill_reference,
+        notes=payment.notes,
+        created_at=payment.created_at,
+        vendor={"id": vendor.id, "name": vendor.name, "company_name": vendor.company_name} if vendor else None
+    )
+
+
+def _payment_query(db: Session):
+    # One JOIN brings each payment's vendor along instead of a query per row
+    return db.query(VendorPayment).options(joinedload(VendorPayment.vendor))
+
+
 @router.post("/", response_model=VendorPaymentResponse)
-def create_vendor_payment(payment: VendorPaymentCreate, db: Session = Depends(get_db)):
-    """Create a new vendor payment record"""
+def create_vendor_payment(
+    payment: VendorPaymentCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
+    """Create a new vendor payment record (replayed for a repeated Idempotency-Key)"""
+    return run_idempotent(
+        db, "vendor-payments", idempotency_key, payment,
+        lambda: _create_vendor_payment(payment, db)
+    )
+
+
+def _create_vendor_payment(payment: VendorPaymentCreate, db: Session) -> VendorPaymentResponse:
     # Verify vendor exists
     vendor = db.query(Vendor).filter(Vendor.id == payment.vendor_id).first()
     if not vendor:
@@ -84,160 +125,88 @@ def create_vendor_payment(payment: VendorPaymentCreate, db: Session = Depends(ge
     )
     
     db.add(db_payment)
+    record_payment(db, db_payment.vendor_id, db_payment.status, db_payment.amount)
     db.commit()
     db.refresh(db_payment)
+    aggregate_cache.invalidate("vendor-payments", "reports")
     
     # Construct response with vendor info
-    return VendorPaymentResponse(
-        id=db_payment.id,
-        vendor_id=db_payment.vendor_id,
-        payment_number=db_payment.payment_number,
-        description=db_payment.description,
-        amount=db_payment.amount,
-        payment_method=db_payment.payment_method,
-        payment_date=db_payment.payment_date,
-        due_date=db_payment.due_date,
-        status=db_payment.status,
-        reference_number=db_payment.reference_number,
-        bill_reference=db_payment.bill_reference,
-        notes=db_payment.notes,
-        created_at=db_payment.created_at,
-        vendor={
-            "id": vendor.id,
-            "name": vendor.name,
-            "company_name": vendor.company_name
-        }
-    )
+    return _payment_response(db_payment)
 
 
 @router.get("/", response_model=List[VendorPaymentResponse])
 def list_vendor_payments(skip: int = 0, limit: int = 100, status: Optional[str] = None, db: Session = Depends(get_db)):
-    """List all vendor payments"""
-    query = db.query(VendorPayment)
+    """List all vendor payments (one query per page, vendors joined in)"""
+    query = _payment_query(db)
     if status:
         query = query.filter(VendorPayment.status == status)
     payments = query.order_by(VendorPayment.payment_date.desc()).offset(skip).limit(limit).all()
-    
-    results = []
-    for payment in payments:
-        vendor = db.query(Vendor).filter(Vendor.id == payment.vendor_id).first()
-        result = VendorPaymentResponse(
-            id=payment.id,
-            vendor_id=payment.vendor_id,
-            payment_number=payment.payment_number,
-            description=payment.description,
-            amount=payment.amount,
-            payment_method=payment.payment_method,
-            payment_date=payment.payment_date,
-            due_date=payment.due_date,
-            status=payment.status,
-            reference_number=payment.reference_number,
-            bill_reference=payment.bill_reference,
-            notes=payment.notes,
-            created_at=payment.created_at,
-            vendor={"id": vendor.id, "name": vendor.name, "company_name": vendor.company_name} if vendor else None
-        )
-        results.append(result)
-    
-    return results
+    return [_payment_response(payment) for payment in payments]
+
+
+@router.get("/summary")
+def get_vendor_payments_summary(months: int = Query(12, ge=1, le=120), db: Session = Depends(get_db)):
+    """Vendor payment count and amount overall, by status and by payment month, aggregated in SQL"""
+    cache_key = f"vendor-payments:summary:{months}"
+    cached = aggregate_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = status_month_summary(db, VendorPayment.status, VendorPayment.payment_date, VendorPayment.amount, months)
+    aggregate_cache.set(cache_key, result)
+    return result
 
 
 @router.get("/{payment_id}", response_model=VendorPaymentResponse)
 def get_vendor_payment(payment_id: int, db: Session = Depends(get_db)):
     """Get a specific vendor payment by ID"""
-    payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).first()
+    payment = _payment_query(db).filter(VendorPayment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Vendor payment not found")
     
-    vendor = db.query(Vendor).filter(Vendor.id == payment.vendor_id).first()
-    return VendorPaymentResponse(
-        id=payment.id,
-        vendor_id=payment.vendor_id,
-        payment_number=payment.payment_number,
-        description=payment.description,
-        amount=payment.amount,
-        payment_method=payment.payment_method,
-        payment_date=payment.payment_date,
-        due_date=payment.due_date,
-        status=payment.status,
-        reference_number=payment.reference_number,
-        bill_reference=payment.bill_reference,
-        notes=payment.notes,
-        created_at=payment.created_at,
-        vendor={"id": vendor.id, "name": vendor.name, "company_name": vendor.company_name} if vendor else None
-    )
+    return _payment_response(payment)
 
 
 @router.put("/{payment_id}", response_model=VendorPaymentResponse)
 def update_vendor_payment(payment_id: int, payment_update: VendorPaymentUpdate, db: Session = Depends(get_db)):
     """Update vendor payment information"""
-    payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).first()
+    # Locked like the overdue sweep locks its chunks, so `before` is the status the balance was booked at
+    payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).with_for_update().first()
     if not payment:
         raise HTTPException(status_code=404, detail="Vendor payment not found")
     
     update_data = payment_update.dict(exclude_unset=True)
     prev_status = payment.status
+    before = (payment.vendor_id, payment.status, payment.amount)
     for key, value in update_data.items():
         setattr(payment, key, value)
 
+    # Re-book on the vendor's balance, e.g. Pending -> Paid moves outstanding to paid
+    move_payment(db, before, (payment.vendor_id, payment.status, payment.amount))
     db.commit()
     db.refresh(payment)
+    aggregate_cache.invalidate("vendor-payments", "reports")
 
-    vendor = db.query(Vendor).filter(Vendor.id == payment.vendor_id).first()
-    return VendorPaymentResponse(
-        id=payment.id,
-        vendor_id=payment.vendor_id,
-        payment_number=payment.payment_number,
-        description=payment.description,
-        amount=payment.amount,
-        payment_method=payment.payment_method,
-        payment_date=payment.payment_date,
-        due_date=payment.due_date,
-        status=payment.status,
-        reference_number=payment.reference_number,
-        bill_reference=payment.bill_reference,
-        notes=payment.notes,
-        created_at=payment.created_at,
-        vendor={"id": vendor.id, "name": vendor.name, "company_name": vendor.company_name} if vendor else None
-    )
+    return _payment_response(payment)
 
 
 @router.delete("/{payment_id}")
 def delete_vendor_payment(payment_id: int, db: Session = Depends(get_db)):
     """Delete a vendor payment"""
-    payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).first()
+    payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).with_for_update().first()
     if not payment:
         raise HTTPException(status_code=404, detail="Vendor payment not found")
     
+    record_payment(db, payment.vendor_id, payment.status, payment.amount, sign=-1)
     db.delete(payment)
     db.commit()
+    aggregate_cache.invalidate("vendor-payments", "reports")
     return {"message": "Vendor payment deleted successfully"}
 
 
 @router.get("/vendor/{vendor_id}", response_model=List[VendorPaymentResponse])
 def get_vendor_payments_by_vendor(vendor_id: int, db: Session = Depends(get_db)):
     """Get all payments for a specific vendor"""
-    payments = db.query(VendorPayment).filter(VendorPayment.vendor_id == vendor_id).order_by(VendorPayment.payment_date.desc()).all()
-    
-    vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
-    results = []
-    for payment in payments:
-        result = VendorPaymentResponse(
-            id=payment.id,
-            vendor_id=payment.vendor_id,
-            payment_number=payment.payment_number,
-            description=payment.description,
-            amount=payment.amount,
-            payment_method=payment.payment_method,
-            payment_date=payment.payment_date,
-            due_date=payment.due_date,
-            status=payment.status,
-            reference_number=payment.reference_number,
-            bill_reference=payment.bill_reference,
-            notes=payment.notes,
-            created_at=payment.created_at,
-            vendor={"id": vendor.id, "name": vendor.name, "company_name": vendor.company_name} if vendor else None
-        )
-        results.append(result)
-    
-    return results
+    payments = _payment_query(db).filter(VendorPayment.vendor_id == vendor_id) \
+        .order_by(VendorPayment.payment_date.desc()).all()
+    return [_payment_response(payment) for payment in payments]
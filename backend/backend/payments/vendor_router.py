@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
 from backend.database import get_db
-from backend.models import Vendor, VendorPayment
-from pydantic import BaseModel
+from backend.models import Vendor, VendorPayment, VendorBalance
+from backend.payments.vendor_balances import BALANCE_COLUMNS, SORT_COLUMNS
+from backend.payments.vendor_search import vendor_index
+from backend.core.multiget import parse_ids, in_requested_order
+from pydantic import BaseModel, validator
 
 router = APIRouter(prefix="/api/vendors", tags=["Vendors"])
 
 
+def normalize_gstin(value: Optional[str]) -> Optional[str]:
+    """GSTINs are stored trimmed and upper-cased (blank = none), so lookups on them are exact."""
+    value = (value or "").strip().upper()
+    return value or None
+
+
 # ============ SCHEMAS ============
 class VendorCreate(BaseModel):
     name: str
@@ -25,6 +35,8 @@ class VendorCreate(BaseModel):
     ifsc_code: Optional[str] = None
     notes: Optional[str] = None
 
+    _normalize_gstin = validator("gstin", allow_reuse=True)(normalize_gstin)
+
 
 class VendorUpdate(BaseModel):
     name: Optional[str] = None
@@ -41,6 +53,18 @@ class VendorUpdate(BaseModel):
     ifsc_code: Optional[str] = None
     notes: Optional[str] = None
 
+    _normalize_gstin = validator("gstin", allow_reuse=True)(normalize_gstin)
+
+
+def _check_gstin_free(db: Session, gstin: Optional[str], vendor_id: Optional[int] = None):
+    if not gstin:
+        return
+    query = db.query(Vendor.id).filter(Vendor.gstin == gstin)
+    if vendor_id is not None:
+        query = query.filter(Vendor.id != vendor_id)
+    if query.first():
+        raise HTTPException(status_code=409, detail="A vendor with this GSTIN already exists")
+
 
 class VendorResponse(BaseModel):
     id: int
@@ -63,14 +87,53 @@ class VendorResponse(BaseModel):
         from_attributes = True
 
 
+class VendorBalanceResponse(BaseModel):
+    total_amount: float = 0.0
+    payment_count: int = 0
+    paid_amount: float = 0.0
+    paid_count: int = 0
+    outstanding_amount: float = 0.0
+    outstanding_count: int = 0
+    overdue_amount: float = 0.0
+    overdue_count: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class VendorDetailResponse(VendorResponse):
+    balance: VendorBalanceResponse
+
+
+class VendorBalanceListItem(VendorBalanceResponse):
+    vendor_id: int
+    name: str
+    company_name: Optional[str]
+
+
+class VendorSuggestion(BaseModel):
+    id: int
+    name: str
+    company_name: Optional[str]
+    gstin: Optional[str]
+
+
+class VendorBatchResponse(BaseModel):
+    items: List[VendorResponse]
+    missing: List[int]
+
+
 # ============ ROUTES ============
 @router.post("/", response_model=VendorResponse)
 def create_vendor(vendor: VendorCreate, db: Session = Depends(get_db)):
-    """Create a new vendor/dealer"""
+    """Create a new vendor/dealer (GSTIN, when given, must be unique)"""
+    _check_gstin_free(db, vendor.gstin)
     db_vendor = Vendor(**vendor.dict())
     db.add(db_vendor)
     db.commit()
     db.refresh(db_vendor)
+    vendor_index.upsert(db_vendor)
     return db_vendor
 
 
@@ -81,13 +144,63 @@ def list_vendors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
     return vendors
 
 
-@router.get("/{vendor_id}", response_model=VendorResponse)
+@router.get("/batch", response_model=VendorBatchResponse)
+def get_vendors_batch(ids: str, db: Session = Depends(get_db)):
+    """Get several vendors by ID (?ids=1,2,3) with one IN query, in the requested order"""
+    vendor_ids = parse_ids(ids)
+    vendors = db.query(Vendor).filter(Vendor.id.in_(vendor_ids)).all()
+    found, missing = in_requested_order(vendors, vendor_ids)
+    return {"items": found, "missing": missing}
+
+
+@router.get("/suggest", response_model=List[VendorSuggestion])
+def suggest_vendors(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Type-ahead: vendors whose name, company name (any word) or GSTIN starts with q, from the in-memory index"""
+    return vendor_index.search(db, q, limit)
+
+
+@router.get("/balances", response_model=List[VendorBalanceListItem])
+def list_vendor_balances(
+    sort: str = Query("outstanding_amount", pattern="^(" + "|".join(SORT_COLUMNS) + ")$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Every vendor with its payment balance, read from vendor_balances and sorted server-side.
+
+    Vendors without payments have no vendor_balances row yet; they are listed
+    with zero balances.
+    """
+    columns = {
+        column: func.coalesce(getattr(VendorBalance, column), 0).label(column) for column in BALANCE_COLUMNS
+    }
+    column = VendorBalance.updated_at if sort == "updated_at" else columns[sort]
+    # Never-paid vendors have no updated_at; they go last either way
+    sort_by = [VendorBalance.updated_at.is_(None)] if sort == "updated_at" else []
+    sort_by.append(column.desc() if order == "desc" else column.asc())
+    rows = db.query(Vendor.id.label("vendor_id"), Vendor.name, Vendor.company_name, *columns.values(), VendorBalance.updated_at) \
+        .outerjoin(VendorBalance, VendorBalance.vendor_id == Vendor.id) \
+        .order_by(*sort_by, Vendor.id) \
+        .offset(skip).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+
+@router.get("/{vendor_id}", response_model=VendorDetailResponse)
 def get_vendor(vendor_id: int, db: Session = Depends(get_db)):
-    """Get a specific vendor by ID"""
+    """Get a specific vendor by ID, with its payment balance"""
     vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
-    return vendor
+    balance = db.get(VendorBalance, vendor_id)
+    return {
+        **VendorResponse.model_validate(vendor).dict(),
+        "balance": VendorBalanceResponse.model_validate(balance) if balance else VendorBalanceResponse()
+    }
 
 
 @router.put("/{vendor_id}", response_model=VendorResponse)
@@ -98,21 +211,27 @@ def update_vendor(vendor_id: int, vendor_update: VendorUpdate, db: Session = Dep
         raise HTTPException(status_code=404, detail="Vendor not found")
     
     update_data = vendor_update.dict(exclude_unset=True)
+    _check_gstin_free(db, update_data.get("gstin"), vendor_id)
     for key, value in update_data.items():
         setattr(vendor, key, value)
     
     db.commit()
     db.refresh(vendor)
+    vendor_index.upsert(vendor)
     return vendor
 
 
 @router.delete("/{vendor_id}")
 def delete_vendor(vendor_id: int, db: Session = Depends(get_db)):
-    """Delete a vendor"""
+    """Delete a vendor that has no payments (delete or reassign those first)"""
     vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
+    if db.query(VendorPayment.id).filter(VendorPayment.vendor_id == vendor_id).first():
+        raise HTTPException(status_code=409, detail="Vendor has payments; delete them before the vendor")
     
+    db.query(VendorBalance).filter(VendorBalance.vendor_id == vendor_id).delete()
     db.delete(vendor)
     db.commit()
+    vendor_index.remove(vendor_id)
     return {"message": "Vendor deleted successfully"}
@@ -0,0 +1,158 @@
+"""In-process prefix index behind the vendor type-ahead (GET /api/vendors/suggest).
+
+A sorted array of (term, vendor_id) pairs: every word-start suffix of the
+vendor's name and company name ("bim mills", "mills") plus its GSTIN, all
+lower-cased. A lookup is a bisect to the first term >= the query followed by a
+short forward scan, so it costs O(log n + limit) regardless of the table size.
+
+The vendor routes update this worker's index after they commit. Other workers
+pick changes up once their copy is older than VENDOR_INDEX_TTL_SECONDS: the
+lookup that notices answers from the current copy and starts a rebuild from the
+vendors table in a background thread. Only the very first lookup (or the first
+after invalidate()) waits for a build.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.core.config import settings
+from backend.database import SessionLocal
+from backend.models import Vendor
+
+
+def _terms(name: Optional[str], company_name: Optional[str], gstin: Optional[str]) -> set:
+    terms = set()
+    for text in (name, company_name):
+        words = (text or "").lower().split()
+        terms.update(" ".join(words[start:]) for start in range(len(words)))
+    if gstin and gstin.strip():
+        terms.add(gstin.strip().lower())
+    return terms
+
+
+class VendorPrefixIndex:
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: List[Tuple[str, int]] = []  # (term, vendor_id), sorted
+        self._vendors = {}  # vendor_id -> (name, company_name, gstin)
+        self._built_at: Optional[float] = None
+        self._generation = 0  # Bumped by invalidate(); a rebuild begun before it doesn't count as fresh
+        self._pending: Optional[Dict[int, Optional[tuple]]] = None  # Changes made while a rebuild reads the table
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()  # One rebuild at a time
+
+    def _rebuild(self, db: Session):
+        """Reads the vendors table outside the lock, then swaps the new index in.
+
+        Upserts and removes made while the table is being read are recorded and
+        replayed on top of the snapshot, so none is lost whichever side of the
+        read they committed on. Call with _rebuild_lock held.
+        """
+        with self._lock:
+            generation, self._pending = self._generation, {}
+        try:
+            vendors = {
+                vendor_id: (name, company_name, gstin)
+                for vendor_id, name, company_name, gstin in db.query(Vendor.id, Vendor.name, Vendor.company_name, Vendor.gstin)
+            }
+            entries = sorted(
+                (term, vendor_id) for vendor_id, fields in vendors.items() for term in _terms(*fields)
+            )
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            self._entries, self._vendors = entries, vendors
+            for vendor_id, fields in self._pending.items():
+                self._place_locked(vendor_id, fields)
+            self._pending = None
+            if generation == self._generation:
+                self._built_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        if not self._rebuild_lock.acquire(blocking=False):
+            return  # Already under way
+
+        def run():
+            db = SessionLocal()
+            try:
+                self._rebuild(db)
+            except Exception as e:
+                print(f"Vendor index rebuild warning: {e}")
+            finally:
+                db.close()
+                self._rebuild_lock.release()
+
+        threading.Thread(target=run, name="vendor-index-rebuild", daemon=True).start()
+
+    def _fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl_seconds
+
+    def _remove_locked(self, vendor_id: int):
+        fields = self._vendors.pop(vendor_id, None)
+        if fields is None:
+            return
+        for term in _terms(*fields):
+            position = bisect_left(self._entries, (term, vendor_id))
+            if position < len(self._entries) and self._entries[position] == (term, vendor_id):
+                del self._entries[position]
+
+    def _place_locked(self, vendor_id: int, fields: Optional[tuple]):
+        """Replaces a vendor's entries with fields (None = drop the vendor)."""
+        self._remove_locked(vendor_id)
+        if fields is not None:
+            self._vendors[vendor_id] = fields
+            for term in _terms(*fields):
+                insort(self._entries, (term, vendor_id))
+
+    def _change(self, vendor_id: int, fields: Optional[tuple]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[vendor_id] = fields
+            self._place_locked(vendor_id, fields)
+
+    def upsert(self, vendor: Vendor):
+        """Indexes a created or updated vendor (call after commit)."""
+        self._change(vendor.id, (vendor.name, vendor.company_name, vendor.gstin))
+
+    def remove(self, vendor_id: int):
+        """Drops a deleted vendor (call after commit)."""
+        self._change(vendor_id, None)
+
+    def invalidate(self):
+        """Forces a rebuild on the next lookup, e.g. after a bulk import."""
+        with self._lock:
+            self._built_at = None
+            self._generation += 1
+
+    def search(self, db: Session, query: str, limit: int = 10) -> List[dict]:
+        """Vendors with a name word, company name word or GSTIN starting with query, closest terms first."""
+        prefix = " ".join(query.lower().split())
+        if not prefix:
+            return []
+        if self._built_at is None:
+            with self._rebuild_lock:
+                if self._built_at is None:  # Unless another request built it while this one waited
+                    self._rebuild(db)
+        elif not self._fresh():
+            self._rebuild_in_background()
+
+        results, seen = [], set()
+        with self._lock:
+            position = bisect_left(self._entries, (prefix, 0))
+            while position < len(self._entries) and len(results) < limit:
+                term, vendor_id = self._entries[position]
+                if not term.startswith(prefix):
+                    break
+                if vendor_id not in seen:
+                    seen.add(vendor_id)
+                    name, company_name, gstin = self._vendors[vendor_id]
+                    results.append({"id": vendor_id, "name": name, "company_name": company_name, "gstin": gstin})
+                position += 1
+        return results
+
+
+vendor_index = VendorPrefixIndex(settings.VENDOR_INDEX_TTL_SECONDS)
@@ -0,0 +1 @@
+# Reports module
\ No newline at end of file
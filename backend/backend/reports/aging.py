@@ -0,0 +1,87 @@
+"""Receivables / payables aging: open amounts bucketed by how far past due they are."""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from backend.models import Invoice, VendorPayment, Vendor
+
+BUCKETS = ("current", "1-30", "31-60", "61-90", "90+")
+
+# Statuses of items still owed; a missing status counts as open too. Compared
+# on the bare column so ix_*_due_date_status can serve the filter
+OPEN_INVOICE_STATUSES = ("Pending", "Overdue")
+OPEN_PAYMENT_STATUSES = ("Pending", "Overdue")
+
+
+def _ranges(due_date_column, as_of: date) -> list:
+    """(bucket, due_date predicate) per bucket, as ranges ending at midnight of as_of.
+
+    Not yet due is current, and so is no due date at all (a separate IS NULL
+    lookup, so every predicate stays an index range).
+    """
+    midnight = datetime.combine(as_of, time.min)
+    bounds = [midnight - timedelta(days=days) for days in (30, 60, 90)]
+    return [
+        ("current", due_date_column >= midnight),
+        ("current", due_date_column.is_(None)),
+        ("1-30", (due_date_column >= bounds[0]) & (due_date_column < midnight)),
+        ("31-60", (due_date_column >= bounds[1]) & (due_date_column < bounds[0])),
+        ("61-90", (due_date_column >= bounds[2]) & (due_date_column < bounds[1])),
+        ("90+", due_date_column < bounds[2]),
+    ]
+
+
+def _empty_buckets() -> dict:
+    return {bucket: {"count": 0, "amount": 0.0} for bucket in BUCKETS}
+
+
+def _add(buckets: dict, bucket: str, count: int, amount) -> None:
+    buckets[bucket]["count"] += count
+    buckets[bucket]["amount"] = round(buckets[bucket]["amount"] + float(amount or 0), 2)
+
+
+def aging_report(db: Session, ledger: str, group_by: Optional[str], as_of: date) -> dict:
+    """Aging buckets for receivables (unpaid invoices) or payables (open vendor payments).
+
+    One indexed range query on due_date per bucket, filtered to open statuses,
+    so closed items are never read; when grouping, each returns at most one row
+    per customer or vendor.
+    """
+    if ledger == "receivables":
+        due_date, amount, item_id = Invoice.due_date, Invoice.total_amount, Invoice.id
+        is_open = or_(Invoice.payment_status.in_(OPEN_INVOICE_STATUSES), Invoice.payment_status.is_(None))
+        party = [func.coalesce(Invoice.customer_email, Invoice.customer_name), func.max(Invoice.customer_name)]
+    else:
+        due_date, amount, item_id = VendorPayment.due_date, VendorPayment.amount, VendorPayment.id
+        is_open = or_(VendorPayment.status.in_(OPEN_PAYMENT_STATUSES), VendorPayment.status.is_(None))
+        party = [VendorPayment.vendor_id, func.max(Vendor.name)]
+
+    totals = _empty_buckets()
+    groups = {}
+    for bucket_name, in_range in _ranges(due_date, as_of):
+        query = db.query(func.count(item_id), func.sum(amount)).filter(in_range, is_open)
+        if not group_by:
+            count, total = query.one()
+            _add(totals, bucket_name, count, total)
+            continue
+        if ledger == "payables":
+            query = query.outerjoin(Vendor, Vendor.id == VendorPayment.vendor_id)
+        for count, total, key, name in query.add_columns(*party).group_by(party[0]):
+            _add(totals, bucket_name, count, total)
+            group = groups.setdefault(key, {"key": key, "name": name, "count": 0, "amount": 0.0,
+                                            "buckets": _empty_buckets()})
+            _add(group["buckets"], bucket_name, count, total)
+            group["count"] += count
+            group["amount"] = round(group["amount"] + float(total or 0), 2)
+
+    report = {
+        "ledger": ledger,
+        "as_of": as_of.isoformat(),
+        "count": sum(b["count"] for b in totals.values()),
+        "amount": round(sum(b["amount"] for b in totals.values()), 2),
+        "buckets": [{"bucket": name, **totals[name]} for name in BUCKETS]
+    }
+    if group_by:
+        report["group_by"] = group_by
+        report["groups"] = sorted(groups.values(), key=lambda g: g["amount"], reverse=True)
+    return report
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import Optional
+from backend.database import get_db
+from backend.core.cache import aggregate_cache
+from backend.reports.aging import aging_report
+
+router = APIRouter(prefix="/api/reports", tags=["Reports"])
+
+# Which party each ledger can be grouped by
+AGING_GROUPS = {"receivables": "customer", "payables": "vendor"}
+
+
+@router.get("/aging")
+def get_aging_report(
+    ledger: str = Query("receivables", pattern="^(receivables|payables)$"),
+    group_by: Optional[str] = Query(None, pattern="^(customer|vendor)$"),
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Open receivables (unpaid invoices) or payables (open vendor payments) by days past due.
+
+    Buckets are current, 1-30, 31-60, 61-90 and 90+ days past due_date as of
+    `as_of` (default today, UTC). group_by=customer works on receivables,
+    group_by=vendor on payables. Results are cached per day until the ledger changes.
+    """
+    if group_by and AGING_GROUPS[ledger] != group_by:
+        raise HTTPException(status_code=400, detail=f"{ledger} can only be grouped by {AGING_GROUPS[ledger]}")
+
+    as_of = as_of or datetime.utcnow().date()
+    cache_key = f"reports:aging:{ledger}:{group_by or 'all'}:{as_of.isoformat()}"
+    cached = aggregate_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = aging_report(db, ledger, group_by, as_of)
+    aggregate_cache.set(cache_key, result)
+    return result
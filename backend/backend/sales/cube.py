@@ -0,0 +1,218 @@
+"""Sales cube: revenue pre-aggregated by (month, product, category).
+
+refresh_cube() folds in the Sales rows not in the cube yet (in_cube = 0) and
+flags exactly the rows it folded, in the same transaction. A sale whose insert
+commits late is simply picked up by the next refresh: nothing is keyed on ids
+or clocks, so nothing can slip below a watermark. Refreshes run in-process every
+CUBE_REFRESH_INTERVAL_SECONDS (see main.py) and on demand from
+POST /api/sales/cube/refresh; reads never write. Rebuild from scratch (sales and
+sales_archive), from the backend directory:
+
+    python -m backend.sales.cube
+"""
+import asyncio
+from collections import defaultdict
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, func, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.core.upsert import upsert_increment
+from backend.database import SessionLocal
+from backend.models import (
+    Sales, SalesArchive, Order, OrderArchive, Product, ReadymadeProduct, SalesCube, SalesCubeState
+)
+
+DIMENSIONS = ("period", "year", "category", "product")
+READYMADE_CATEGORY = "Readymade"
+UNCATEGORISED = "Uncategorised"
+
+# Sales rows folded per transaction
+REFRESH_BATCH_SIZE = 5000
+
+
+def _fact_rows(db: Session, sales_model, order_model, condition):
+    """Sales joined to their order and product, i.e. everything a cube cell is keyed on."""
+    return db.query(
+        sales_model.id, sales_model.date, sales_model.amount,
+        order_model.product_id, order_model.readymade_product_id, order_model.product_name,
+        Product.name, Product.category, ReadymadeProduct.name
+    ).outerjoin(order_model, order_model.id == sales_model.order_id) \
+        .outerjoin(Product, Product.id == order_model.product_id) \
+        .outerjoin(ReadymadeProduct, ReadymadeProduct.id == order_model.readymade_product_id) \
+        .filter(condition)
+
+
+def _fold(db: Session, rows: Iterable, sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) fact rows from the cube, one upsert per touched cell."""
+    cells = defaultdict(lambda: [0.0, 0, None, None])
+    for _, sold_at, amount, product_id, readymade_id, order_product_name, name, category, readymade_name in rows:
+        if sold_at is None:
+            continue
+        if readymade_id:
+            key = (sold_at.strftime("%Y-%m"), 0, readymade_id)
+            label, category = readymade_name or order_product_name, READYMADE_CATEGORY
+        elif product_id:
+            key = (sold_at.strftime("%Y-%m"), product_id, 0)
+            label, category = name or order_product_name, category or UNCATEGORISED
+        else:
+            key = (sold_at.strftime("%Y-%m"), 0, 0)
+            label, category = None, UNCATEGORISED
+        cell = cells[key]
+        cell[0] += amount or 0
+        cell[1] += 1
+        cell[2], cell[3] = label, category
+
+    # Sorted so concurrent writers lock cube rows in the same order
+    for (period, product_id, readymade_id), (revenue, count, label, category) in sorted(cells.items()):
+        upsert_increment(
+            db, SalesCube,
+            keys={"period": period, "product_id": product_id, "readymade_product_id": readymade_id},
+            increments={"revenue": sign * revenue, "sales_count": sign * count},
+            values={"product_name": label, "category": category}
+        )
+
+
+def _lock_state(db: Session) -> SalesCubeState:
+    # The row is seeded by migration 022 (and on create_all), never inserted here, so no two callers race to create it
+    state = db.query(SalesCubeState).filter(SalesCubeState.id == 1).with_for_update().first()
+    if state is None:
+        raise RuntimeError("sales_cube_state row 1 is missing; run the migrations")
+    return state
+
+
+def _fold_new_sales(db: Session, after_id: int, batch_size: int) -> List[int]:
+    """Folds the next batch of unfolded sales above after_id and flags them; returns their ids."""
+    rows = _fact_rows(
+        db, Sales, Order, (Sales.in_cube == 0) & (Sales.id > after_id)
+    ).order_by(Sales.id).limit(batch_size).all()
+    ids = [row[0] for row in rows]
+    if ids:
+        _fold(db, rows)
+        db.execute(
+            update(Sales).where(Sales.id.in_(ids)).values(in_cube=1).execution_options(synchronize_session=False)
+        )
+    return ids
+
+
+def refresh_cube(db: Session, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Folds the sales not yet in the cube, one committed batch at a time; returns rows folded."""
+    pending = db.query(Sales.id).filter(Sales.in_cube == 0).first() is not None
+    # End the check's transaction: each batch must read after taking the lock, not from an older snapshot
+    db.commit()
+    if not pending:
+        return 0  # Nothing new; skip taking the lock
+
+    folded, last_id = 0, 0
+    while True:
+        _lock_state(db)
+        ids = _fold_new_sales(db, last_id, batch_size)
+        db.commit()
+        if not ids:
+            return folded
+        folded += len(ids)
+        last_id = ids[-1]
+
+
+def remove_order_from_cube(db: Session, order_id: int):
+    """Takes an order's already-folded sales back out of the cube, in the caller's transaction.
+
+    Call before the sales rows are deleted. Sales not folded yet simply
+    disappear.
+    """
+    _lock_state(db)
+    # A locking read sees in_cube as committed by the last refresh, not as of the caller's snapshot
+    rows = _fact_rows(db, Sales, Order, (Sales.order_id == order_id) & (Sales.in_cube == 1)) \
+        .with_for_update(of=Sales).all()
+    _fold(db, rows, sign=-1)
+
+
+def rebuild_cube(db: Session, batch_size: int = REFRESH_BATCH_SIZE):
+    """Recomputes the whole cube from sales and sales_archive in one transaction."""
+    _lock_state(db)
+    db.execute(delete(SalesCube))
+    db.execute(update(Sales).where(Sales.in_cube == 1).values(in_cube=0).execution_options(synchronize_session=False))
+    _fold(db, _fact_rows(db, SalesArchive, OrderArchive, SalesArchive.id.isnot(None)).yield_per(REFRESH_BATCH_SIZE))
+    last_id = 0
+    while True:
+        ids = _fold_new_sales(db, last_id, batch_size)
+        if not ids:
+            break
+        last_id = ids[-1]
+    db.commit()
+
+
+async def run_cube_refresher(interval_seconds: int):
+    """Refreshes the cube forever, every interval_seconds, off the event loop."""
+    def refresh():
+        db = SessionLocal()
+        try:
+            return refresh_cube(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await run_in_threadpool(refresh)
+        except Exception as e:
+            print(f"Cube refresh warning: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def query_cube(
+    db: Session,
+    dimensions: List[str],
+    period_from: Optional[str] = None,
+    period_to: Optional[str] = None,
+    category: Optional[str] = None,
+    product_id: Optional[int] = None,
+    readymade_product_id: Optional[int] = None
+) -> List[dict]:
+    """Rolls the cube up to the requested dimensions (none = grand total), after filtering cells."""
+    columns = []
+    for dimension in dimensions:
+        if dimension == "period":
+            columns.append(SalesCube.period.label("period"))
+        elif dimension == "year":
+            columns.append(func.substr(SalesCube.period, 1, 4).label("year"))
+        elif dimension == "category":
+            columns.append(SalesCube.category.label("category"))
+        elif dimension == "product":
+            columns += [SalesCube.product_id.label("product_id"),
+                        SalesCube.readymade_product_id.label("readymade_product_id")]
+
+    query = db.query(*columns, func.sum(SalesCube.revenue), func.sum(SalesCube.sales_count))
+    if period_from:
+        query = query.filter(SalesCube.period >= period_from)
+    if period_to:
+        query = query.filter(SalesCube.period <= period_to)
+    if category:
+        query = query.filter(SalesCube.category == category)
+    if product_id is not None:
+        query = query.filter(SalesCube.product_id == product_id)
+    if readymade_product_id is not None:
+        query = query.filter(SalesCube.readymade_product_id == readymade_product_id)
+    if columns:
+        # Cells emptied by cancellations stay in the table at zero; leave them out
+        query = query.group_by(*columns).having(func.sum(SalesCube.sales_count) != 0).order_by(*columns)
+    if "product" in dimensions:
+        query = query.add_columns(func.max(SalesCube.product_name).label("product_name"))
+
+    results = []
+    for row in query:
+        cell = {column.name: row._mapping[column.name] for column in columns}
+        if "product" in dimensions:
+            cell["product_name"] = row.product_name
+        revenue, count = row[len(columns)], row[len(columns) + 1]
+        cell["revenue"] = round(float(revenue or 0), 2)
+        cell["sales_count"] = int(count or 0)
+        results.append(cell)
+    return results
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_cube(db)
+        print(f"Rebuilt sales_cube: {db.query(SalesCube).count()} cells")
+    finally:
+        db.close()
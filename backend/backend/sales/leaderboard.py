@@ -0,0 +1,129 @@
+"""Running per-product and per-customer order totals behind the sales leaderboard.
+
+Every order adds to six counters: product and customer, each for its day, its
+month and all time. Rebuild from orders and orders_archive, from the backend
+directory:
+
+    python -m backend.sales.leaderboard
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List, Tuple
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from backend.core.upsert import upsert_increment
+from backend.customers.stats import customer_key
+from backend.database import SessionLocal
+from backend.models import Order, OrderArchive, LeaderboardTotal
+
+SCOPES = ("product", "customer")
+WINDOWS = ("day", "month", "all")
+METRICS = ("revenue", "orders")
+ALL_TIME = "all"
+
+
+def period_for(window: str, at: datetime) -> str:
+    """The period key a leaderboard window maps to at a point in time."""
+    if window == "day":
+        return at.strftime("%Y-%m-%d")
+    if window == "month":
+        return at.strftime("%Y-%m")
+    return ALL_TIME
+
+
+def _entities(order) -> List[Tuple[str, str, str]]:
+    """(scope, entity_key, label) for each leaderboard an order counts towards."""
+    entities = []
+    if order.readymade_product_id:
+        entities.append(("product", f"readymade:{order.readymade_product_id}", order.product_name))
+    elif order.product_name:
+        name = order.product_name.strip()
+        entities.append(("product", f"name:{name.lower()}"[:255], name))
+    email = customer_key(order.user_email)
+    if email:
+        entities.append(("customer", email, order.user_name or email))
+    return entities
+
+
+def _aggregate(orders: Iterable) -> dict:
+    totals = defaultdict(lambda: [0.0, 0, None])
+    for order in orders:
+        if order.created_at is None:
+            continue
+        for scope, entity_key, label in _entities(order):
+            for window in WINDOWS:
+                total = totals[(scope, period_for(window, order.created_at), entity_key)]
+                total[0] += order.amount or 0
+                total[1] += 1
+                total[2] = label or total[2]
+    return totals
+
+
+def record_orders(db: Session, orders: Iterable, sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) orders from the running totals in the caller's transaction.
+
+    A counter whose last order is removed is deleted, so top_n never has to
+    filter out empty rows.
+    """
+    # Sorted so concurrent writers lock counter rows in the same order
+    for (scope, period, entity_key), (revenue, count, label) in sorted(_aggregate(orders).items()):
+        upsert_increment(
+            db, LeaderboardTotal,
+            keys={"scope": scope, "period": period, "entity_key": entity_key},
+            increments={"revenue": sign * revenue, "order_count": sign * count},
+            values={"label": label} if label and sign > 0 else None
+        )
+        if sign < 0:
+            db.execute(delete(LeaderboardTotal).where(
+                LeaderboardTotal.scope == scope,
+                LeaderboardTotal.period == period,
+                LeaderboardTotal.entity_key == entity_key,
+                LeaderboardTotal.order_count <= 0
+            ))
+
+
+def top_n(db: Session, scope: str, period: str, metric: str = "revenue", limit: int = 10) -> List[dict]:
+    """The `limit` largest entities for one scope and period.
+
+    ORDER BY ... LIMIT walks ix_leaderboard_totals_revenue (or _orders) from the
+    top, so only `limit` rows are read however many entities the period has.
+    """
+    if metric == "orders":
+        rank = (LeaderboardTotal.order_count.desc(), LeaderboardTotal.revenue.desc())
+    else:
+        rank = (LeaderboardTotal.revenue.desc(), LeaderboardTotal.order_count.desc())
+    rows = db.query(
+        LeaderboardTotal.entity_key, LeaderboardTotal.label,
+        LeaderboardTotal.revenue, LeaderboardTotal.order_count
+    ).filter(
+        LeaderboardTotal.scope == scope,
+        LeaderboardTotal.period == period
+    ).order_by(*rank).limit(limit).all()
+
+    return [
+        {
+            "rank": position,
+            "key": row.entity_key,
+            "label": row.label,
+            "revenue": round(float(row.revenue or 0), 2),
+            "order_count": int(row.order_count or 0)
+        }
+        for position, row in enumerate(rows, start=1)
+    ]
+
+
+def rebuild_leaderboards(db: Session):
+    """Recomputes every counter from orders and orders_archive."""
+    db.execute(delete(LeaderboardTotal))
+    for model in (OrderArchive, Order):
+        record_orders(db, db.query(model).yield_per(1000))
+    db.commit()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_leaderboards(db)
+        print(f"Rebuilt leaderboard_totals: {db.query(LeaderboardTotal).count()} counters")
+    finally:
+        db.close()
@@ -0,0 +1,65 @@
+"""Daily sales rollup kept in step with the sales table.
+
+Rebuild (backfill) from sales and sales_archive, from the backend directory:
+
+    python -m backend.sales.rollup
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Tuple
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+from backend.core.upsert import upsert_increment
+from backend.database import SessionLocal
+from backend.models import Sales, SalesArchive, SalesDailyRollup
+
+
+def record_sales(db: Session, sales: Iterable[Tuple[datetime, float]], sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) sales from the rollup in the caller's transaction.
+
+    Takes (sold_at, amount) pairs and issues one upsert per distinct day, in date
+    order so concurrent writers always lock rollup rows in the same sequence.
+    """
+    per_day = defaultdict(lambda: [0.0, 0])
+    for sold_at, amount in sales:
+        if sold_at is None:
+            continue
+        totals = per_day[sold_at.date()]
+        totals[0] += amount or 0
+        totals[1] += 1
+
+    for sale_date, (amount, count) in sorted(per_day.items()):
+        upsert_increment(
+            db, SalesDailyRollup,
+            keys={"sale_date": sale_date},
+            increments={"total_amount": sign * amount, "sales_count": sign * count}
+        )
+
+
+def rebuild_rollup(db: Session):
+    """Recomputes the whole rollup from sales and sales_archive with one INSERT ... SELECT."""
+    all_sales = union_all(
+        select(Sales.date.label("date"), Sales.amount.label("amount")),
+        select(SalesArchive.date.label("date"), SalesArchive.amount.label("amount"))
+    ).subquery()
+    sale_date = func.date(all_sales.c.date)
+
+    db.execute(delete(SalesDailyRollup))
+    db.execute(
+        insert(SalesDailyRollup).from_select(
+            ["sale_date", "total_amount", "sales_count"],
+            select(sale_date, func.sum(all_sales.c.amount), func.count())
+            .where(all_sales.c.date.isnot(None))
+            .group_by(sale_date)
+        )
+    )
+    db.commit()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_rollup(db)
+        print(f"Rebuilt sales_daily_rollup: {db.query(SalesDailyRollup).count()} days")
+    finally:
+        db.close()
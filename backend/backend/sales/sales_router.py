@@ -1,43 +1,160 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from backend.database import get_db
-from backend.models import Sales, Order
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from datetime import datetime, timedelta
+from typing import Optional
+from backend.database import get_db, get_async_db
+from backend.models import Sales, SalesArchive, SalesDailyRollup
+from backend.core.export import stream_export, EXPORT_FORMAT_PATTERN
+from backend.core.cache import aggregate_cache
+from backend.sales.timeseries import sales_timeseries, BUCKETS
+from backend.sales.cube import refresh_cube, query_cube, DIMENSIONS
+from backend.sales.leaderboard import top_n, period_for, SCOPES, WINDOWS, METRICS
+import numpy as np
 
 router = APIRouter(prefix="/api/sales", tags=["Sales & Analytics"])
 
 @router.get("/analytics")
-def get_analytics(db: Session = Depends(get_db)):
-    """Get sales analytics for dashboard"""
+async def get_analytics(days: int = Query(7, ge=1, le=366), db: AsyncSession = Depends(get_async_db)):
+    """Get sales analytics for dashboard, read from the daily rollup rather than raw sales"""
+    cache_key = f"analytics:{days}"
+    cached = aggregate_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    # Total sales amount
-    total_sales = db.query(func.sum(Sales.amount)).scalar() or 0
+    # Total sales amount and number of sales (one per order)
+    total_sales, total_orders = (await db.execute(
+        select(func.sum(SalesDailyRollup.total_amount), func.sum(SalesDailyRollup.sales_count))
+    )).one()
     
-    # Total orders
-    total_orders = db.query(func.count(Order.id)).scalar() or 0
-    
-    # Sales by day (last 7 days)
-    sales_by_day = db.query(
-        Sales.day,
-        func.sum(Sales.amount).label('amount')
-    ).group_by(Sales.day).all()
+    # Sales by day (last `days` calendar days)
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    sales_by_day = (await db.execute(
+        select(SalesDailyRollup)
+        .where(SalesDailyRollup.sale_date >= since)
+        .order_by(SalesDailyRollup.sale_date)
+    )).scalars().all()
     
     sales_by_day_list = [
-        {"day": day, "amount": float(amount) if amount else 0}
-        for day, amount in sales_by_day
+        {
+            "day": r.sale_date.strftime("%A"),
+            "date": r.sale_date,
+            "amount": float(r.total_amount) if r.total_amount else 0
+        }
+        for r in sales_by_day
     ]
     
-    return {
-        "total_revenue": float(total_sales),
-        "total_orders": int(total_orders),
+    result = {
+        "total_revenue": float(total_sales or 0),
+        "total_orders": int(total_orders or 0),
         "sales_by_day": sales_by_day_list,
         "message": "Analytics fetched successfully"
     }
+    aggregate_cache.set(cache_key, result)
+    return result
+
+@router.get("/timeseries")
+def get_sales_timeseries(
+    bucket: str = Query("day", pattern="^(" + "|".join(BUCKETS) + ")$"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    window: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db)
+):
+    """Sales bucketed by hour/day/week/month with rolling and percentile statistics.
+
+    Defaults to the last 365 days, 'to' exclusive. (date, amount) is pulled from
+    sales and sales_archive in one bulk fetch and everything else is computed
+    with vectorised NumPy. This is a plain def so the number crunching runs in
+    the threadpool, off the event loop.
+    """
+    date_to = date_to or datetime.utcnow()
+    date_from = date_from or date_to - timedelta(days=365)
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+
+    def model_query(model):
+        return db.query(model.date, model.amount).filter(model.date >= date_from, model.date < date_to)
+
+    rows = model_query(Sales).union_all(model_query(SalesArchive)).all()
+    dates, amounts = zip(*rows) if rows else ((), ())
+    result = sales_timeseries(
+        np.array(dates, dtype="datetime64[us]"),
+        np.array(amounts, dtype=np.float64),
+        bucket, date_from, date_to, window
+    )
+    if result is None:
+        raise HTTPException(status_code=400, detail="Range too large for this bucket size")
+
+    return {"from": date_from, "to": date_to, **result}
+
+
+@router.get("/cube")
+def get_sales_cube(
+    group_by: str = Query("period,category", description="Comma-separated: " + ", ".join(DIMENSIONS)),
+    period_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    period_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    category: Optional[str] = None,
+    product_id: Optional[int] = None,
+    readymade_product_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Revenue and sales counts from the pre-aggregated sales cube.
+
+    Roll up by grouping on fewer dimensions (e.g. group_by=year), drill down by
+    adding dimensions and filters (e.g. group_by=period,product&category=Cotton).
+    Read-only: covers sales up to the last refresh, which runs every
+    CUBE_REFRESH_INTERVAL_SECONDS or on POST /api/sales/cube/refresh.
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension(s): {', '.join(unknown)}")
+    if "period" in dimensions and "year" in dimensions:
+        raise HTTPException(status_code=400, detail="Group by either period or year, not both")
+
+    cells = query_cube(db, dimensions, period_from, period_to, category, product_id, readymade_product_id)
+    return {
+        "group_by": dimensions,
+        "total_revenue": round(sum(c["revenue"] for c in cells), 2),
+        "total_sales": sum(c["sales_count"] for c in cells),
+        "cells": cells
+    }
+
+
+@router.post("/cube/refresh")
+def refresh_sales_cube(db: Session = Depends(get_db)):
+    """Fold sales recorded since the last refresh into the cube now, instead of waiting for the next scheduled one"""
+    return {"folded": refresh_cube(db)}
+
+
+@router.get("/leaderboard")
+def get_leaderboard(
+    scope: str = Query("product", pattern="^(" + "|".join(SCOPES) + ")$"),
+    window: str = Query("month", pattern="^(" + "|".join(WINDOWS) + ")$"),
+    metric: str = Query("revenue", pattern="^(" + "|".join(METRICS) + ")$"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Best-selling products or biggest customers for today, this month (UTC) or all time"""
+    period = period_for(window, datetime.utcnow())
+    return {
+        "scope": scope,
+        "window": window,
+        "period": period,
+        "metric": metric,
+        "entries": top_n(db, scope, period, metric, limit)
+    }
+
 
 @router.get("/")
-def get_all_sales(db: Session = Depends(get_db)):
+def get_all_sales(include_archived: bool = False, db: Session = Depends(get_db)):
     """Get all sales records"""
     sales = db.query(Sales).order_by(Sales.date.desc()).all()
+    if include_archived:
+        archived = db.query(SalesArchive).order_by(SalesArchive.date.desc()).all()
+        sales = sorted([*sales, *archived], key=lambda s: s.date or datetime.min, reverse=True)
     return [
         {
             "id": s.id,
@@ -49,3 +166,31 @@ def get_all_sales(db: Session = Depends(get_db)):
         }
         for s in sales
     ]
+
+
+SALES_EXPORT_COLUMNS = ["id", "date", "day", "amount", "transaction_id", "order_id"]
+
+
+@router.get("/export")
+def export_sales(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    include_archived: bool = False
+):
+    """Stream sales records (oldest first) as CSV or NDJSON for accounting"""
+    def model_query(db: Session, model):
+        query = db.query(*[getattr(model, column) for column in SALES_EXPORT_COLUMNS])
+        if date_from:
+            query = query.filter(model.date >= date_from)
+        if date_to:
+            query = query.filter(model.date < date_to)
+        return query
+
+    def build_query(db: Session):
+        query = model_query(db, Sales)
+        if include_archived:
+            query = query.union_all(model_query(db, SalesArchive))
+        return query.order_by(Sales.date, Sales.id)
+
+    return stream_export(build_query, SALES_EXPORT_COLUMNS, format, "sales")
@@ -0,0 +1,113 @@
+"""Vectorised sales time series: bucketing, rolling and percentile statistics in NumPy."""
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
+
+BUCKETS = ("hour", "day", "week", "month")
+
+# Refuse requests that would produce more buckets than this (e.g. hourly over a decade)
+MAX_BUCKETS = 10000
+
+
+def _bucket_keys(dates: np.ndarray, bucket: str) -> tuple:
+    """Maps datetime64 values to bucket start keys; returns (keys, step between consecutive buckets)."""
+    if bucket == "hour":
+        return dates.astype("datetime64[h]"), 1
+    if bucket == "month":
+        return dates.astype("datetime64[M]"), 1
+    days = dates.astype("datetime64[D]")
+    if bucket == "week":
+        # Day 0 (1970-01-01) was a Thursday; shift back to the Monday that starts each week
+        day_numbers = days.astype(np.int64)
+        return (day_numbers - (day_numbers + 3) % 7).astype("datetime64[D]"), 7
+    return days, 1
+
+
+def _group_percentile(sorted_amounts: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated percentile of each group in an array sorted by (group, amount)."""
+    position = starts + q * np.maximum(counts - 1, 0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    last = max(len(sorted_amounts) - 1, 0)
+    padded = sorted_amounts if len(sorted_amounts) else np.zeros(1)
+    low_values = padded[np.clip(lower, 0, last)]
+    high_values = padded[np.clip(upper, 0, last)]
+    values = low_values + (high_values - low_values) * (position - lower)
+    return np.where(counts > 0, values, np.nan)
+
+
+def _to_json(values: np.ndarray, decimals: int = 2) -> list:
+    return [None if np.isnan(v) else v for v in np.round(values, decimals).tolist()]
+
+
+def sales_timeseries(
+    dates: np.ndarray,
+    amounts: np.ndarray,
+    bucket: str,
+    date_from: datetime,
+    date_to: datetime,
+    window: int = 7
+) -> Optional[dict]:
+    """Buckets (date, amount) arrays and computes per-bucket statistics.
+
+    Every bucket from date_from up to (not including) date_to is returned, including empty ones,
+    with its total, sale count, trailing moving average of totals over `window`
+    buckets, median and 90th percentile sale amount, and the change against the
+    previous bucket. Returns None if the range needs more than MAX_BUCKETS buckets.
+    """
+    first_key, step = _bucket_keys(np.array([date_from], dtype="datetime64[us]"), bucket)
+    # date_to is exclusive: a range ending on a bucket boundary doesn't open an empty bucket
+    last_key, _ = _bucket_keys(np.array([date_to - timedelta(microseconds=1)], dtype="datetime64[us]"), bucket)
+    axis = np.arange(first_key[0], last_key[0] + step, step)
+    n = len(axis)
+    if n > MAX_BUCKETS:
+        return None
+
+    keys, _ = _bucket_keys(dates, bucket)
+    positions = (keys - axis[0]).astype(np.int64) // step
+
+    totals = np.bincount(positions, weights=amounts, minlength=n)[:n].astype(np.float64)
+    counts = np.bincount(positions, minlength=n)[:n]
+
+    # Trailing moving average of bucket totals via prefix sums
+    prefix = np.concatenate(([0.0], np.cumsum(totals)))
+    ends = np.arange(1, n + 1)
+    starts = np.maximum(ends - window, 0)
+    moving_avg = (prefix[ends] - prefix[starts]) / (ends - starts)
+
+    # Per-bucket percentiles: sort once by (bucket, amount) and index into each group
+    order = np.lexsort((amounts, positions))
+    sorted_amounts = amounts[order]
+    group_starts = np.searchsorted(positions[order], np.arange(n))
+    p50 = _group_percentile(sorted_amounts, group_starts, counts, 0.5)
+    p90 = _group_percentile(sorted_amounts, group_starts, counts, 0.9)
+
+    # Period-over-period change
+    previous = np.concatenate(([np.nan], totals[:-1]))
+    delta = totals - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(previous > 0, delta / previous * 100, np.nan)
+
+    labels = np.datetime_as_string(axis).tolist()
+    columns = zip(
+        labels, _to_json(totals), counts.tolist(), _to_json(moving_avg),
+        _to_json(p50), _to_json(p90), _to_json(delta), _to_json(delta_pct)
+    )
+    return {
+        "bucket": bucket,
+        "window": window,
+        "summary": {
+            "total_revenue": round(float(amounts.sum()), 2),
+            "sales_count": int(len(amounts)),
+            "mean_per_bucket": round(float(totals.mean()), 2) if n else 0.0,
+            "p50_sale": round(float(np.percentile(amounts, 50)), 2) if len(amounts) else None,
+            "p90_sale": round(float(np.percentile(amounts, 90)), 2) if len(amounts) else None
+        },
+        "series": [
+            {
+                "bucket": label, "total": total, "count": count, "moving_avg": avg,
+                "p50": median, "p90": high, "delta": change, "delta_pct": change_pct
+            }
+            for label, total, count, avg, median, high, change, change_pct in columns
+        ]
+    }
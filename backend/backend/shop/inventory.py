@@ -0,0 +1,41 @@
+import re
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from backend.models import ReadymadeProduct
+
+
+def order_units(quantity: Optional[str]) -> int:
+    """Units an order takes from stock: the leading whole number of the free-text quantity ("10 pcs" -> 10).
+
+    Raises ValueError when there is no leading number or it isn't positive.
+    """
+    match = re.match(r"\s*(\d+)", str(quantity or ""))
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Quantity must start with a positive whole number, got {quantity!r}")
+    return int(match.group(1))
+
+
+def reserve_stock(db: Session, product_id: int, units: int) -> bool:
+    """Takes units from a product's stock inside the caller's transaction.
+
+    This is a single conditional UPDATE, so concurrent checkouts serialise on the
+    row and stock can never go below zero. Returns False if there wasn't enough.
+    """
+    result = db.execute(
+        update(ReadymadeProduct)
+        .where(ReadymadeProduct.id == product_id, ReadymadeProduct.stock >= units)
+        .values(stock=ReadymadeProduct.stock - units)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release_stock(db: Session, product_id: int, units: int):
+    """Puts units reserved by a cancelled order back on the shelf."""
+    db.execute(
+        update(ReadymadeProduct)
+        .where(ReadymadeProduct.id == product_id, ReadymadeProduct.stock.isnot(None))
+        .values(stock=ReadymadeProduct.stock + units)
+        .execution_options(synchronize_session=False)
+    )
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
 from backend.models import ReadymadeProduct
+from backend.core.multiget import parse_ids, in_requested_order
 from pydantic import BaseModel
+from typing import Optional
 
 router = APIRouter(prefix="/api/readymade-products", tags=["Shop Products"])
 
@@ -12,50 +15,60 @@ class ReadymadeProductResponse(BaseModel):
     quantity: str
     quality: str
     price: int = None
+    stock: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+def _serialize_product(p: ReadymadeProduct) -> dict:
+    return {
+        "id": p.id,
+        "name": p.name,
+        "quantity": p.quantity or "1 unit",
+        "quality": p.quality or "Standard",
+        "price": int(p.price) if p.price else 0,
+        "stock": p.stock,
+        "image": "https://images.unsplash.com/photo-1584308666744-24d5c474f2ae?w=400"
+    }
+
+
 @router.get("/", response_model=list)
-def get_readymade_products(db: Session = Depends(get_db)):
+async def get_readymade_products(db: AsyncSession = Depends(get_async_db)):
     """Get all readymade products for shop"""
-    products = db.query(ReadymadeProduct).all()
-    return [
-        {
-            "id": p.id,
-            "name": p.name,
-            "quantity": p.quantity or "1 unit",
-            "quality": p.quality or "Standard",
-            "price": int(p.price) if p.price else 0,
-            "image": "https://images.unsplash.com/photo-1584308666744-24d5c474f2ae?w=400"
-        }
-        for p in products
-    ]
+    products = (await db.execute(select(ReadymadeProduct))).scalars().all()
+    return [_serialize_product(p) for p in products]
+
+
+@router.get("/batch")
+async def get_readymade_products_batch(ids: str, db: AsyncSession = Depends(get_async_db)):
+    """Get several readymade products by ID (?ids=1,2,3) with one IN query, in the requested order"""
+    product_ids = parse_ids(ids)
+    products = (await db.execute(
+        select(ReadymadeProduct).where(ReadymadeProduct.id.in_(product_ids))
+    )).scalars().all()
+    found, missing = in_requested_order(products, product_ids)
+    return {
+        "items": [_serialize_product(p) for p in found],
+        "missing": missing
+    }
 
 
 @router.get("/{product_id}")
-def get_readymade_product(product_id: int, db: Session = Depends(get_db)):
+async def get_readymade_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get specific readymade product"""
-    product = db.query(ReadymadeProduct).filter(ReadymadeProduct.id == product_id).first()
+    product = await db.get(ReadymadeProduct, product_id)
     if not product:
         return {"error": "Product not found"}
     
-    return {
-        "id": product.id,
-        "name": product.name,
-        "quantity": product.quantity or "1 unit",
-        "quality": product.quality or "Standard",
-        "price": int(product.price) if product.price else 0,
-        "image": "https://images.unsplash.com/photo-1584308666744-24d5c474f2ae?w=400"
-    }
+    return _serialize_product(product)
 
 # --- Bulk Fabrics (Product Model) ---
 from backend.models import Product
 
 @router.get("/cat/all", tags=["Catalogue"])
-def get_catalogue_products(db: Session = Depends(get_db)):
+async def get_catalogue_products(db: AsyncSession = Depends(get_async_db)):
     """Get all bulk fabrics for the Products page"""
-    fabrics = db.query(Product).all()
+    fabrics = (await db.execute(select(Product))).scalars().all()
     return [
         {
             "id": f.id,
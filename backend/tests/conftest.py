@@ -0,0 +1,37 @@
+"""Runs the backend against a throwaway SQLite file, from the backend directory:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Must be set before backend.database builds its engines
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bim-mills-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend import models  # noqa: E402  (registers every table on Base)
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    """Fresh, empty tables for every test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
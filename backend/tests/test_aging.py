@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.database import engine
+from backend.models import Invoice, Order, Vendor, VendorPayment
+from backend.reports.reports_router import router
+
+AS_OF = date(2026, 6, 1)
+MIDNIGHT = datetime(2026, 6, 1)
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _invoice(number: int, email: str, amount: float, status, due_days_ago) -> Invoice:
+    due_date = None if due_days_ago is None else MIDNIGHT - timedelta(days=due_days_ago)
+    return Invoice(invoice_number=f"INV-{number}", order_id=1, customer_name=email.split("@")[0],
+                   customer_email=email, subtotal=amount, total_amount=amount,
+                   payment_status=status, due_date=due_date)
+
+
+def test_receivables_buckets_and_groups(db):
+    db.add(Order(id=1, user_name="Customer", amount=1))
+    db.add_all([
+        _invoice(1, "a@x.com", 10, "Pending", 0),      # Due at midnight: not yet overdue
+        _invoice(2, "a@x.com", 20, "Pending", None),   # No due date
+        _invoice(3, "a@x.com", 30, "Overdue", 1),      # 1-30
+        _invoice(4, "b@x.com", 40, "Overdue", 30),     # 1-30
+        _invoice(5, "b@x.com", 50, None, 31),          # 31-60
+        _invoice(6, "b@x.com", 60, "Pending", 75),     # 61-90
+        _invoice(7, "b@x.com", 70, "Overdue", 400),    # 90+
+        _invoice(8, "b@x.com", 999, "Paid", 400),      # Closed
+    ])
+    db.commit()
+    db.query(Invoice).filter(Invoice.invoice_number == "INV-5").update({"payment_status": None})
+    db.commit()
+
+    report = _client().get("/api/reports/aging", params={"as_of": AS_OF.isoformat()}).json()
+    assert {b["bucket"]: (b["count"], b["amount"]) for b in report["buckets"]} == {
+        "current": (2, 30), "1-30": (2, 70), "31-60": (1, 50), "61-90": (1, 60), "90+": (1, 70)
+    }
+    assert (report["count"], report["amount"]) == (7, 280)
+
+    grouped = _client().get("/api/reports/aging", params={
+        "as_of": AS_OF.isoformat(), "group_by": "customer"
+    }).json()
+    assert [(g["key"], g["count"], g["amount"]) for g in grouped["groups"]] == [("b@x.com", 4, 220), ("a@x.com", 3, 60)]
+    assert grouped["buckets"] == report["buckets"]
+
+
+def test_payables_read_open_payments_through_the_due_date_index(db):
+    vendor = Vendor(name="Supplier")
+    db.add(vendor)
+    db.flush()
+    db.add_all([
+        VendorPayment(vendor_id=vendor.id, payment_number="VP-1", amount=100, status="Pending",
+                      due_date=MIDNIGHT - timedelta(days=45)),
+        VendorPayment(vendor_id=vendor.id, payment_number="VP-2", amount=500, status="Cancelled",
+                      due_date=MIDNIGHT - timedelta(days=45)),
+    ])
+    db.commit()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *_):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        report = _client().get("/api/reports/aging", params={
+            "ledger": "payables", "group_by": "vendor", "as_of": AS_OF.isoformat()
+        }).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert [(g["name"], g["count"], g["amount"]) for g in report["groups"]] == [("Supplier", 1, 100)]
+
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            assert "SCAN vendor_payments" not in plan, plan
@@ -0,0 +1,51 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.customers.customer_router import router as customer_router
+from backend.models import Order
+from backend.orders import orders_router as orders_module
+from backend.orders.orders_router import router as orders_router
+from backend.payments.invoice_router import router as invoice_router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    for router in (customer_router, orders_router, invoice_router):
+        app.include_router(router)
+    return TestClient(app)
+
+
+def _order(client, email: str, amount: float) -> int:
+    response = client.post("/api/orders/", json={
+        "user_name": "Asha", "user_email": email, "product_name": "Kurta", "quantity": "1", "amount": amount
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_every_path_uses_the_normalized_email(db, monkeypatch):
+    sent = []
+    for sender in ("send_order_confirmation", "send_cancellation_confirmation"):
+        monkeypatch.setattr(orders_module, sender, lambda to, html: sent.append(to))
+    client = _client()
+    first = _order(client, "  Asha@Example.com ", 100)
+    second = _order(client, "asha@example.COM", 40)
+    assert {email for (email,) in db.query(Order.user_email)} == {"asha@example.com"}
+
+    assert client.post("/api/invoices/generate", json={"order_id": first}).status_code == 200
+    assert client.post(f"/api/orders/{second}/request-cancellation", json={"email": "ASHA@example.com "}).status_code == 200
+    listed = client.get("/api/orders/", params={"user_email": " Asha@EXAMPLE.com"}).json()
+    assert sorted(order["id"] for order in listed) == [first, second]
+
+    customer = client.get("/api/customers/ASHA@example.com").json()
+    assert (customer["order_count"], customer["lifetime_value"], customer["open_cancellations"]) == (2, 140, 1)
+    assert customer["invoice_count"] == 1
+    assert [invoice["customer_email"] for invoice in customer["invoices"]] == ["asha@example.com"]
+
+    # Cancelling the newest order moves last_order_at back to the remaining one
+    assert client.delete(f"/api/orders/{second}").status_code == 200
+    customer = client.get("/api/customers/asha@example.com").json()
+    assert (customer["order_count"], customer["lifetime_value"], customer["open_cancellations"]) == (1, 100, 0)
+    assert sent == ["asha@example.com"] * 3  # Two confirmations and a cancellation
+    first_created = db.get(Order, first).created_at
+    assert customer["last_order_at"].startswith(first_created.isoformat()[:19])
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.idempotency import purge_expired_keys
+from backend.models import IdempotencyKey, Order, Sales, Vendor, VendorPayment
+from backend.orders.orders_router import router as orders_router
+from backend.payments.vendor_payment_router import router as vendor_payment_router
+
+ORDER = {"user_name": "Asha", "product_name": "Kurta", "quantity": "1", "amount": 250}
+
+
+def _worker() -> TestClient:
+    """A separate app instance, standing in for another worker process."""
+    app = FastAPI()
+    app.include_router(orders_router)
+    app.include_router(vendor_payment_router)
+    return TestClient(app)
+
+
+def test_retry_on_another_worker_replays_the_first_response(db):
+    headers = {"Idempotency-Key": "checkout-1"}
+    first = _worker().post("/api/orders/", json=ORDER, headers=headers)
+    retry = _worker().post("/api/orders/", json=ORDER, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert db.query(Order).count() == db.query(Sales).count() == 1
+
+    changed = _worker().post("/api/orders/", json={**ORDER, "amount": 300}, headers=headers)
+    assert changed.status_code == 422
+
+    # Scoped per endpoint: the same key on another endpoint is a different request
+    vendor = Vendor(name="Supplier")
+    db.add(vendor)
+    db.commit()
+    payment = _worker().post("/api/vendor-payments/", json={"vendor_id": vendor.id, "amount": 80}, headers=headers)
+    assert payment.status_code == 200
+    assert db.query(VendorPayment).count() == 1
+
+
+def test_failed_request_releases_its_key(db):
+    headers = {"Idempotency-Key": "pay-1"}
+    missing = _worker().post("/api/vendor-payments/", json={"vendor_id": 999, "amount": 80}, headers=headers)
+    assert missing.status_code == 404
+    assert db.query(IdempotencyKey).count() == 0
+
+    db.add(Vendor(id=999, name="Supplier"))
+    db.commit()
+    assert _worker().post("/api/vendor-payments/", json={"vendor_id": 999, "amount": 80}, headers=headers).status_code == 200
+
+
+def test_expired_keys_run_again_and_are_purged(db):
+    headers = {"Idempotency-Key": "checkout-2"}
+    _worker().post("/api/orders/", json=ORDER, headers=headers)
+    db.query(IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert _worker().post("/api/orders/", json=ORDER, headers=headers).status_code == 201
+    assert db.query(Order).count() == 2
+
+    db.query(IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert purge_expired_keys() == 1
+    assert db.query(IdempotencyKey).count() == 0
+
+
+def test_simultaneous_retries_create_one_order(db):
+    headers = {"Idempotency-Key": "checkout-3"}
+    start = threading.Barrier(6)
+
+    def attempt():
+        client = _worker()
+        start.wait()
+        return client.post("/api/orders/", json=ORDER, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(lambda _: attempt(), range(6)))
+
+    assert db.query(Order).count() == 1
+    created = [r for r in responses if r.status_code == 201]
+    assert created and all(r.json() == created[0].json() for r in created)
+    assert all(r.status_code in (201, 409) for r in responses)
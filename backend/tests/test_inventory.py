@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from backend.database import SessionLocal
+from backend.models import ReadymadeProduct
+from backend.shop.inventory import order_units, reserve_stock
+
+
+@pytest.mark.parametrize("quantity, units", [("3", 3), ("10 pcs", 10), (" 7 metres", 7), (12, 12)])
+def test_order_units_reads_leading_number(quantity, units):
+    assert order_units(quantity) == units
+
+
+@pytest.mark.parametrize("quantity", ["0", "-5", "pcs", "", None, "about 5"])
+def test_order_units_rejects_non_positive_or_unparseable(quantity):
+    with pytest.raises(ValueError):
+        order_units(quantity)
+
+
+def test_parallel_reservations_never_oversell(db):
+    product = ReadymadeProduct(name="Shirt", quantity="1", quality="A", stock=10)
+    db.add(product)
+    db.commit()
+    product_id = product.id
+
+    workers, units = 12, 3
+    start = threading.Barrier(workers)
+    results = []
+
+    def checkout():
+        session = SessionLocal()
+        try:
+            start.wait()
+            reserved = reserve_stock(session, product_id, units)
+            session.commit()
+            results.append(reserved)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=checkout) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.expire_all()
+    stock = db.get(ReadymadeProduct, product_id).stock
+    assert len(results) == workers
+    assert results.count(True) == 10 // units
+    assert stock == 10 - results.count(True) * units
+    assert stock >= 0
@@ -0,0 +1,62 @@
+import re
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.config import settings
+from backend.models import Invoice, Order
+from backend.payments import invoice_pdf
+from backend.payments.invoice_router import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _invoice(**fields) -> Invoice:
+    return Invoice(**{
+        "invoice_number": "INV-1", "order_id": 1, "customer_name": "Customer", "subtotal": 100,
+        "tax_rate": 5, "tax_amount": 5, "total_amount": 105, "issue_date": datetime(2026, 1, 1),
+        **fields
+    })
+
+
+def test_revalidation_answers_304_without_rendering(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INVOICE_PDF_CACHE_DIR", str(tmp_path))
+    db.add(Order(id=1, user_name="Customer", amount=100))
+    invoice = _invoice()
+    db.add(invoice)
+    db.commit()
+
+    client = _client()
+    response = client.get(f"/api/invoices/{invoice.id}/pdf")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    def fail(_):
+        raise AssertionError("rendered on revalidation")
+
+    monkeypatch.setattr(invoice_pdf, "render_invoice_pdf", fail)
+    for file in tmp_path.iterdir():
+        file.unlink()  # Nor read from the cache
+    for header in (etag, f"W/{etag}", '"other", ' + etag, "*"):
+        response = client.get(f"/api/invoices/{invoice.id}/pdf", headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+
+def test_long_invoice_spills_onto_more_pages():
+    assert b"/Count 1 " in invoice_pdf.render_invoice_pdf(_invoice(notes="Short note"))
+
+    notes = " ".join(f"word{i}" for i in range(3000))
+    pdf = invoice_pdf.render_invoice_pdf(_invoice(notes=notes))
+    pages = int(re.search(rb"/Count (\d+)", pdf).group(1))
+    assert pages > 1
+    assert pdf.count(b"/Type /Page ") == pages
+    assert pdf.endswith(b"\n%%EOF\n")
+    assert b"word2999" in pdf  # Nothing falls off the bottom of the last page
+    for y in re.findall(rb"1 0 0 1 \d+ (-?\d+) Tm", pdf):
+        assert int(y) >= invoice_pdf.MARGIN // 2
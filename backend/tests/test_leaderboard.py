@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend.database import engine
+from backend.models import Order
+from backend.sales.leaderboard import record_orders, top_n
+
+
+def _orders(db, *rows):
+    orders = [
+        Order(user_name=name, user_email=email, product_name="Kurta", amount=amount, created_at=datetime(2026, 5, 4))
+        for name, email, amount in rows
+    ]
+    record_orders(db, orders)
+    db.commit()
+
+
+def test_top_customers_by_each_metric(db):
+    _orders(
+        db,
+        ("Asha", " Asha@Example.com", 500), ("Asha", "asha@example.com", 100),
+        ("Ravi", "ravi@example.com", 700), ("Meena", "meena@example.com", 50),
+        ("Meena", "meena@example.com", 60), ("Meena", "meena@example.com", 70),
+    )
+    by_revenue = top_n(db, "customer", "2026-05", "revenue", limit=2)
+    assert [(e["key"], e["revenue"]) for e in by_revenue] == [("ravi@example.com", 700), ("asha@example.com", 600)]
+    by_orders = top_n(db, "customer", "all", "orders", limit=3)
+    assert [(e["rank"], e["key"], e["order_count"]) for e in by_orders] == [
+        (1, "meena@example.com", 3), (2, "asha@example.com", 2), (3, "ravi@example.com", 1)
+    ]
+
+
+def test_top_n_reads_the_rank_index_instead_of_sorting(db):
+    _orders(db, ("Asha", "asha@example.com", 500))
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *_):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for metric in ("revenue", "orders"):
+            top_n(db, "customer", "all", metric)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            assert "USING INDEX ix_leaderboard_totals_" in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_cancelling_a_customers_only_order_drops_them(db):
+    order = Order(user_name="Asha", user_email="asha@example.com", product_name="Kurta", amount=500,
+                  created_at=datetime(2026, 5, 4))
+    record_orders(db, [order])
+    _orders(db, ("Ravi", "ravi@example.com", 10))
+    record_orders(db, [order], sign=-1)
+    db.commit()
+    assert [e["key"] for e in top_n(db, "customer", "all")] == ["ravi@example.com"]
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import Order
+from backend.orders.orders_router import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_cancellation_requests_are_found_past_the_first_page(db):
+    start = datetime(2026, 1, 1)
+    db.add_all([
+        Order(user_name=f"Customer {i}", amount=10, created_at=start + timedelta(hours=i),
+              cancellation_requested=1 if i % 10 == 0 else 0)
+        for i in range(35)
+    ])
+    db.commit()
+
+    client = _client()
+    requested, cursor, pages = [], None, 0
+    while True:
+        params = {"cancellation_requested": "true", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/orders/", params=params)
+        assert response.status_code == 200
+        requested += [order["user_name"] for order in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Newest first, including the oldest request that an unfiltered first page would miss
+    assert requested == ["Customer 30", "Customer 20", "Customer 10", "Customer 0"]
+    assert pages == 2
+
+
+def test_backfilled_legacy_orders_page_by_id_and_new_nulls_are_rejected(db):
+    # Migration 023 gives legacy orders without a timestamp the epoch, so they tie on created_at
+    legacy = datetime(1970, 1, 1)
+    db.add_all([Order(id=i, user_name=f"Legacy {i}", created_at=legacy) for i in range(1, 6)])
+    db.add(Order(id=6, user_name="Recent", created_at=datetime(2026, 1, 1)))
+    db.commit()
+
+    client = _client()
+    names, cursor = [], None
+    while True:
+        response = client.get("/api/orders/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names += [order["user_name"] for order in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == ["Recent", "Legacy 5", "Legacy 4", "Legacy 3", "Legacy 2", "Legacy 1"]
+
+    with pytest.raises(IntegrityError):
+        db.execute(text("INSERT INTO orders (user_name, created_at) VALUES ('No timestamp', NULL)"))
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.database import engine
+from backend.models import Sales, SalesCubeState
+from backend.sales.cube import rebuild_cube, refresh_cube
+from backend.sales.sales_router import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _sale(sale_id: int, amount: float) -> Sales:
+    return Sales(id=sale_id, date=datetime(2026, 3, 1), amount=amount, transaction_id=f"TXN-{sale_id}")
+
+
+def _cube_total(client) -> tuple:
+    body = client.get("/api/sales/cube", params={"group_by": "period"}).json()
+    return body["total_revenue"], body["total_sales"]
+
+
+def test_reading_the_cube_never_writes(db):
+    db.add(_sale(1, 100))
+    db.commit()
+
+    writes = []
+
+    def before_cursor_execute(conn, cursor, statement, *_):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert _cube_total(_client()) == (0, 0)  # Not folded until a refresh
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert writes == []
+
+    assert _client().post("/api/sales/cube/refresh").json() == {"folded": 1}
+    assert _cube_total(_client()) == (100, 1)
+
+
+def test_sale_committed_after_a_higher_id_is_still_folded(db):
+    db.add(_sale(5, 50))
+    db.commit()
+    assert refresh_cube(db) == 1
+
+    # An insert that took id 3 earlier but only committed now
+    db.add(_sale(3, 30))
+    db.commit()
+    assert refresh_cube(db) == 1
+    assert refresh_cube(db) == 0
+    assert _cube_total(_client()) == (80, 2)
+
+    rebuild_cube(db)
+    assert _cube_total(_client()) == (80, 2)
+
+
+def test_refresh_locks_the_seeded_state_row_without_inserting_it(db):
+    assert db.query(SalesCubeState.id).all() == [(1,)]  # Seeded with the table
+    db.add(_sale(1, 10))
+    db.commit()
+
+    inserts = []
+
+    def before_cursor_execute(conn, cursor, statement, *_):
+        if "sales_cube_state" in statement and not statement.lstrip().upper().startswith("SELECT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert refresh_cube(db) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert inserts == []
+
+    db.query(SalesCubeState).delete()
+    db.commit()
+    with pytest.raises(RuntimeError):
+        rebuild_cube(db)
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.models import Sales, SalesArchive
+from backend.sales.sales_router import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_timeseries_includes_archived_sales_and_excludes_to(db):
+    db.add_all([
+        SalesArchive(id=1, date=datetime(2026, 1, 5, 10), amount=100, transaction_id="TXN-1"),
+        Sales(date=datetime(2026, 1, 6, 12), amount=50, transaction_id="TXN-2"),
+        Sales(date=datetime(2026, 1, 8), amount=999, transaction_id="TXN-3"),  # On 'to': left out
+    ])
+    db.commit()
+
+    response = _client().get("/api/sales/timeseries", params={
+        "bucket": "day", "from": "2026-01-05T00:00:00", "to": "2026-01-08T00:00:00"
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [point["bucket"] for point in body["series"]] == ["2026-01-05", "2026-01-06", "2026-01-07"]
+    assert [point["total"] for point in body["series"]] == [100, 50, 0]
+    assert body["summary"]["sales_count"] == 2
+
+
+def test_range_inside_one_bucket_still_has_that_bucket():
+    response = _client().get("/api/sales/timeseries", params={
+        "bucket": "month", "from": "2026-03-10T00:00:00", "to": "2026-03-11T00:00:00"
+    })
+    assert [point["bucket"] for point in response.json()["series"]] == ["2026-03"]
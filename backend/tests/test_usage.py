@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.metering.usage import meter_orders, rebuild_usage
+from backend.models import Order, UsageCounter
+from backend.orders.orders_router import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _counters(db) -> dict:
+    db.expire_all()
+    return {
+        (counter.period, counter.metric): counter.value
+        for counter in db.query(UsageCounter) if counter.value
+    }
+
+
+def test_live_counters_match_rebuild_after_deletes(db):
+    # Placed last year, cancelled now: comes out of the month it was metered in
+    old = Order(user_name="Old", product_name="Saree", quantity="1", amount=40, created_at=datetime(2025, 1, 15))
+    db.add(old)
+    db.flush()
+    meter_orders(db, [old])
+    db.commit()
+
+    client = _client()
+    ids = []
+    for amount in (100, 250, 75):
+        response = client.post("/api/orders/", json={
+            "user_name": "Customer", "product_name": "Kurta", "quantity": "1", "amount": amount
+        })
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+
+    assert client.delete(f"/api/orders/{ids[1]}").status_code == 200
+    assert client.delete(f"/api/orders/{old.id}").status_code == 200
+
+    live = _counters(db)
+    period = datetime.utcnow().strftime("%Y-%m")
+    assert live == {(period, "orders_processed"): 2, (period, "revenue_processed"): 175}
+
+    rebuild_usage(db)
+    assert _counters(db) == live
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.models import Vendor, VendorBalance
+from backend.payments.import_router import router as import_router
+from backend.payments.vendor_router import router as vendor_router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(vendor_router)
+    app.include_router(import_router)
+    return TestClient(app)
+
+
+def test_import_updates_vendor_whose_gstin_was_typed_in_another_case(db):
+    client = _client()
+    created = client.post("/api/vendors/", json={"name": "Old name", "gstin": " 27abc "}).json()
+    assert created["gstin"] == "27ABC"
+
+    csv_file = b"name,gstin,phone\nNew name,27ABC,99\nOther,29xyz,\n"
+    report = client.post("/api/import/vendors", files={"file": ("vendors.csv", csv_file)}).json()
+
+    assert (report["inserted"], report["updated"], report["error_count"]) == (1, 1, 0)
+    vendors = {vendor.gstin: vendor for vendor in db.query(Vendor)}
+    assert set(vendors) == {"27ABC", "29XYZ"}
+    assert (vendors["27ABC"].id, vendors["27ABC"].name, vendors["27ABC"].phone) == (created["id"], "New name", "99")
+
+
+def test_duplicate_gstin_is_rejected_on_create():
+    client = _client()
+    assert client.post("/api/vendors/", json={"name": "A", "gstin": "27ABC"}).status_code == 200
+    assert client.post("/api/vendors/", json={"name": "B", "gstin": "27abc"}).status_code == 409
+
+
+def test_xlsx_upload(db):
+    openpyxl = pytest.importorskip("openpyxl")
+    client = _client()
+
+    def upload(path: str, rows: list):
+        workbook = openpyxl.Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return client.post(path, files={"file": ("sheet.xlsx", buffer.getvalue())}).json()
+
+    vendors = upload("/api/import/vendors", [
+        ["Name", "GSTIN", "Phone"],
+        ["Mill One", "27aaa", 9876543210],
+        [None, "27bbb", None],  # Missing name
+    ])
+    assert (vendors["inserted"], vendors["error_count"]) == (1, 1)
+    assert vendors["errors"][0]["row"] == 3
+    vendor = db.query(Vendor).one()
+    assert (vendor.gstin, vendor.phone) == ("27AAA", "9876543210")
+
+    payments = upload("/api/import/vendor-payments", [
+        ["Vendor GSTIN", "Amount", "Status"],
+        ["27AAA", 1500.5, "Paid"],
+        ["27aaa", 200, None],
+        ["27ZZZ", 10, None],
+    ])
+    assert (payments["inserted"], payments["error_count"]) == (2, 1)
+    balance = db.get(VendorBalance, vendor.id)
+    assert (balance.paid_amount, balance.outstanding_amount) == (1500.5, 200)
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.database import engine
+from backend.models import Vendor, VendorBalance, VendorPayment
+from backend.payments.overdue import sweep_overdue
+from backend.payments.vendor_payment_router import router
+from backend.payments.vendor_router import router as vendor_router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@contextmanager
+def count_statements():
+    counter = {"statements": 0}
+
+    def before_cursor_execute(*_):
+        counter["statements"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _add_payments(db, count: int, vendors: int):
+    vendor_rows = [Vendor(name=f"Vendor {i}") for i in range(vendors)]
+    db.add_all(vendor_rows)
+    db.flush()
+    db.add_all([
+        VendorPayment(vendor_id=vendor_rows[i % vendors].id, payment_number=f"VP-{i}", amount=10 + i)
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _listing_statements(db, count: int, vendors: int) -> int:
+    _add_payments(db, count, vendors)
+    with count_statements() as counter:
+        response = _client().get("/api/vendor-payments/", params={"limit": 100})
+    assert response.status_code == 200
+    payments = response.json()
+    assert len(payments) == count
+    assert all(payment["vendor"]["name"].startswith("Vendor ") for payment in payments)
+    return counter["statements"]
+
+
+def test_listing_query_count_does_not_grow_with_payments(db):
+    one = _listing_statements(db, count=1, vendors=1)
+    db.query(VendorPayment).delete()
+    db.query(Vendor).delete()
+    db.commit()
+    many = _listing_statements(db, count=50, vendors=7)
+    assert many == one
+
+
+def test_balances_list_vendors_without_payments():
+    app = FastAPI()
+    app.include_router(vendor_router)
+    client = TestClient(app)
+    paid = client.post("/api/vendors/", json={"name": "Paid"}).json()["id"]
+    unpaid = client.post("/api/vendors/", json={"name": "Unpaid"}).json()["id"]
+    payments = _client()
+    assert payments.post("/api/vendor-payments/", json={"vendor_id": paid, "amount": 500}).status_code == 200
+
+    for sort in ("outstanding_amount", "updated_at"):
+        rows = client.get("/api/vendors/balances", params={"sort": sort}).json()
+        assert [row["vendor_id"] for row in rows] == [paid, unpaid]
+    unpaid_row = rows[1]
+    assert unpaid_row["outstanding_amount"] == 0 and unpaid_row["payment_count"] == 0
+    assert unpaid_row["updated_at"] is None
+
+    assert client.get("/api/vendors/balances", params={"order": "asc"}).json()[0]["vendor_id"] == unpaid
+
+
+def test_vendor_with_payments_cannot_be_deleted(db):
+    app = FastAPI()
+    app.include_router(vendor_router)
+    client = TestClient(app)
+    vendor_id = client.post("/api/vendors/", json={"name": "Supplier"}).json()["id"]
+    payment_id = _client().post("/api/vendor-payments/", json={"vendor_id": vendor_id, "amount": 80}).json()["id"]
+
+    assert client.delete(f"/api/vendors/{vendor_id}").status_code == 409
+    assert db.get(Vendor, vendor_id) is not None
+
+    assert _client().delete(f"/api/vendor-payments/{payment_id}").status_code == 200
+    assert client.delete(f"/api/vendors/{vendor_id}").status_code == 200
+    assert db.get(Vendor, vendor_id) is None
+
+
+def test_status_change_racing_the_overdue_sweep_books_once(db):
+    vendor = Vendor(name="Supplier")
+    db.add(vendor)
+    db.commit()
+    client = _client()
+    payment_id = client.post("/api/vendor-payments/", json={
+        "vendor_id": vendor.id, "amount": 300, "due_date": (datetime.utcnow() - timedelta(days=3)).isoformat()
+    }).json()["id"]
+
+    locked = []
+
+    def do_orm_execute(state):
+        if state.is_select and state.statement._for_update_arg is not None:
+            locked.append(state.statement.column_descriptions[0]["entity"])
+
+    event.listen(Session, "do_orm_execute", do_orm_execute)
+    try:
+        # The sweep flips Pending -> Overdue, then the PUT marks the same payment Paid
+        assert sweep_overdue()["vendor_payments"] == 1
+        assert VendorPayment in locked
+        locked.clear()
+        assert client.put(f"/api/vendor-payments/{payment_id}", json={"status": "Paid"}).status_code == 200
+    finally:
+        event.remove(Session, "do_orm_execute", do_orm_execute)
+    # Both writers read the row under its lock, so neither books from a stale status
+    assert locked == [VendorPayment]
+
+    db.expire_all()
+    live = db.get(VendorBalance, vendor.id)
+    assert (live.paid_amount, live.outstanding_amount, live.overdue_amount) == (300, 0, 0)
+    assert (live.paid_count, live.outstanding_count, live.overdue_count) == (1, 0, 0)
@@ -0,0 +1,80 @@
+import threading
+
+from backend.database import SessionLocal
+from backend.models import Vendor
+from backend.payments import vendor_search
+from backend.payments.vendor_search import VendorPrefixIndex
+
+
+class _ChangesDuringRead:
+    """A session whose table read races with writes that commit in the middle of it."""
+
+    def __init__(self, db, during_read):
+        self.db, self.during_read = db, during_read
+
+    def query(self, *columns):
+        rows = self.db.query(*columns).all()  # The snapshot is taken first ...
+        self.during_read()  # ... then other requests commit and update the index
+        return rows
+
+
+def _names(index, db, query):
+    return [vendor["name"] for vendor in index.search(db, query)]
+
+
+def test_rebuild_keeps_changes_made_while_it_reads_the_table(db):
+    kept, dropped = Vendor(name="Mills Kept"), Vendor(name="Mills Dropped")
+    db.add_all([kept, dropped])
+    db.commit()
+    index = VendorPrefixIndex(ttl_seconds=300)
+
+    def during_read():
+        added = Vendor(name="Mills Added")
+        db.add(added)
+        db.delete(dropped)
+        db.commit()
+        index.upsert(added)
+        index.remove(dropped.id)
+
+    with index._rebuild_lock:
+        index._rebuild(_ChangesDuringRead(db, during_read))
+    assert sorted(_names(index, db, "mills")) == ["Mills Added", "Mills Kept"]
+
+
+def test_invalidate_during_rebuild_forces_another(db):
+    db.add(Vendor(name="Before Import"))
+    db.commit()
+    index = VendorPrefixIndex(ttl_seconds=300)
+
+    def during_read():
+        db.add(Vendor(name="Imported"))
+        db.commit()
+        index.invalidate()
+
+    with index._rebuild_lock:
+        index._rebuild(_ChangesDuringRead(db, during_read))
+    assert _names(index, db, "imported") == ["Imported"]
+
+
+def test_stale_index_answers_at_once_and_refreshes_in_background(db, monkeypatch):
+    db.add(Vendor(name="Old Vendor"))
+    db.commit()
+    index = VendorPrefixIndex(ttl_seconds=0)
+    assert _names(index, db, "old") == ["Old Vendor"]
+
+    # Written by another worker, so this index only sees it after a rebuild
+    db.add(Vendor(name="Older Vendor"))
+    db.commit()
+    release = threading.Event()
+
+    def slow_session():
+        release.wait(5)
+        return SessionLocal()
+
+    monkeypatch.setattr(vendor_search, "SessionLocal", slow_session)
+    assert _names(index, db, "old") == ["Old Vendor"]  # Not kept waiting for the rebuild
+    assert _names(index, db, "old") == ["Old Vendor"]  # Nor does a second lookup start another
+
+    release.set()
+    with index._rebuild_lock:
+        assert sorted(fields[0] for fields in index._vendors.values()) == ["Old Vendor", "Older Vendor"]
@@ -151,16 +151,32 @@ function DashboardView({ darkMode }) {
   const [deleteSuccess, setDeleteSuccess] = useState(false);
   const [refreshing, setRefreshing] = useState(false);
 
+  // /api/orders/ is paginated: follow X-Next-Cursor until the last page
+  const fetchAllOrders = async (params) => {
+    const all = [];
+    let cursor;
+    do {
+      const res = await api.get('/api/orders/', { params: { ...params, limit: 500, cursor } });
+      all.push(...(res.data || []));
+      cursor = res.headers['x-next-cursor'];
+    } while (cursor);
+    return all;
+  };
+
   // Fetch function
   const fetchData = async () => {
     try {
       setRefreshing(true);
-      const [salesRes, ordersRes] = await Promise.all([
+      // Recent orders plus every open cancellation request, however old, filtered server-side
+      const [salesRes, recentRes, requests] = await Promise.all([
         api.get('/api/sales/analytics'),
-        api.get('/api/orders/')
+        api.get('/api/orders/', { params: { limit: 20 } }),
+        fetchAllOrders({ cancellation_requested: true })
       ]);
       setAnalyticsData(salesRes.data);
-      setOrders(ordersRes.data || []);
+      const requestIds = new Set(requests.map(o => o.id));
+      const recent = (recentRes.data || []).filter(o => !requestIds.has(o.id));
+      setOrders([...requests, ...recent].sort((a, b) => b.id - a.id));
     } catch (err) {
       console.error("Failed to load dashboard data", err);
     } finally {
@@ -1348,6 +1364,7 @@ function PaymentManagementView({ darkMode }) {
     };
   const [invoices, setInvoices] = useState([]);
   const [orders, setOrders] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [selectedInvoice, setSelectedInvoice] = useState(null);
   const [isInvoiceModalOpen, setIsInvoiceModalOpen] = useState(false);
@@ -1363,8 +1380,12 @@ function PaymentManagementView({ darkMode }) {
 
   const fetchInvoices = async () => {
     try {
-      const res = await api.get('/api/invoices/');
+      const [res, summaryRes] = await Promise.all([
+        api.get('/api/invoices/'),
+        api.get('/api/invoices/summary')
+      ]);
       setInvoices(res.data || []);
+      setSummary(summaryRes.data);
     } catch (err) {
       console.error('Failed to fetch invoices', err);
     } finally {
@@ -1374,7 +1395,8 @@ function PaymentManagementView({ darkMode }) {
 
   const fetchOrders = async () => {
     try {
-      const res = await api.get('/api/orders/');
+      // Only orders that still need an invoice, worked out server-side
+      const res = await api.get('/api/invoices/pending-orders');
       setOrders(res.data || []);
     } catch (err) {
       console.error('Failed to fetch orders', err);
@@ -1394,6 +1416,7 @@ function PaymentManagementView({ darkMode }) {
       setSelectedOrderId(null);
       setInvoiceStatus('Pending'); // Reset to default
       fetchInvoices();
+      fetchOrders();
       alert('Invoice generated successfully!');
     } catch (err) {
       console.error('Failed to generate invoice', err);
@@ -1438,7 +1461,7 @@ function PaymentManagementView({ darkMode }) {
       <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
         <StatCard
           title="Total Invoices"
-          value={invoices.length}
+          value={summary?.count ?? 0}
           icon={FileText}
           trend=""
           positive={true}
@@ -1446,7 +1469,7 @@ function PaymentManagementView({ darkMode }) {
         />
         <StatCard
           title="Total Revenue"
-          value={`₹${invoices.reduce((sum, inv) => sum + (inv.total_amount || 0), 0).toLocaleString()}`}
+          value={`₹${(summary?.amount ?? 0).toLocaleString()}`}
           icon={DollarSign}
           trend=""
           positive={true}
@@ -1454,7 +1477,7 @@ function PaymentManagementView({ darkMode }) {
         />
         <StatCard
           title="Paid Invoices"
-          value={invoices.filter(inv => inv.payment_status === 'Paid').length}
+          value={summary?.by_status.find(s => s.status === 'Paid')?.count ?? 0}
           icon={CheckCircle}
           trend=""
           positive={true}
@@ -1557,7 +1580,7 @@ function PaymentManagementView({ darkMode }) {
                   className={`w-full p-2 rounded-lg border ${darkMode ? 'bg-gray-700 border-gray-600' : 'bg-gray-50 border-gray-200'}`}
                 >
                   <option value="">-- Select Order --</option>
-                  {orders.filter(o => o.amount && !invoices.find(inv => inv.order_id === o.id)).map((order) => (
+                  {orders.map((order) => (
                     <option key={order.id} value={order.id}>
                       Order #{order.id} - {order.user_name} - ₹{order.amount}
                     </option>
@@ -1812,6 +1835,7 @@ function InvoiceTemplate({ invoice, darkMode, onClose }) {
 function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
   const [vendors, setVendors] = useState([]);
   const [payments, setPayments] = useState([]);
+  const [paymentSummary, setPaymentSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [isVendorModalOpen, setIsVendorModalOpen] = useState(false);
   const [isPaymentModalOpen, setIsPaymentModalOpen] = useState(false);
@@ -1826,20 +1850,43 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
     vendor_id: '', description: '', amount: '', payment_method: '',
     due_date: '', status: 'Pending', reference_number: '', bill_reference: '', notes: ''
   });
+  const [vendorQuery, setVendorQuery] = useState('');
+  const [vendorSuggestions, setVendorSuggestions] = useState([]);
 
   useEffect(() => {
     fetchData();
     // eslint-disable-next-line
   }, [refreshKey]);
 
+  // Vendor picker type-ahead; stops suggesting once a vendor is picked
+  useEffect(() => {
+    if (!vendorQuery.trim() || paymentForm.vendor_id) {
+      setVendorSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const res = await api.get(`/api/vendors/suggest?q=${encodeURIComponent(vendorQuery)}&limit=8`);
+        setVendorSuggestions(res.data || []);
+      } catch (err) {
+        console.error('Failed to fetch vendor suggestions', err);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [vendorQuery, paymentForm.vendor_id]);
+
+  const vendorLabel = (v) => v ? `${v.name}${v.company_name ? ` (${v.company_name})` : ''}` : '';
+
   const fetchData = async () => {
     try {
-      const [vendorsRes, paymentsRes] = await Promise.all([
+      const [vendorsRes, paymentsRes, summaryRes] = await Promise.all([
         api.get('/api/vendors/'),
-        api.get('/api/vendor-payments/')
+        api.get('/api/vendor-payments/'),
+        api.get('/api/vendor-payments/summary')
       ]);
       setVendors(vendorsRes.data || []);
       setPayments(paymentsRes.data || []);
+      setPaymentSummary(summaryRes.data);
     } catch (err) {
       console.error('Failed to fetch data', err);
     } finally {
@@ -1867,6 +1914,10 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
 
   const handlePaymentSubmit = async (e) => {
     e.preventDefault();
+    if (!paymentForm.vendor_id) {
+      alert('Select a vendor from the suggestions');
+      return;
+    }
     try {
       const paymentData = {
         ...paymentForm,
@@ -1887,6 +1938,7 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
       setIsPaymentModalOpen(false);
       setEditingPayment(null);
       setPaymentForm({ vendor_id: '', description: '', amount: '', payment_method: '', due_date: '', status: 'Pending', reference_number: '', bill_reference: '', notes: '' });
+      setVendorQuery('');
       fetchData();
       if (updatedToPaid) {
         triggerGlobalRefresh();
@@ -1899,8 +1951,9 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
 
   if (loading) return <div className="flex justify-center items-center h-full"><Loader className="animate-spin w-8 h-8 text-blue-500" /></div>;
 
-  const totalPending = payments.filter(p => p.status === 'Pending').reduce((sum, p) => sum + (p.amount || 0), 0);
-  const totalPaid = payments.filter(p => p.status === 'Paid').reduce((sum, p) => sum + (p.amount || 0), 0);
+  const statusAmount = (status) => paymentSummary?.by_status.find(s => s.status === status)?.amount ?? 0;
+  const totalPending = statusAmount('Pending');
+  const totalPaid = statusAmount('Paid');
 
   return (
     <div className="space-y-6">
@@ -1918,7 +1971,7 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
             Add Vendor
           </button>
           <button
-            onClick={() => { setEditingPayment(null); setPaymentForm({ vendor_id: '', description: '', amount: '', payment_method: '', due_date: '', status: 'Pending', reference_number: '', bill_reference: '', notes: '' }); setIsPaymentModalOpen(true); }}
+            onClick={() => { setEditingPayment(null); setPaymentForm({ vendor_id: '', description: '', amount: '', payment_method: '', due_date: '', status: 'Pending', reference_number: '', bill_reference: '', notes: '' }); setVendorQuery(''); setIsPaymentModalOpen(true); }}
             className="flex items-center gap-2 px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition"
           >
             <Plus className="w-5 h-5" />
@@ -1977,7 +2030,7 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
                   </td>
                   <td className="px-6 py-4 text-right">
                     <button
-                      onClick={() => { setEditingPayment(payment); setPaymentForm(payment); setIsPaymentModalOpen(true); }}
+                      onClick={() => { setEditingPayment(payment); setPaymentForm(payment); setVendorQuery(vendorLabel(payment.vendor)); setIsPaymentModalOpen(true); }}
                       className="p-2 text-blue-500 hover:bg-blue-50 rounded-lg dark:hover:bg-blue-900/20"
                     >
                       <Edit2 className="w-4 h-4" />
@@ -2078,10 +2131,21 @@ function VendorPaymentsView({ darkMode, refreshKey, triggerGlobalRefresh }) {
             <form onSubmit={handlePaymentSubmit} className="space-y-4">
               <div>
                 <label className="block text-sm font-medium mb-1">Vendor *</label>
-                <select required value={paymentForm.vendor_id} onChange={(e) => setPaymentForm({...paymentForm, vendor_id: e.target.value})} className={`w-full p-2 rounded-lg border ${darkMode ? 'bg-gray-700 border-gray-600' : 'bg-gray-50 border-gray-200'}`}>
-                  <option value="">Select Vendor</option>
-                  {vendors.map(v => <option key={v.id} value={v.id}>{v.name} {v.company_name ? `(${v.company_name})` : ''}</option>)}
-                </select>
+                <div className="relative">
+                  <input required type="text" placeholder="Type a name, company or GSTIN" value={vendorQuery} onChange={(e) => { setVendorQuery(e.target.value); setPaymentForm({...paymentForm, vendor_id: ''}); }} className={`w-full p-2 rounded-lg border ${darkMode ? 'bg-gray-700 border-gray-600' : 'bg-gray-50 border-gray-200'}`} />
+                  {vendorSuggestions.length > 0 && (
+                    <ul className={`absolute z-10 mt-1 w-full max-h-60 overflow-y-auto rounded-lg border shadow-lg ${darkMode ? 'bg-gray-700 border-gray-600' : 'bg-white border-gray-200'}`}>
+                      {vendorSuggestions.map(v => (
+                        <li key={v.id}>
+                          <button type="button" onClick={() => { setPaymentForm({...paymentForm, vendor_id: v.id}); setVendorQuery(vendorLabel(v)); }} className={`w-full text-left px-3 py-2 text-sm ${darkMode ? 'hover:bg-gray-600' : 'hover:bg-gray-100'}`}>
+                            {vendorLabel(v)}
+                            {v.gstin && <span className="ml-2 text-xs opacity-60">{v.gstin}</span>}
+                          </button>
+                        </li>
+                      ))}
+                    </ul>
+                  )}
+                </div>
               </div>
               <div>
                 <label className="block text-sm font-medium mb-1">Amount (₹) *</label>